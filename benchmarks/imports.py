@@ -0,0 +1,102 @@
+"""
+Times a payment profile import of a synthetic CSV against a stub gateway, and reports its peak memory, which stays flat as the file grows.
+
+Usage::
+
+    python benchmarks/imports.py [--rows 100000] [--max-workers 8]
+
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from lxml import objectify  # noqa: E402
+
+from terminusgps_payments import imports  # noqa: E402
+from terminusgps_payments.models import CustomerProfile  # noqa: E402
+
+ROW = {
+    "customer_profile_id": "1",
+    "type": "credit_card",
+    "firstName": "Ann",
+    "lastName": "Smith",
+    "address": "1 Main St",
+    "city": "Houston",
+    "state": "TX",
+    "zip": "77065",
+    "cardNumber": "4111111111111111",
+    "cardCode": "123",
+    "expirationDate": "2099-01",
+}
+RESPONSE = b"<response><customerPaymentProfileId>1</customerPaymentProfileId></response>"
+
+
+class StubService:
+    """Answers every call instantly, without keeping them like a mock would."""
+
+    def execute(self, request_tuple, reference_id=None):
+        return objectify.fromstring(RESPONSE)
+
+
+def write_csv(path: Path, rows: int) -> None:
+    with path.open("w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=imports.IMPORT_CSV_HEADER)
+        writer.writeheader()
+        for _ in range(rows):
+            writer.writerow(ROW)
+
+
+def run(path: Path, max_workers: int) -> tuple[float, int, int]:
+    service = StubService()
+    tracemalloc.start()
+    start = time.perf_counter()
+    created = 0
+    with path.open(newline="") as file:
+        for result in imports.import_csv(
+            file, service=service, max_workers=max_workers
+        ):
+            created += result.status == imports.CREATED
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, created
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--max-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+    user = get_user_model().objects.create(username="benchmark")
+    CustomerProfile.objects.create(pk=1, user=user)
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (args.rows // 10, args.rows):
+            path = Path(tmp) / f"{rows}.csv"
+            write_csv(path, rows)
+            elapsed, peak, created = run(path, args.max_workers)
+            print(
+                f"{rows:>8} rows: {elapsed:6.2f}s "
+                f"({rows / elapsed:,.0f} rows/s), "
+                f"peak {peak / 1024:,.0f} KiB, {created} created"
+            )
+
+
+if __name__ == "__main__":
+    main()
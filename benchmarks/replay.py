@@ -0,0 +1,67 @@
+"""
+Times payment views offline, answering their Authorizenet calls from fixtures recorded with ``AUTHORIZENET_RECORD_DIR``.
+
+Record fixtures by running the site (or a management command) with ``AUTHORIZENET_RECORD_DIR`` set, then replay them as the same user::
+
+    python benchmarks/replay.py fixtures/ --username alice --path /payments/customer-profile/ [--number 50]
+
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+
+from terminusgps_payments import recording  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--path", action="append", required=True)
+    parser.add_argument("--number", type=int, default=50)
+    parser.add_argument("--htmx", action="store_true")
+    args = parser.parse_args()
+
+    fixtures = recording.get_fixtures(args.directory)
+    print(f"loaded {len(fixtures)} recorded calls from {args.directory}")
+    user = get_user_model().objects.get(username=args.username)
+    headers = {"HX-Request": "true"} if args.htmx else {}
+    with override_settings(
+        ALLOWED_HOSTS=["*"],
+        AUTHORIZENET_SERVICE="terminusgps_payments.recording.ReplayAuthorizenetService",
+        AUTHORIZENET_REPLAY_DIR=str(args.directory),
+        AUTHORIZENET_RECORD_DIR=None,
+        AUTHORIZENET_RATE_LIMIT_BUCKETS=None,
+        AUTHORIZENET_MERCHANTS={},
+    ):
+        client = Client()
+        client.force_login(user)
+        print(f"{'path':<50}{'status':>7}{'median ms':>11}{'max ms':>9}")
+        for path in args.path:
+            timings = []
+            for _ in range(args.number):
+                start = time.perf_counter()
+                response = client.get(path, headers=headers)
+                timings.append((time.perf_counter() - start) * 1e3)
+            print(
+                f"{path:<50}{response.status_code:>7}"
+                f"{statistics.median(timings):>11.2f}{max(timings):>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Times a billing forecast over synthetic active subscriptions, computed once per ``(plan, billing start date)`` group as :py:func:`terminusgps_payments.schedule.forecast` does, against once per subscription.
+
+Usage::
+
+    python benchmarks/schedule.py [--subscriptions 100000] [--days 90]
+
+"""
+
+import argparse
+import datetime
+import decimal
+import os
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from terminusgps_payments import schedule  # noqa: E402
+from terminusgps_payments.models import SubscriptionPlan  # noqa: E402
+
+PLANS = {
+    1: SubscriptionPlan(pk=1, amount=decimal.Decimal("24.95")),
+    2: SubscriptionPlan(pk=2, amount=decimal.Decimal("44.95")),
+    3: SubscriptionPlan(
+        pk=3,
+        amount=decimal.Decimal("64.95"),
+        trial_amount=decimal.Decimal("0.00"),
+        trial_occurrences=1,
+    ),
+    4: SubscriptionPlan(
+        pk=4, amount=decimal.Decimal("9.95"), length=7, unit="days"
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscriptions", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    since = datetime.date.today()
+    until = since + datetime.timedelta(days=args.days - 1)
+    subscriptions = [
+        (
+            rng.choice(list(PLANS)),
+            since - datetime.timedelta(days=rng.randrange(5 * 365)),
+        )
+        for _ in range(args.subscriptions)
+    ]
+
+    start = time.perf_counter()
+    groups = [
+        (plan_id, start_date, count)
+        for (plan_id, start_date), count in Counter(subscriptions).items()
+    ]
+    grouped = schedule.forecast_groups(groups, PLANS, since, until)
+    grouped_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = schedule.forecast_groups(
+        ((plan_id, start_date, 1) for plan_id, start_date in subscriptions),
+        PLANS,
+        since,
+        until,
+    )
+    single_seconds = time.perf_counter() - start
+
+    assert grouped == single, "forecasts differ"
+    charges = sum(day.charges for day in grouped)
+    print(
+        f"{args.subscriptions} subscriptions, {len(groups)} schedules, "
+        f"{charges} charges over {args.days} days"
+    )
+    print(f"per schedule     {grouped_seconds * 1e3:>9.1f} ms")
+    print(f"per subscription {single_seconds * 1e3:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
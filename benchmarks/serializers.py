@@ -0,0 +1,153 @@
+"""
+Compares building and serializing Authorizenet write requests through PyXB contracts against :py:mod:`terminusgps_payments.serializers`.
+
+Usage::
+
+    python benchmarks/serializers.py [--number 2000]
+
+"""
+
+import argparse
+import decimal
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from authorizenet import apicontractsv1  # noqa: E402
+from terminusgps.authorizenet import api  # noqa: E402
+
+from terminusgps_payments import contracts, forms, serializers  # noqa: E402
+from terminusgps_payments.models import SubscriptionPlan  # noqa: E402
+
+MERCHANT_AUTHENTICATION = apicontractsv1.merchantAuthenticationType(
+    name="login", transactionKey="key"
+)
+PLAN = SubscriptionPlan(
+    name="Basic Subscription",
+    amount=decimal.Decimal("24.95"),
+    trial_amount=decimal.Decimal("0.00"),
+    total_occurrences=9999,
+    trial_occurrences=0,
+    length=1,
+    unit="months",
+)
+ADDRESS = forms.AddressForm(
+    data={
+        "firstName": "Ann-Marie",
+        "lastName": "O'Brien",
+        "address": "1 Main St",
+        "city": "Houston",
+        "state": "TX",
+        "zip": "77065",
+        "country": "US",
+        "phoneNumber": "555-555-5555",
+    }
+)
+CARD = forms.CreditCardForm(
+    data={
+        "cardNumber": "4111111111111111",
+        "cardCode": "123",
+        "expirationDate": "2030-01",
+    }
+)
+assert ADDRESS.is_valid() and CARD.is_valid()
+
+
+def serialize(request_tuple) -> bytes:
+    request, controller_cls = request_tuple
+    request.merchantAuthentication = MERCHANT_AUTHENTICATION
+    controller = controller_cls(request)
+    controller.setClientId()
+    return controller.buildrequest()
+
+
+def pyxb_payment_profile() -> bytes:
+    payment = apicontractsv1.paymentType()
+    payment.creditCard = CARD.build_contract()
+    contract = apicontractsv1.customerPaymentProfileType()
+    contract.billTo = ADDRESS.build_contract()
+    contract.payment = payment
+    return serialize(
+        api.create_customer_payment_profile(
+            customer_profile_id=1, contract=contract
+        )
+    )
+
+
+def serializer_payment_profile() -> bytes:
+    return serialize(
+        serializers.create_customer_payment_profile(
+            customer_profile_id=1,
+            bill_to=serializers.build_address(ADDRESS.cleaned_data),
+            payment=[
+                (
+                    "creditCard",
+                    serializers.build_credit_card(CARD.cleaned_data),
+                )
+            ],
+        )
+    )
+
+
+def pyxb_subscription() -> bytes:
+    contract = contracts.build_subscription_contract(PLAN, 1, 2, 3)
+    return serialize(api.create_subscription(contract=contract))
+
+
+def serializer_subscription() -> bytes:
+    elements = serializers.build_subscription(PLAN, 1, 2, 3)
+    return serialize(serializers.create_subscription(elements))
+
+
+def pyxb_update_profile() -> bytes:
+    contract = apicontractsv1.ARBSubscriptionType()
+    contract.profile = contracts.build_profile_contract(1, 2, 3)
+    return serialize(api.update_subscription(5, contract))
+
+
+def serializer_update_profile() -> bytes:
+    profile = serializers.build_profile(1, 2, 3)
+    return serialize(
+        serializers.update_subscription(5, [("profile", profile)])
+    )
+
+
+BENCHMARKS = {
+    "createCustomerPaymentProfile": (
+        pyxb_payment_profile,
+        serializer_payment_profile,
+    ),
+    "ARBCreateSubscription": (pyxb_subscription, serializer_subscription),
+    "ARBUpdateSubscription": (pyxb_update_profile, serializer_update_profile),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+    print(f"{'request':<30}{'pyxb us':>10}{'lxml us':>10}{'speedup':>9}")
+    for name, (pyxb, direct) in BENCHMARKS.items():
+        assert pyxb() == direct(), f"{name} output differs"
+        results = [
+            min(timeit.repeat(func, number=args.number, repeat=5))
+            / args.number
+            * 1e6
+            for func in (pyxb, direct)
+        ]
+        print(
+            f"{name:<30}{results[0]:>10.1f}{results[1]:>10.1f}"
+            f"{results[0] / results[1]:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
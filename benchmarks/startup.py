@@ -0,0 +1,67 @@
+"""
+Measures worker startup: the time and peak RSS of ``django.setup()`` plus loading the URLconf, with and without the Authorizenet contract bindings.
+
+Usage::
+
+    python benchmarks/startup.py [--runs 10]
+
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+STARTUP = """
+import resource, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+{extra}
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, rss, "authorizenet.apicontractsv1" in sys.modules)
+"""
+
+SCENARIOS = {
+    "startup": "",
+    "startup + contracts": "import authorizenet.apicontractsv1",
+}
+
+
+def measure(code: str) -> tuple[float, int, bool]:
+    env = os.environ | {"DJANGO_SETTINGS_MODULE": "src.settings"}
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=BASE_DIR,
+        env=env,
+        text=True,
+    ).stdout.split()
+    return float(output[0]), int(output[1]), output[2] == "True"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    print(f"{'scenario':<22}{'median ms':>12}{'max RSS MiB':>14}  contracts")
+    for name, extra in SCENARIOS.items():
+        results = [
+            measure(STARTUP.format(extra=extra)) for _ in range(args.runs)
+        ]
+        elapsed = statistics.median(r[0] for r in results) * 1000
+        rss = max(r[1] for r in results) / 1024
+        loaded = any(r[2] for r in results)
+        print(f"{name:<22}{elapsed:>12.1f}{rss:>14.1f}  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,22 @@ from authorizenet.constants import constants
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-AUTHORIZENET_SERVICE = "terminusgps.authorizenet.service.AuthorizenetService"
+AUTHORIZENET_SERVICE = (
+    "terminusgps_payments.gateway.RateLimitedAuthorizenetService"
+)
+AUTHORIZENET_MAX_WORKERS = 8
+AUTHORIZENET_RATE_LIMIT_BUCKETS = {
+    "interactive": {"rate": 20, "capacity": 20, "max_wait": 0},
+    "batch": {"rate": 5, "capacity": 5, "max_wait": None},
+}
+AUTHORIZENET_RATE_LIMIT_CACHE = "default"
+AUTHORIZENET_LOCAL_CACHE_SIZE = 0
+AUTHORIZENET_RECORD_DIR = os.getenv("AUTHORIZENET_RECORD_DIR")
+PAYMENTS_TRACE_SAMPLE_RATE = float(os.getenv("PAYMENTS_TRACE_SAMPLE_RATE", "0"))
+PAYMENTS_PROFILE_SAMPLE_RATE = float(
+    os.getenv("PAYMENTS_PROFILE_SAMPLE_RATE", "0")
+)
+PAYMENTS_PROFILE_SLOW_MS = os.getenv("PAYMENTS_PROFILE_SLOW_MS")
 ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
 DEBUG = True
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
@@ -74,6 +89,7 @@ LOGGING = {
 }
 
 MIDDLEWARE = [
+    "terminusgps_payments.middleware.TracingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -81,6 +97,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "terminusgps_payments.middleware.ReplicaPinMiddleware",
+    "terminusgps_payments.middleware.ProfilingMiddleware",
 ]
 
 
@@ -103,9 +121,15 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+    },
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+    },
 }
 
+DATABASE_ROUTERS = ["terminusgps_payments.routers.ReplicaRouter"]
+
 CACHES = {
     "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
 }
@@ -1,20 +1,260 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.template.response import SimpleTemplateResponse, TemplateResponse
 
-from . import models
+from . import (
+    bulk,
+    counters,
+    exports,
+    forms,
+    models,
+    outbox,
+    revenue,
+    routers,
+    services,
+    throttling,
+)
+from .lazy import api, authorizenet_service
+from .views import get_payment_profile_choices, get_shipping_profile_choices
+
+MAX_REPORTED_FAILURES = 20
+
+
+class ReplicaChangeListMixin:
+    """Routes the changelist's reads to a read replica. See :py:func:`~terminusgps_payments.routers.replica_reads`."""
+
+    def changelist_view(self, request, extra_context=None):
+        with routers.replica_reads(request):
+            response = super().changelist_view(request, extra_context)
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+            return response
 
 
 @admin.register(models.CustomerProfile)
-class CustomerProfileAdmin(admin.ModelAdmin):
-    list_display = ["user", "merchant_id", "description"]
+class CustomerProfileAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    actions = ["repair_subscription_counters"]
+    list_display = [
+        "user",
+        "merchant_id",
+        "active_subscription_count",
+        "canceled_subscription_count",
+        "description",
+    ]
+    list_select_related = ["user"]
+    readonly_fields = list(counters.COUNTER_FIELDS.values())
+
+    @admin.action(description="Repair subscription counters")
+    def repair_subscription_counters(self, request, queryset):
+        repaired = counters.repair(queryset)
+        self.message_user(
+            request,
+            f"Repaired {repaired} customer profile(s).",
+            messages.SUCCESS,
+        )
 
 
 @admin.register(models.Subscription)
-class Subscription(admin.ModelAdmin):
-    list_display = ["customer_profile"]
+class SubscriptionAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    actions = [
+        "export_subscriptions_csv",
+        "export_transactions_csv",
+        "cancel_subscriptions",
+        "sync_subscription_statuses",
+        "change_subscription_profiles",
+    ]
+    list_display = [
+        "id",
+        "customer_profile",
+        "plan",
+        "status",
+        "expires_on",
+        "trial_ends_on",
+        "finished_on",
+    ]
+    list_filter = ["status", "plan"]
+    list_select_related = ["customer_profile__user", "plan"]
+
+    def save_model(self, request, obj, form, change) -> None:
+        super().save_model(request, obj, form, change)
+        previous_status = form.initial.get("status", "")
+        if active_deltas := revenue.get_active_deltas(
+            [
+                (form.initial.get("plan"), previous_status, ""),
+                (obj.plan_id, "", obj.status),
+            ]
+        ):
+            outbox.publish(
+                "subscriptions.status_changed",
+                {"subscription_ids": [obj.pk], "active_deltas": active_deltas},
+            )
+
+    def report_bulk_results(self, request, results, verb: str) -> None:
+        """Adds a success message for ``results`` and an error message for each failed subscription."""
+        failures = [r for r in results if not r.ok]
+        succeeded = len(results) - len(failures)
+        if succeeded:
+            self.message_user(
+                request,
+                f"{verb} {succeeded} subscription(s).",
+                messages.SUCCESS,
+            )
+        for result in failures[:MAX_REPORTED_FAILURES]:
+            self.message_user(
+                request,
+                f"Subscription #{result.item.pk}: {result.error}",
+                messages.ERROR,
+            )
+        if len(failures) > MAX_REPORTED_FAILURES:
+            self.message_user(
+                request,
+                f"{len(failures) - MAX_REPORTED_FAILURES} more subscription(s) failed.",
+                messages.ERROR,
+            )
+
+    @admin.action(description="Export selected subscriptions as CSV")
+    def export_subscriptions_csv(self, request, queryset):
+        return exports.subscription_csv_response(queryset)
+
+    @admin.action(
+        description="Export selected subscription transactions as CSV"
+    )
+    def export_transactions_csv(self, request, queryset):
+        return exports.transaction_csv_response(queryset)
+
+    @admin.action(description="Cancel selected subscriptions")
+    def cancel_subscriptions(self, request, queryset):
+        results = bulk.bulk_cancel_subscriptions(queryset)
+        self.report_bulk_results(request, results, "Canceled")
+
+    @admin.action(description="Sync selected subscription statuses")
+    def sync_subscription_statuses(self, request, queryset):
+        results = bulk.bulk_sync_subscription_statuses(queryset)
+        self.report_bulk_results(request, results, "Synced")
+
+    @admin.action(description="Change selected subscription profiles")
+    def change_subscription_profiles(self, request, queryset):
+        profiles = set(
+            queryset.values_list(
+                "customer_profile", "customer_profile__merchant_id"
+            )
+        )
+        if len(profiles) != 1:
+            self.message_user(
+                request,
+                "Selected subscriptions must belong to a single customer profile.",
+                messages.ERROR,
+            )
+            return
+        customer_profile_id, merchant_id = profiles.pop()
+        service = services.get_service(
+            priority=throttling.BATCH, merchant_id=merchant_id
+        )
+        try:
+            response = service.execute(
+                api.get_customer_profile(
+                    customer_profile_id=customer_profile_id
+                )
+            )
+        except authorizenet_service.AuthorizenetError as error:
+            self.message_user(request, str(error), messages.ERROR)
+            return
+        form = forms.UpdateSubscriptionForm(
+            request.POST if "apply" in request.POST else None
+        )
+        form.fields["payment_profile"].choices = get_payment_profile_choices(
+            response.profile.paymentProfiles
+        )
+        form.fields["shipping_profile"].choices = get_shipping_profile_choices(
+            response.profile.shipToList
+        )
+        if form.is_valid():
+            results = bulk.bulk_update_subscription_profiles(
+                queryset,
+                customer_profile_id=customer_profile_id,
+                payment_profile_id=form.cleaned_data["payment_profile"],
+                shipping_profile_id=form.cleaned_data["shipping_profile"],
+                service=service,
+            )
+            self.report_bulk_results(request, results, "Updated")
+            return
+        return TemplateResponse(
+            request,
+            "admin/terminusgps_payments/subscription/change_profiles.html",
+            {
+                **self.admin_site.each_context(request),
+                "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+                "form": form,
+                "opts": self.model._meta,
+                "queryset": queryset,
+                "title": "Change subscription profiles",
+            },
+        )
+
+
+@admin.register(models.ArchivedSubscription)
+class ArchivedSubscriptionAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    list_display = [
+        "id",
+        "customer_profile",
+        "plan",
+        "status",
+        "expires_on",
+        "finished_on",
+        "archived_at",
+    ]
+    list_filter = ["status", "plan"]
+    list_select_related = ["customer_profile__user", "plan"]
+    search_fields = [
+        "=id",
+        "customer_profile__user__username",
+        "customer_profile__user__email",
+    ]
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+
+@admin.register(models.OutboxEvent)
+class OutboxEventAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    list_display = ["kind", "created_at", "dispatched_at", "attempts"]
+    list_filter = ["kind"]
+    readonly_fields = ["created_at"]
+
+
+@admin.register(models.PlanPriceMigration)
+class PlanPriceMigrationAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    list_display = [
+        "plan",
+        "amount",
+        "status",
+        "last_subscription_id",
+        "updated_count",
+        "updated_at",
+    ]
+    list_filter = ["status"]
+
+
+@admin.register(models.RevenueSummary)
+class RevenueSummaryAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    date_hierarchy = "date"
+    list_display = ["date", "plan", "active_count", "monthly_revenue"]
+    list_filter = ["plan"]
+    list_select_related = ["plan"]
+    ordering = ["-date", "plan"]
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
 
 
 @admin.register(models.SubscriptionPlan)
-class SubscriptionPlanAdmin(admin.ModelAdmin):
+class SubscriptionPlanAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ["name", "amount", "visibility", "description"]
     list_filter = ["visibility"]
     ordering = ["amount", "name"]
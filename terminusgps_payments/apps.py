@@ -5,3 +5,7 @@ class TerminusgpsPaymentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "terminusgps_payments"
     verbose_name = "Terminus GPS Payments"
+
+    def ready(self) -> None:
+        # Registers outbox event handlers and signal receivers
+        from terminusgps_payments import signals, tasks  # noqa: F401
@@ -0,0 +1,176 @@
+import datetime
+import logging
+import time
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import DateField, F, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from terminusgps_payments import caching
+from terminusgps_payments.models import ArchivedSubscription, Subscription
+
+FINISHED_STATUSES = (
+    Subscription.SubscriptionStatus.EXPIRED,
+    Subscription.SubscriptionStatus.CANCELED,
+    Subscription.SubscriptionStatus.TERMINATED,
+)
+"""Statuses of subscriptions that can be archived. None of them count towards revenue."""
+
+ARCHIVE_FIELDS = (
+    "id",
+    "status",
+    "expires_on",
+    "trial_ends_on",
+    "billing_starts_on",
+    "finished_on",
+    "customer_profile_id",
+    "plan_id",
+)
+"""Fields copied from :py:class:`~terminusgps_payments.models.Subscription` to :py:class:`~terminusgps_payments.models.ArchivedSubscription`."""
+
+ARCHIVE_BATCH_SIZE = 1000
+logger = logging.getLogger(__name__)
+
+
+def get_retention_days() -> int:
+    """Returns the ``SUBSCRIPTION_ARCHIVE_RETENTION_DAYS`` setting, default ``730``."""
+    return int(getattr(settings, "SUBSCRIPTION_ARCHIVE_RETENTION_DAYS", 730))
+
+
+def get_finished_on(today: datetime.date) -> Coalesce:
+    """
+    Returns an expression for the date a finished subscription finished on.
+
+    That's its ``expires_on`` date. Subscriptions don't record when their status changed, so a subscription without one finished on the latest date it's known to have been running, the later of its ``billing_starts_on`` and ``trial_ends_on`` dates up to ``today``, or ``today`` if it has neither. Subscriptions that finished long ago can then be archived as soon as they're marked, instead of after a whole retention window.
+
+    """
+    today = Value(today, output_field=DateField())
+    started_on = Greatest(
+        Coalesce(F("billing_starts_on"), F("trial_ends_on")),
+        Coalesce(F("trial_ends_on"), F("billing_starts_on")),
+    )
+    return Coalesce(F("expires_on"), Least(started_on, today), today)
+
+
+def mark_finished(
+    today: datetime.date | None = None, batch_size: int = ARCHIVE_BATCH_SIZE
+) -> int:
+    """
+    Sets ``finished_on`` on finished subscriptions that don't have one yet, and clears it from subscriptions that are no longer finished.
+
+    The finish date comes from :py:func:`get_finished_on`. Rows are marked in batches of ``batch_size``, each in its own transaction.
+
+    :returns: Number of subscriptions marked finished.
+    :rtype: int
+
+    """
+    if today is None:
+        today = datetime.date.today()
+    Subscription.objects.exclude(status__in=FINISHED_STATUSES).filter(
+        finished_on__isnull=False
+    ).update(finished_on=None)
+    marked = 0
+    unmarked = Subscription.objects.filter(
+        status__in=FINISHED_STATUSES, finished_on__isnull=True
+    )
+    while pks := list(
+        unmarked.order_by("pk").values_list("pk", flat=True)[:batch_size]
+    ):
+        with transaction.atomic():
+            marked += Subscription.objects.filter(
+                pk__in=pks, finished_on__isnull=True
+            ).update(finished_on=get_finished_on(today))
+    return marked
+
+
+def archive_batch(
+    cutoff: datetime.date, after: int, batch_size: int
+) -> tuple[list[int], int | None]:
+    """
+    Moves up to ``batch_size`` subscriptions finished before ``cutoff`` with a primary key greater than ``after`` into the archive table, in one short transaction.
+
+    The rows are copied with one ``INSERT`` and removed with :py:meth:`~django.db.models.query.QuerySet.delete`, whose ``post_delete`` signal adjusts the customer profiles' subscription counters. A row whose primary key is already in the archive table is left in place and logged, so no subscription is deleted without being archived. The rows' cached Authorizenet responses are dropped after the transaction commits.
+
+    :returns: Primary keys of the archived subscriptions in ascending order, and the primary key of the last subscription read, or :py:obj:`None` if none were left.
+    :rtype: tuple[list[int], int | None]
+
+    """
+    using = router.db_for_write(Subscription)
+    with transaction.atomic(using=using):
+        rows = list(
+            Subscription.objects.using(using)
+            .select_for_update()
+            .filter(
+                status__in=FINISHED_STATUSES,
+                finished_on__lt=cutoff,
+                pk__gt=after,
+            )
+            .order_by("pk")
+            .values(*ARCHIVE_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return [], None
+        conflicts = set(
+            ArchivedSubscription.objects.using(using)
+            .filter(pk__in=[row["id"] for row in rows])
+            .values_list("pk", flat=True)
+        )
+        if conflicts:
+            logger.warning(
+                f"Skipped archiving subscription(s) {sorted(conflicts)}, "
+                "already in the archive table."
+            )
+        rows_to_archive = [row for row in rows if row["id"] not in conflicts]
+        pks = [row["id"] for row in rows_to_archive]
+        ArchivedSubscription.objects.using(using).bulk_create(
+            [ArchivedSubscription(**row) for row in rows_to_archive]
+        )
+        Subscription.objects.using(using).filter(pk__in=pks).delete()
+        transaction.on_commit(
+            lambda: caching.invalidate_subscriptions(pks), using=using
+        )
+    return pks, rows[-1]["id"]
+
+
+def archive_subscriptions(
+    retention_days: int | None = None,
+    today: datetime.date | None = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    pause: float = 0,
+) -> int:
+    """
+    Moves subscriptions finished for longer than ``retention_days`` into the archive table.
+
+    Finished subscriptions are marked with :py:func:`mark_finished` first, then archived in batches with :py:func:`archive_batch`, walking the primary key so every batch is an index range scan. Locks are only held for one batch at a time; ``pause`` seconds between batches leave room for other writers.
+
+    :param retention_days: Days a subscription stays in the subscriptions table after finishing. Default is the ``SUBSCRIPTION_ARCHIVE_RETENTION_DAYS`` setting.
+    :type retention_days: int | None
+    :param batch_size: Subscriptions moved per transaction. Default is ``1000``.
+    :type batch_size: int
+    :param pause: Seconds to sleep between batches. Default is ``0``.
+    :type pause: float
+    :returns: Number of archived subscriptions.
+    :rtype: int
+
+    """
+    if retention_days is None:
+        retention_days = get_retention_days()
+    if today is None:
+        today = datetime.date.today()
+    mark_finished(today=today, batch_size=batch_size)
+    cutoff = today - datetime.timedelta(days=retention_days)
+    archived, after = 0, 0
+    while True:
+        pks, last = archive_batch(cutoff, after=after, batch_size=batch_size)
+        if last is None:
+            break
+        archived += len(pks)
+        after = last
+        if pause:
+            time.sleep(pause)
+    if archived:
+        logger.info(
+            f"Archived {archived} subscription(s) finished before {cutoff}."
+        )
+    return archived
@@ -0,0 +1,386 @@
+import contextvars
+import dataclasses
+import datetime
+import logging
+import typing
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+
+from terminusgps_payments import (
+    caching,
+    counters,
+    outbox,
+    revenue,
+    serializers,
+    services,
+    throttling,
+)
+from terminusgps_payments.lazy import api, authorizenet_service
+from terminusgps_payments.models import (
+    CustomerProfile,
+    Subscription,
+    SubscriptionPlan,
+)
+
+ACTIVE = Subscription.SubscriptionStatus.ACTIVE
+CANCELED = Subscription.SubscriptionStatus.CANCELED
+logger = logging.getLogger(__name__)
+
+
+def get_max_workers() -> int:
+    """Returns the ``AUTHORIZENET_MAX_WORKERS`` setting, default ``8``."""
+    return int(getattr(settings, "AUTHORIZENET_MAX_WORKERS", 8))
+
+
+@dataclasses.dataclass
+class BulkResult:
+    """The outcome of a single item in a bulk operation."""
+
+    item: typing.Any
+    value: typing.Any = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_concurrently(
+    func: Callable[[typing.Any], typing.Any],
+    items: Iterable[typing.Any],
+    max_workers: int | None = None,
+    errors: tuple[type[Exception], ...] | None = None,
+    timeout: float | None = None,
+) -> list[BulkResult]:
+    """
+    Calls ``func`` on every item in ``items`` in a bounded thread pool.
+
+    Each call runs in a copy of the caller's :py:mod:`contextvars` context, so tracing spans and :py:func:`~terminusgps_payments.routers.replica_reads` carry over to the threads. Exceptions listed in ``errors`` are captured on the item's result instead of aborting the whole run. Calls aren't rate limited here: services take a token from their shared :py:class:`~terminusgps_payments.throttling.TokenBucket` for every call.
+
+    If ``timeout`` is given, the run returns after at most ``timeout`` seconds. Items that didn't finish in time get a :py:exc:`TimeoutError` result; calls that haven't started are cancelled, calls in progress finish in the background and their results are discarded.
+
+    :param func: A callable that takes a single item.
+    :type func: ~collections.abc.Callable
+    :param items: Items to call ``func`` on.
+    :type items: ~collections.abc.Iterable
+    :param max_workers: Maximum number of threads. Default is the ``AUTHORIZENET_MAX_WORKERS`` setting.
+    :type max_workers: int | None
+    :param errors: Exception types recorded as per-item failures. Default is ``(AuthorizenetError,)``.
+    :type errors: tuple[type[Exception], ...] | None
+    :param timeout: Total seconds to wait for results. Default is to wait for every item.
+    :type timeout: float | None
+    :returns: A list of results in the same order as ``items``.
+    :rtype: list[~terminusgps_payments.bulk.BulkResult]
+
+    """
+    if timeout is None:
+        return list(
+            iter_concurrently(
+                func, items, max_workers=max_workers, errors=errors
+            )
+        )
+    if max_workers is None:
+        max_workers = get_max_workers()
+    if errors is None:
+        errors = (authorizenet_service.AuthorizenetError,)
+
+    def call(item: typing.Any) -> BulkResult:
+        try:
+            return BulkResult(item=item, value=func(item))
+        except errors as error:
+            return BulkResult(item=item, error=error)
+
+    items = list(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [
+            executor.submit(contextvars.copy_context().run, call, item)
+            for item in items
+        ]
+        done, _ = wait(futures, timeout=timeout)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return [
+        future.result()
+        if future in done
+        else BulkResult(
+            item=item, error=TimeoutError(f"No result within {timeout}s.")
+        )
+        for item, future in zip(items, futures)
+    ]
+
+
+def iter_concurrently(
+    func: Callable[[typing.Any], typing.Any],
+    items: Iterable[typing.Any],
+    max_workers: int | None = None,
+    errors: tuple[type[Exception], ...] | None = None,
+    window: int | None = None,
+) -> Iterator[BulkResult]:
+    """
+    Like :py:func:`run_concurrently` without a timeout, but yields results in the same order as ``items`` as they finish.
+
+    At most ``window`` items are read ahead of the results yielded, so ``items`` can be a stream of any length and memory stays constant.
+
+    :param window: Maximum number of items in flight. Default is four times ``max_workers``.
+    :type window: int | None
+
+    """
+    if max_workers is None:
+        max_workers = get_max_workers()
+    if errors is None:
+        errors = (authorizenet_service.AuthorizenetError,)
+    if window is None:
+        window = max_workers * 4
+
+    def call(item: typing.Any) -> BulkResult:
+        try:
+            return BulkResult(item=item, value=func(item))
+        except errors as error:
+            return BulkResult(item=item, error=error)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(
+                executor.submit(contextvars.copy_context().run, call, item)
+            )
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def record_status_changes(changes: Sequence[tuple[Subscription, str]]) -> None:
+    """
+    Records saved subscription status changes in the customer subscription counters and publishes a ``subscriptions.status_changed`` outbox event for the revenue summary.
+
+    Call this in the same transaction that saved the changes.
+
+    :param changes: ``(subscription, previous_status)`` pairs. A new subscription's previous status is ``""``.
+    :type changes: ~collections.abc.Sequence[tuple[~terminusgps_payments.models.Subscription, str]]
+    :rtype: None
+
+    """
+    counters.apply_changes(
+        [
+            (s.customer_profile_id, previous, s.status)
+            for s, previous in changes
+        ]
+    )
+    if active_deltas := revenue.get_active_deltas(
+        [(s.plan_id, previous, s.status) for s, previous in changes]
+    ):
+        outbox.publish(
+            "subscriptions.status_changed",
+            {
+                "subscription_ids": [s.pk for s, _ in changes],
+                "active_deltas": active_deltas,
+            },
+        )
+
+
+def bulk_create_subscriptions(
+    plan: SubscriptionPlan,
+    customer_profile: CustomerProfile,
+    payment_profile_id: str,
+    shipping_profile_id: str,
+    names: Sequence[str],
+    service=None,
+    commit: bool = True,
+    **kwargs,
+) -> list[BulkResult]:
+    """
+    Creates an Authorizenet subscription for each name in ``names``, then saves the created subscriptions with a single bulk insert.
+
+    If ``commit`` is :py:obj:`False`, the subscriptions on the successful results are returned unsaved, so the caller can save them in its own transaction.
+
+    Extra ``kwargs`` are passed to :py:func:`run_concurrently`.
+
+    """
+    if service is None:
+        service = services.get_service(
+            priority=throttling.BATCH, merchant_id=customer_profile.merchant_id
+        )
+    start_date = datetime.date.today()
+    trial_ends_on = plan.get_trial_ends_on(start_date)
+
+    def create(name: str) -> Subscription:
+        subscription = serializers.build_subscription(
+            plan=plan,
+            customer_profile_id=customer_profile.pk,
+            payment_profile_id=payment_profile_id,
+            shipping_profile_id=shipping_profile_id,
+            name=name,
+            start_date=start_date,
+        )
+        response = service.execute(
+            serializers.create_subscription(subscription)
+        )
+        return Subscription(
+            pk=int(response.subscriptionId),
+            status=ACTIVE,
+            trial_ends_on=trial_ends_on,
+            billing_starts_on=start_date,
+            customer_profile=customer_profile,
+            plan=plan,
+        )
+
+    results = run_concurrently(create, names, **kwargs)
+    if commit:
+        created = [r.value for r in results if r.ok]
+        with transaction.atomic():
+            Subscription.objects.bulk_create(created)
+            record_status_changes([(s, "") for s in created])
+    return results
+
+
+def bulk_cancel_subscriptions(
+    queryset: QuerySet, service=None, **kwargs
+) -> list[BulkResult]:
+    """
+    Cancels every subscription in ``queryset`` in Authorizenet, then marks the canceled subscriptions as canceled with a single query.
+
+    Extra ``kwargs`` are passed to :py:func:`run_concurrently`.
+
+    """
+    get_service = services.get_merchant_services(throttling.BATCH, service)
+
+    def cancel(subscription: Subscription) -> Subscription:
+        service = get_service(subscription.customer_profile.merchant_id)
+        service.execute(
+            api.cancel_subscription(subscription_id=subscription.pk)
+        )
+        subscription.status = CANCELED
+        subscription.expires_on = services.get_expires_on(
+            service, subscription.pk
+        )
+        return subscription
+
+    subscriptions = list(
+        queryset.select_related(None)
+        .select_related("customer_profile")
+        .only("pk", "status", "customer_profile__merchant_id", "plan")
+    )
+    previous = {s.pk: s.status for s in subscriptions}
+    results = run_concurrently(cancel, subscriptions, **kwargs)
+    canceled = [r.value for r in results if r.ok]
+    with transaction.atomic():
+        Subscription.objects.bulk_update(canceled, ["status", "expires_on"])
+        record_status_changes([(s, previous[s.pk]) for s in canceled])
+    caching.invalidate_subscriptions([s.pk for s in canceled])
+    return results
+
+
+def bulk_update_subscription_profiles(
+    queryset: QuerySet,
+    customer_profile_id: int,
+    payment_profile_id: str,
+    shipping_profile_id: str,
+    service=None,
+    **kwargs,
+) -> list[BulkResult]:
+    """
+    Points every subscription in ``queryset`` at a new payment and shipping profile in Authorizenet.
+
+    Extra ``kwargs`` are passed to :py:func:`run_concurrently`.
+
+    """
+    get_service = services.get_merchant_services(throttling.BATCH, service)
+
+    def update(subscription: Subscription) -> Subscription:
+        profile = serializers.build_profile(
+            customer_profile_id, payment_profile_id, shipping_profile_id
+        )
+        get_service(subscription.customer_profile.merchant_id).execute(
+            serializers.update_subscription(
+                subscription_id=subscription.pk,
+                subscription=[("profile", profile)],
+            )
+        )
+        return subscription
+
+    results = run_concurrently(
+        update,
+        queryset.select_related(None)
+        .select_related("customer_profile")
+        .only("pk", "customer_profile__merchant_id"),
+        **kwargs,
+    )
+    caching.invalidate_subscriptions([r.item.pk for r in results if r.ok])
+    return results
+
+
+def bulk_sync_subscription_statuses(
+    queryset: QuerySet, service=None, **kwargs
+) -> list[BulkResult]:
+    """
+    Retrieves the Authorizenet status of every subscription in ``queryset`` and saves them with a single bulk update.
+
+    Extra ``kwargs`` are passed to :py:func:`run_concurrently`.
+
+    """
+    get_service = services.get_merchant_services(throttling.BATCH, service)
+
+    def sync(subscription: Subscription) -> Subscription:
+        response = get_service(
+            subscription.customer_profile.merchant_id
+        ).execute(api.get_subscription_status(subscription_id=subscription.pk))
+        subscription.status = str(response.status)
+        return subscription
+
+    subscriptions = list(
+        queryset.select_related(None)
+        .select_related("customer_profile")
+        .only("pk", "status", "customer_profile__merchant_id", "plan")
+    )
+    previous = {s.pk: s.status for s in subscriptions}
+    results = run_concurrently(sync, subscriptions, **kwargs)
+    synced = [r.value for r in results if r.ok]
+    with transaction.atomic():
+        Subscription.objects.bulk_update(synced, ["status"])
+        record_status_changes([(s, previous[s.pk]) for s in synced])
+    caching.invalidate_subscriptions([s.pk for s in synced])
+    return results
+
+
+def bulk_sync_billing_start_dates(
+    queryset: QuerySet, service=None, **kwargs
+) -> list[BulkResult]:
+    """
+    Retrieves the Authorizenet billing start date of every subscription in ``queryset`` and saves them, and the trial end dates derived from them, with a single bulk update.
+
+    Backfills :py:attr:`~terminusgps_payments.models.Subscription.billing_starts_on` and :py:attr:`~terminusgps_payments.models.Subscription.trial_ends_on` for subscriptions created before they were recorded. Extra ``kwargs`` are passed to :py:func:`run_concurrently`.
+
+    """
+    get_service = services.get_merchant_services(throttling.BATCH, service)
+
+    def sync(subscription: Subscription) -> Subscription:
+        response = get_service(
+            subscription.customer_profile.merchant_id
+        ).execute(
+            api.get_subscription(
+                subscription_id=subscription.pk, include_transactions=False
+            )
+        )
+        start_date = str(response.subscription.paymentSchedule.startDate)
+        subscription.billing_starts_on = datetime.date.fromisoformat(
+            start_date[:10]
+        )
+        subscription.trial_ends_on = subscription.plan.get_trial_ends_on(
+            subscription.billing_starts_on
+        )
+        return subscription
+
+    subscriptions = list(queryset.select_related("plan", "customer_profile"))
+    results = run_concurrently(sync, subscriptions, **kwargs)
+    Subscription.objects.bulk_update(
+        [r.value for r in results if r.ok],
+        ["billing_starts_on", "trial_ends_on"],
+    )
+    return results
@@ -0,0 +1,290 @@
+import copy
+import logging
+import threading
+import time
+import typing
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "terminusgps_payments"
+FETCH_LOCK_TIMEOUT = 30
+FETCH_POLL_INTERVAL = 0.05
+PREFETCH_LOCK_TIMEOUT = 60
+PREFETCH_SUBSCRIPTION_LIMIT = 25
+
+T = typing.TypeVar("T")
+
+
+def get_timeout() -> int:
+    """Returns the ``AUTHORIZENET_CACHE_TIMEOUT`` setting in seconds, default ``300``."""
+    return int(getattr(settings, "AUTHORIZENET_CACHE_TIMEOUT", 300))
+
+
+def get_stale_timeout() -> int:
+    """Returns the ``AUTHORIZENET_CACHE_STALE_TIMEOUT`` setting in seconds, default ``60``."""
+    return int(getattr(settings, "AUTHORIZENET_CACHE_STALE_TIMEOUT", 60))
+
+
+def get_local_cache_size() -> int:
+    """Returns the ``AUTHORIZENET_LOCAL_CACHE_SIZE`` setting, default ``1024``."""
+    return int(getattr(settings, "AUTHORIZENET_LOCAL_CACHE_SIZE", 1024))
+
+
+def get_local_cache_timeout() -> float:
+    """Returns the ``AUTHORIZENET_LOCAL_CACHE_TIMEOUT`` setting in seconds, default ``5``."""
+    return float(getattr(settings, "AUTHORIZENET_LOCAL_CACHE_TIMEOUT", 5))
+
+
+class LocalCache:
+    """
+    A thread-safe, in-process LRU cache whose entries expire after ``timeout`` seconds.
+
+    Values are copied when they're set and again when they're returned, so threads never share a mutable object such as a model instance or an lxml tree.
+
+    :param max_size: Maximum number of entries before the least recently used one is evicted. Default is the ``AUTHORIZENET_LOCAL_CACHE_SIZE`` setting, read on every call.
+    :type max_size: int | None
+    :param timeout: Seconds an entry is kept. Default is the ``AUTHORIZENET_LOCAL_CACHE_TIMEOUT`` setting, read on every call.
+    :type timeout: float | None
+
+    """
+
+    def __init__(
+        self, max_size: int | None = None, timeout: float | None = None
+    ) -> None:
+        self.max_size = max_size
+        self.timeout = timeout
+        self._data: OrderedDict[str, tuple[typing.Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> typing.Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return
+            self._data.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def get_max_size(self) -> int:
+        return (
+            self.max_size
+            if self.max_size is not None
+            else get_local_cache_size()
+        )
+
+    def get_timeout(self) -> float:
+        return (
+            self.timeout
+            if self.timeout is not None
+            else get_local_cache_timeout()
+        )
+
+    def set(self, key: str, value: typing.Any) -> None:
+        if (max_size := self.get_max_size()) <= 0:
+            return
+        value = copy.deepcopy(value)
+        expires_at = time.monotonic() + self.get_timeout()
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > max_size:
+                self._data.popitem(last=False)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalCache()
+"""
+First cache tier, shared by every thread in the process.
+
+Other processes can't invalidate it, so its timeout (``AUTHORIZENET_LOCAL_CACHE_TIMEOUT``, default ``5``) bounds how long they may serve a value after it changed.
+
+"""
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: typing.Any = None
+        self.error: BaseException | None = None
+
+
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_customer_profile_key(customer_profile_id: int) -> str:
+    """Returns the cache key for a customer profile's Authorizenet response."""
+    return f"{KEY_PREFIX}:customer_profile:{customer_profile_id}"
+
+
+def get_subscription_key(subscription_id: int) -> str:
+    """Returns the cache key for a subscription's Authorizenet response."""
+    return f"{KEY_PREFIX}:subscription:{subscription_id}"
+
+
+def get_user_customer_profile_key(user_id: int) -> str:
+    """Returns the cache key for a user's :py:class:`~terminusgps_payments.models.CustomerProfile`."""
+    return f"{KEY_PREFIX}:user_customer_profile:{user_id}"
+
+
+def get_prefetch_lock_key(user_id: int) -> str:
+    """Returns the cache key held while a user's caches are being prefetched."""
+    return f"{KEY_PREFIX}:prefetch_lock:{user_id}"
+
+
+def get_fetch_lock_key(key: str) -> str:
+    """Returns the cache key held while ``key`` is being fetched."""
+    return f"{key}:lock"
+
+
+def get(key: str) -> typing.Any | None:
+    """Returns the cached value for ``key`` from either tier, fresh or stale, or :py:obj:`None`."""
+    value = local_cache.get(key)
+    if value is None and (entry := cache.get(key)) is not None:
+        value = entry[0]
+    return value
+
+
+def set_value(key: str, value: typing.Any) -> None:
+    """Caches ``value`` for ``key`` in both tiers."""
+    set_many({key: value})
+
+
+def set_many(data: Mapping[str, typing.Any]) -> None:
+    """
+    Caches every value in ``data`` in both tiers.
+
+    Shared entries are fresh for ``AUTHORIZENET_CACHE_TIMEOUT`` seconds and then served stale for up to ``AUTHORIZENET_CACHE_STALE_TIMEOUT`` seconds while they're refreshed.
+
+    """
+    fresh_until = time.time() + get_timeout()
+    cache.set_many(
+        {key: (value, fresh_until) for key, value in data.items()},
+        timeout=get_timeout() + get_stale_timeout(),
+    )
+    for key, value in data.items():
+        local_cache.set(key, value)
+
+
+def delete_many(keys: Iterable[str]) -> None:
+    """Deletes ``keys`` from both tiers."""
+    keys = list(keys)
+    local_cache.delete_many(keys)
+    cache.delete_many(keys)
+
+
+def _refresh(key: str, fetch: Callable[[], T]) -> T:
+    value = fetch()
+    if value is not None:
+        set_value(key, value)
+    return value
+
+
+def _get_or_fetch_shared(key: str, fetch: Callable[[], T]) -> T:
+    lock_key = get_fetch_lock_key(key)
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() < fresh_until:
+            local_cache.set(key, value)
+            return value
+        if not cache.add(lock_key, True, timeout=FETCH_LOCK_TIMEOUT):
+            return value
+        try:
+            return _refresh(key, fetch)
+        except Exception as error:
+            logger.warning(f"Serving stale '{key}', refresh failed: {error}")
+            return value
+        finally:
+            cache.delete(lock_key)
+    if cache.add(lock_key, True, timeout=FETCH_LOCK_TIMEOUT):
+        try:
+            return _refresh(key, fetch)
+        finally:
+            cache.delete(lock_key)
+    deadline = time.monotonic() + FETCH_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(FETCH_POLL_INTERVAL)
+        if (entry := cache.get(key)) is not None:
+            local_cache.set(key, entry[0])
+            return entry[0]
+        if cache.get(lock_key) is None:
+            break
+    return _refresh(key, fetch)
+
+
+def get_or_fetch(key: str, fetch: Callable[[], T]) -> T:
+    """
+    Returns the cached value for ``key``, or calls ``fetch`` and caches its result on a miss.
+
+    Values are looked up in the in-process :py:data:`local_cache` first, then in the shared Django cache. Concurrent misses for the same key collapse into a single call to ``fetch``: within a process, other threads wait for a copy of the first thread's result; across processes, a lock in the shared cache lets one process fetch while the others poll for its result. A stale shared value is returned immediately while one caller refreshes it, and is kept if the refresh fails.
+
+    Exceptions raised by ``fetch`` on a miss propagate and nothing is cached.
+
+    """
+    if (value := local_cache.get(key)) is not None:
+        return value
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return copy.deepcopy(flight.value)
+    try:
+        flight.value = _get_or_fetch_shared(key, fetch)
+        return flight.value
+    except BaseException as error:
+        flight.error = error
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+
+def invalidate_customer_profile(
+    customer_profile_id: int, subscription_ids: Iterable[int] = ()
+) -> None:
+    """Deletes the cached Authorizenet responses for a customer profile and its subscriptions."""
+    keys = [get_customer_profile_key(customer_profile_id)]
+    keys.extend(get_subscription_key(pk) for pk in subscription_ids)
+    delete_many(keys)
+
+
+def invalidate_subscriptions(subscription_ids: Iterable[int]) -> None:
+    """Deletes the cached Authorizenet responses for subscriptions."""
+    delete_many([get_subscription_key(pk) for pk in subscription_ids])
+
+
+def acquire_prefetch_lock(user_id: int) -> bool:
+    """Returns whether the caller may prefetch the user's caches, i.e. no other prefetch is running."""
+    return cache.add(
+        get_prefetch_lock_key(user_id), True, timeout=PREFETCH_LOCK_TIMEOUT
+    )
+
+
+def release_prefetch_lock(user_id: int) -> None:
+    cache.delete(get_prefetch_lock_key(user_id))
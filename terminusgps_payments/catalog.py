@@ -0,0 +1,55 @@
+import time
+import typing
+
+from django.core.cache import cache
+
+from terminusgps_payments import caching
+from terminusgps_payments.models import SubscriptionPlan
+
+VISIBLE = SubscriptionPlan.SubscriptionPlanVisibility.VISIBLE
+CATALOG_FIELDS = ("pk", "name", "amount", "description")
+"""Plan fields embedded in the catalog, the ones :py:class:`~terminusgps_payments.views.SubscriptionPlanDetailView` displays."""
+
+
+def get_version_key() -> str:
+    """Returns the cache key holding the current plan catalog version."""
+    return f"{caching.KEY_PREFIX}:plan_catalog_version"
+
+
+def get_catalog_key(version: int) -> str:
+    """Returns the cache key for a version of the plan catalog."""
+    return f"{caching.KEY_PREFIX}:plan_catalog:{version}"
+
+
+def get_version() -> int:
+    """Returns the current plan catalog version, starting a new one if there's none."""
+    return cache.get_or_set(get_version_key(), time.time_ns, timeout=None)
+
+
+def invalidate() -> None:
+    """Starts a new plan catalog version. Catalogs cached under older versions are never read again and expire."""
+    cache.set(get_version_key(), time.time_ns(), timeout=None)
+
+
+def build_catalog() -> list[dict[str, typing.Any]]:
+    """Returns the display fields of every visible plan, in select order."""
+    return list(
+        SubscriptionPlan.objects.filter(visibility=VISIBLE).values(
+            *CATALOG_FIELDS
+        )
+    )
+
+
+def get_catalog() -> dict[str, typing.Any]:
+    """
+    Returns the cached plan catalog, building it if its version isn't cached yet.
+
+    :returns: A dictionary with the catalog ``version`` and its ``plans``.
+    :rtype: dict[str, ~typing.Any]
+
+    """
+    version = get_version()
+    plans = cache.get_or_set(
+        get_catalog_key(version), build_catalog, timeout=caching.get_timeout()
+    )
+    return {"version": version, "plans": plans}
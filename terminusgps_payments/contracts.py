@@ -0,0 +1,71 @@
+from django.utils import timezone
+
+from terminusgps_payments.lazy import apicontractsv1
+from terminusgps_payments.models import SubscriptionPlan
+
+
+def build_profile_contract(
+    customer_profile_id: int | str,
+    payment_profile_id: int | str,
+    shipping_profile_id: int | str,
+) -> "apicontractsv1.customerProfileIdType":
+    """
+    Returns a customer profile id element pointing at a payment and shipping profile.
+
+    :param customer_profile_id: An Authorizenet customer profile id.
+    :type customer_profile_id: int | str
+    :param payment_profile_id: An Authorizenet customer payment profile id.
+    :type payment_profile_id: int | str
+    :param shipping_profile_id: An Authorizenet customer address id.
+    :type shipping_profile_id: int | str
+    :returns: An Authorizenet customerProfileIdType element.
+    :rtype: ~authorizenet.apicontractsv1.customerProfileIdType
+
+    """
+    profile = apicontractsv1.customerProfileIdType()
+    profile.customerProfileId = str(customer_profile_id)
+    profile.customerAddressId = str(shipping_profile_id)
+    profile.customerPaymentProfileId = str(payment_profile_id)
+    return profile
+
+
+def build_subscription_contract(
+    plan: SubscriptionPlan,
+    customer_profile_id: int | str,
+    payment_profile_id: int | str,
+    shipping_profile_id: int | str,
+    name: str | None = None,
+) -> "apicontractsv1.ARBSubscriptionType":
+    """
+    Returns a new ARB subscription element billed according to ``plan``.
+
+    :param plan: A subscription plan.
+    :type plan: ~terminusgps_payments.models.SubscriptionPlan
+    :param customer_profile_id: An Authorizenet customer profile id.
+    :type customer_profile_id: int | str
+    :param payment_profile_id: An Authorizenet customer payment profile id.
+    :type payment_profile_id: int | str
+    :param shipping_profile_id: An Authorizenet customer address id.
+    :type shipping_profile_id: int | str
+    :param name: An optional subscription name. Default is the plan name.
+    :type name: str | None
+    :returns: An Authorizenet ARBSubscriptionType element.
+    :rtype: ~authorizenet.apicontractsv1.ARBSubscriptionType
+
+    """
+    schedule = apicontractsv1.paymentScheduleType()
+    schedule.totalOccurrences = plan.total_occurrences
+    schedule.trialOccurrences = plan.trial_occurrences
+    schedule.startDate = timezone.now()
+    schedule.interval = apicontractsv1.paymentScheduleTypeInterval()
+    schedule.interval.length = plan.length
+    schedule.interval.unit = plan.unit
+    contract = apicontractsv1.ARBSubscriptionType()
+    contract.name = name or plan.name
+    contract.amount = plan.amount
+    contract.trialAmount = plan.trial_amount
+    contract.paymentSchedule = schedule
+    contract.profile = build_profile_contract(
+        customer_profile_id, payment_profile_id, shipping_profile_id
+    )
+    return contract
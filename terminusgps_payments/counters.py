@@ -0,0 +1,121 @@
+import logging
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+
+from django.db import router, transaction
+from django.db.models import Count, F, QuerySet
+
+from terminusgps_payments import caching
+from terminusgps_payments.models import CustomerProfile, Subscription
+
+COUNTER_FIELDS = {
+    status: f"{status}_subscription_count"
+    for status in Subscription.SubscriptionStatus.values
+}
+"""Maps each subscription status to its counter field on :py:class:`~terminusgps_payments.models.CustomerProfile`."""
+
+REPAIR_BATCH_SIZE = 1000
+logger = logging.getLogger(__name__)
+
+
+def apply_changes(changes: Iterable[tuple[int, str, str]]) -> None:
+    """
+    Adjusts the per-status subscription counters of customer profiles for saved subscription status changes.
+
+    Each affected customer profile is updated with a single ``UPDATE`` of ``F()`` expressions, so concurrent changes never overwrite each other, and its cached copy is dropped once the transaction commits. Call this in the same transaction that saved the changes.
+
+    Saving or deleting a single subscription calls this from the :py:mod:`~terminusgps_payments.signals` receivers, so only bulk writes, which don't send those signals, call it directly.
+
+    :param changes: ``(customer_profile_id, old_status, new_status)`` tuples. A new subscription's old status is ``""``, a deleted subscription's new status is ``""``.
+    :type changes: ~collections.abc.Iterable[tuple[int, str, str]]
+    :rtype: None
+
+    """
+    deltas: defaultdict[int, Counter] = defaultdict(Counter)
+    for customer_profile_id, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        if old_status in COUNTER_FIELDS:
+            deltas[customer_profile_id][COUNTER_FIELDS[old_status]] -= 1
+        if new_status in COUNTER_FIELDS:
+            deltas[customer_profile_id][COUNTER_FIELDS[new_status]] += 1
+    updated = []
+    for customer_profile_id, fields in deltas.items():
+        updates = {
+            field: F(field) + delta for field, delta in fields.items() if delta
+        }
+        if updates:
+            CustomerProfile.objects.filter(pk=customer_profile_id).update(
+                **updates
+            )
+            updated.append(customer_profile_id)
+    if updated:
+        invalidate_customer_profiles(updated)
+
+
+def invalidate_customer_profiles(customer_profile_ids: list[int]) -> None:
+    """Drops the cached copies of customer profiles, see :py:meth:`~terminusgps_payments.mixins.CustomerProfileMixin.get_customer_profile`, after the current transaction commits."""
+    using = router.db_for_write(CustomerProfile)
+    keys = [
+        caching.get_user_customer_profile_key(user_id)
+        for user_id in CustomerProfile.objects.using(using)
+        .filter(pk__in=customer_profile_ids)
+        .values_list("user_id", flat=True)
+    ]
+    transaction.on_commit(lambda: caching.delete_many(keys), using=using)
+
+
+def repair(
+    queryset: QuerySet | None = None, batch_size: int = REPAIR_BATCH_SIZE
+) -> int:
+    """
+    Recomputes the subscription counters of the customer profiles in ``queryset`` from the subscriptions table.
+
+    Subscriptions are counted per customer profile and status with a single grouped query, then the counters are reset and rewritten in one transaction.
+
+    :param queryset: Customer profiles to repair. Default is every customer profile.
+    :type queryset: ~django.db.models.QuerySet | None
+    :param batch_size: Customer profiles written per query. Default is ``1000``.
+    :type batch_size: int
+    :returns: Number of customer profiles whose counters were corrected.
+    :rtype: int
+
+    """
+    subscriptions = Subscription.objects.filter(status__in=COUNTER_FIELDS)
+    if queryset is None:
+        queryset = CustomerProfile.objects.all()
+    else:
+        subscriptions = subscriptions.filter(
+            customer_profile__in=queryset.values("pk")
+        )
+    counts: defaultdict[int, dict[str, int]] = defaultdict(dict)
+    rows = (
+        subscriptions.values_list("customer_profile", "status")
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+    for customer_profile_id, status, count in rows:
+        counts[customer_profile_id][COUNTER_FIELDS[status]] = count
+    fields = list(COUNTER_FIELDS.values())
+    with transaction.atomic():
+        stale = [
+            profile
+            for profile in queryset.select_related(None)
+            .select_for_update()
+            .only("pk", *fields)
+            if any(
+                getattr(profile, field) != counts[profile.pk].get(field, 0)
+                for field in fields
+            )
+        ]
+        for profile in stale:
+            for field in fields:
+                setattr(profile, field, counts[profile.pk].get(field, 0))
+        CustomerProfile.objects.bulk_update(
+            stale, fields, batch_size=batch_size
+        )
+    if stale:
+        logger.warning(
+            f"Repaired subscription counters of {len(stale)} customer profile(s)."
+        )
+    return len(stale)
@@ -0,0 +1,155 @@
+import csv
+import logging
+import typing
+from collections.abc import Iterable, Iterator, Sequence
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+from terminusgps_payments import services, throttling
+from terminusgps_payments.lazy import api, authorizenet_service
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 2000
+
+SUBSCRIPTION_CSV_HEADER = (
+    "id",
+    "status",
+    "expires_on",
+    "customer_profile_id",
+    "customer_email",
+    "merchant_id",
+    "plan_id",
+    "plan_name",
+    "plan_amount",
+    "plan_length",
+    "plan_unit",
+)
+
+TRANSACTION_CSV_HEADER = (
+    "subscription_id",
+    "trans_id",
+    "response",
+    "submit_time_utc",
+    "pay_num",
+    "attempt_num",
+)
+
+
+class Echo:
+    """A file-like object that returns written values instead of buffering them."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def stream_csv(
+    header: Sequence[str], rows: Iterable[Sequence[typing.Any]]
+) -> Iterator[str]:
+    """Yields each row of ``rows`` as an encoded CSV line, starting with ``header``."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def get_subscription_export_queryset(queryset: QuerySet) -> QuerySet:
+    """Returns ``queryset`` prepared for a constant-memory export."""
+    return queryset.select_related("plan", "customer_profile__user").order_by(
+        "pk"
+    )
+
+
+def iter_subscription_rows(
+    queryset: QuerySet, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[tuple]:
+    """Yields a CSV row for each subscription in ``queryset``."""
+    queryset = get_subscription_export_queryset(queryset)
+    for sub in queryset.iterator(chunk_size=chunk_size):
+        yield (
+            sub.pk,
+            sub.status,
+            sub.expires_on.isoformat() if sub.expires_on else "",
+            sub.customer_profile_id,
+            sub.customer_profile.user.email,
+            sub.customer_profile.merchant_id,
+            sub.plan_id,
+            sub.plan.name,
+            sub.plan.amount,
+            sub.plan.length,
+            sub.plan.unit,
+        )
+
+
+def iter_transaction_rows(
+    queryset: QuerySet, service=None, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[tuple]:
+    """
+    Yields a CSV row for each ARB transaction of each subscription in ``queryset``.
+
+    Transactions are retrieved from Authorizenet one subscription at a time, so the first rows are sent before the whole queryset has been read. Default ``service`` is each customer's merchant service with batch priority.
+
+    """
+    get_service = services.get_merchant_services(throttling.BATCH, service)
+    queryset = (
+        queryset.select_related(None)
+        .select_related("customer_profile")
+        .only("pk", "customer_profile__merchant_id")
+        .order_by("pk")
+    )
+    for sub in queryset.iterator(chunk_size=chunk_size):
+        try:
+            response = get_service(sub.customer_profile.merchant_id).execute(
+                api.get_subscription(
+                    subscription_id=sub.pk, include_transactions=True
+                )
+            )
+        except authorizenet_service.AuthorizenetError as error:
+            logger.warning(
+                f"Couldn't export transactions for subscription #{sub.pk}: {error}"
+            )
+            continue
+        transactions = getattr(response.subscription, "arbTransactions", None)
+        if transactions is None:
+            continue
+        for t in getattr(transactions, "arbTransaction", []):
+            yield (
+                sub.pk,
+                getattr(t, "transId", ""),
+                getattr(t, "response", ""),
+                getattr(t, "submitTimeUTC", ""),
+                getattr(t, "payNum", ""),
+                getattr(t, "attemptNum", ""),
+            )
+
+
+def csv_response(
+    filename: str, header: Sequence[str], rows: Iterable[Sequence[typing.Any]]
+) -> StreamingHttpResponse:
+    """Returns a streaming CSV attachment response for ``rows``."""
+    return StreamingHttpResponse(
+        stream_csv(header, rows),
+        content_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def subscription_csv_response(
+    queryset: QuerySet, filename: str = "subscriptions.csv"
+) -> StreamingHttpResponse:
+    """Returns a streaming CSV export of the subscriptions in ``queryset``."""
+    return csv_response(
+        filename, SUBSCRIPTION_CSV_HEADER, iter_subscription_rows(queryset)
+    )
+
+
+def transaction_csv_response(
+    queryset: QuerySet, service=None, filename: str = "transactions.csv"
+) -> StreamingHttpResponse:
+    """Returns a streaming CSV export of the ARB transactions for the subscriptions in ``queryset``."""
+    return csv_response(
+        filename,
+        TRANSACTION_CSV_HEADER,
+        iter_transaction_rows(queryset, service),
+    )
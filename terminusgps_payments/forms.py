@@ -1,12 +1,14 @@
+import abc
 import typing
 from datetime import date
 
-from authorizenet import apicontractsv1
 from django import forms
 from django.core.exceptions import ValidationError
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 
+from terminusgps_payments import serializers
+from terminusgps_payments.lazy import apicontractsv1
 from terminusgps_payments.models import Subscription, SubscriptionPlan
 
 
@@ -32,21 +34,44 @@ def luhn_check(card_number: str) -> bool:
 
 class AuthorizenetContractForm(forms.Form):
     contract_cls = None
+    """An Authorizenet contract class, or the name of one in :py:mod:`authorizenet.apicontractsv1`."""
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if getattr(cls.get_elements, "__isabstractmethod__", False):
+            raise TypeError(f"{cls.__name__} must implement get_elements().")
+
+    def get_contract_cls(self):
+        if isinstance(self.contract_cls, str):
+            return getattr(apicontractsv1, self.contract_cls)
+        return self.contract_cls
 
     def build_contract(self):
         if self.contract_cls is None:
             raise ValueError("'contract_cls' wasn't set.")
         if not self.is_valid():
             raise ValueError("Form was invalid.")
-        contract = self.contract_cls()
+        contract = self.get_contract_cls()()
         for field, value in self.cleaned_data.items():
             if value:
                 setattr(contract, field, value)
         return contract
 
+    @abc.abstractmethod
+    def get_elements(
+        self, cleaned_data: dict[str, typing.Any]
+    ) -> list[serializers.Element]:
+        """Returns the elements of :py:attr:`contract_cls` for ``cleaned_data``, in schema order. Subclasses that don't implement this raise :py:exc:`TypeError` when they're defined."""
+
+    def build_elements(self) -> list[serializers.Element]:
+        """Returns the same contract as :py:meth:`build_contract` as :py:mod:`~terminusgps_payments.serializers` elements."""
+        if not self.is_valid():
+            raise ValueError("Form was invalid.")
+        return self.get_elements(self.cleaned_data)
+
 
 class AddressForm(AuthorizenetContractForm):
-    contract_cls = apicontractsv1.customerAddressType
+    contract_cls = "customerAddressType"
 
     firstName = forms.CharField(max_length=50)
     lastName = forms.CharField(max_length=50)
@@ -59,9 +84,15 @@ class AddressForm(AuthorizenetContractForm):
     phoneNumber = forms.CharField(max_length=25, required=False)
     faxNumber = forms.CharField(max_length=25, required=False)
 
+    @typing.override
+    def get_elements(
+        self, cleaned_data: dict[str, typing.Any]
+    ) -> list[serializers.Element]:
+        return serializers.build_address(cleaned_data)
+
 
 class CreditCardForm(AuthorizenetContractForm):
-    contract_cls = apicontractsv1.creditCardType
+    contract_cls = "creditCardType"
 
     cardNumber = forms.CharField(max_length=16, min_length=13)
     cardCode = forms.CharField(max_length=4, min_length=3)
@@ -76,12 +107,18 @@ class CreditCardForm(AuthorizenetContractForm):
         cardNumber = self.cleaned_data["cardNumber"]
         cardCode = self.cleaned_data["cardCode"]
         expirationDate = self.cleaned_data["expirationDate"]
-        contract = self.contract_cls()
+        contract = self.get_contract_cls()()
         contract.cardNumber = cardNumber
         contract.cardCode = cardCode
         contract.expirationDate = expirationDate.strftime("%Y-%m")
         return contract
 
+    @typing.override
+    def get_elements(
+        self, cleaned_data: dict[str, typing.Any]
+    ) -> list[serializers.Element]:
+        return serializers.build_credit_card(cleaned_data)
+
     def clean(self):
         cleaned_data = super().clean()
         if cleaned_data:
@@ -105,7 +142,7 @@ class CreditCardForm(AuthorizenetContractForm):
 
 
 class BankAccountForm(AuthorizenetContractForm):
-    contract_cls = apicontractsv1.bankAccountType
+    contract_cls = "bankAccountType"
 
     accountType = forms.ChoiceField(
         choices=[
@@ -125,6 +162,12 @@ class BankAccountForm(AuthorizenetContractForm):
         contract.echeckType = "PPD"
         return contract
 
+    @typing.override
+    def get_elements(
+        self, cleaned_data: dict[str, typing.Any]
+    ) -> list[serializers.Element]:
+        return serializers.build_bank_account(cleaned_data)
+
 
 class CreateSubscriptionForm(forms.ModelForm):
     payment_profile = forms.ChoiceField(choices=[])
@@ -136,7 +179,7 @@ class CreateSubscriptionForm(forms.ModelForm):
                 "hx-get": reverse_lazy(
                     "terminusgps_payments:subscription plan details"
                 ),
-                "hx-trigger": "load, change",
+                "hx-trigger": "change[!renderSubscriptionPlan(target.value)]",
                 "hx-target": "#subscription-plan",
             }
         ),
@@ -147,14 +190,86 @@ class CreateSubscriptionForm(forms.ModelForm):
         fields = ["plan"]
 
 
+class BulkCreateSubscriptionForm(forms.Form):
+    max_quantity = 500
+
+    plan = forms.ModelChoiceField(queryset=SubscriptionPlan.objects.all())
+    quantity = forms.IntegerField(min_value=1, required=False)
+    units = forms.CharField(
+        help_text=_("One unit name per line. Overrides quantity."),
+        required=False,
+        widget=forms.widgets.Textarea,
+    )
+    payment_profile = forms.ChoiceField(choices=[])
+    shipping_profile = forms.ChoiceField(choices=[])
+
+    def clean_units(self) -> list[str]:
+        units = self.cleaned_data.get("units", "")
+        return [line.strip() for line in units.splitlines() if line.strip()]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data:
+            units = cleaned_data.get("units")
+            quantity = len(units) if units else cleaned_data.get("quantity")
+            if not quantity:
+                raise ValidationError(
+                    _("Provide a quantity or a list of units."),
+                    code="required",
+                )
+            if quantity > self.max_quantity:
+                raise ValidationError(
+                    _(
+                        "Cannot create more than %(max)s subscriptions at once."
+                    ),
+                    code="invalid",
+                    params={"max": self.max_quantity},
+                )
+            cleaned_data["quantity"] = quantity
+        return cleaned_data
+
+    def get_subscription_names(self) -> list[str]:
+        """Returns an Authorizenet subscription name for each subscription to create."""
+        plan = self.cleaned_data["plan"]
+        if units := self.cleaned_data["units"]:
+            return [f"{plan.name} - {unit}"[:50] for unit in units]
+        return [plan.name] * self.cleaned_data["quantity"]
+
+
+class PaymentProfileImportForm(forms.Form):
+    file = forms.FileField(
+        help_text=_(
+            "A CSV file of credit cards, bank accounts and shipping addresses."
+        )
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        if not file.name.lower().endswith(".csv"):
+            raise ValidationError(
+                _("File must be a CSV file."), code="invalid"
+            )
+        return file
+
+
 class UpdateSubscriptionForm(forms.Form):
     payment_profile = forms.ChoiceField(choices=[])
     shipping_profile = forms.ChoiceField(choices=[])
 
 
 class SubscriptionProfileForm(AuthorizenetContractForm):
-    contract_cls = apicontractsv1.customerProfileIdType
+    contract_cls = "customerProfileIdType"
 
     customerProfileId = forms.CharField(max_length=17)
     customerAddressId = forms.CharField(max_length=17)
     customerPaymentProfileId = forms.CharField(max_length=17)
+
+    @typing.override
+    def get_elements(
+        self, cleaned_data: dict[str, typing.Any]
+    ) -> list[serializers.Element]:
+        return serializers.build_profile(
+            cleaned_data["customerProfileId"],
+            cleaned_data["customerPaymentProfileId"],
+            cleaned_data["customerAddressId"],
+        )
@@ -0,0 +1,113 @@
+import typing
+
+from lxml.objectify import ObjectifiedElement
+from terminusgps.authorizenet.service import (
+    AuthorizenetError,
+    AuthorizenetService,
+)
+
+from terminusgps_payments import recording, throttling, tracing
+
+if typing.TYPE_CHECKING:
+    from terminusgps_payments.pools import MerchantPool
+
+
+class RateLimitExceeded(AuthorizenetError):
+    """Raised when a rate limit bucket had no tokens left within its maximum wait."""
+
+    def __init__(self, bucket: str, *args, **kwargs) -> None:
+        super().__init__(
+            f"Too many Authorizenet API requests ({bucket}), please try again.",
+            "RATE_LIMITED",
+            *args,
+            **kwargs,
+        )
+
+
+class PoolExhausted(AuthorizenetError):
+    """Raised when a merchant pool had no free connection within its acquire timeout."""
+
+    def __init__(self, merchant_id: str, *args, **kwargs) -> None:
+        super().__init__(
+            f"Too many concurrent Authorizenet API requests ({merchant_id}), please try again.",
+            "POOL_EXHAUSTED",
+            *args,
+            **kwargs,
+        )
+
+
+class RateLimitedAuthorizenetService(AuthorizenetService):
+    """
+    Takes a token from the shared rate limit bucket for :py:attr:`priority` before every Authorizenet API call.
+
+    See :py:func:`~terminusgps_payments.throttling.get_bucket`.
+
+    """
+
+    def __init__(self, priority: str = throttling.INTERACTIVE) -> None:
+        self.priority = priority
+
+    def get_bucket(self) -> throttling.TokenBucket | None:
+        return throttling.get_bucket(self.priority)
+
+    @typing.override
+    def execute(
+        self, request_tuple: tuple, reference_id: str | None = None
+    ) -> ObjectifiedElement:
+        with tracing.span("authorizenet.execute", "gateway") as span:
+            if span is not None:
+                span.attributes["operation"] = recording.get_operation(
+                    request_tuple[1]
+                )
+                span.attributes["priority"] = self.priority
+            if (bucket := self.get_bucket()) is not None:
+                bucket.acquire()
+            if (recorder := recording.get_recorder()) is None:
+                return super().execute(
+                    request_tuple, reference_id=reference_id
+                )
+            try:
+                response = super().execute(
+                    request_tuple, reference_id=reference_id
+                )
+            except AuthorizenetError as error:
+                recorder.record(*request_tuple[:2], error=error)
+                raise
+            recorder.record(*request_tuple[:2], response=response)
+            return response
+
+
+class PooledAuthorizenetService(RateLimitedAuthorizenetService):
+    """
+    Executes Authorizenet API calls with a merchant pool's credentials, connection limit and rate limit buckets.
+
+    See :py:class:`~terminusgps_payments.pools.MerchantPool`.
+
+    """
+
+    def __init__(
+        self, pool: "MerchantPool", priority: str = throttling.INTERACTIVE
+    ) -> None:
+        super().__init__(priority=priority)
+        self.pool = pool
+
+    @property
+    def merchantAuthentication(self):
+        return self.pool.merchant_authentication
+
+    @property
+    def environment(self) -> str:
+        return self.pool.environment
+
+    @typing.override
+    def get_bucket(self) -> throttling.TokenBucket | None:
+        return throttling.get_bucket(
+            self.priority, namespace=self.pool.merchant_id
+        )
+
+    @typing.override
+    def execute(
+        self, request_tuple: tuple, reference_id: str | None = None
+    ) -> ObjectifiedElement:
+        with self.pool.connection():
+            return super().execute(request_tuple, reference_id=reference_id)
@@ -0,0 +1,301 @@
+import csv
+import dataclasses
+import functools
+import logging
+import os
+import time
+import typing
+import uuid
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.forms import Form
+
+from terminusgps_payments import (
+    bulk,
+    caching,
+    forms,
+    serializers,
+    services,
+    throttling,
+)
+from terminusgps_payments.models import CustomerProfile
+
+logger = logging.getLogger(__name__)
+
+CREDIT_CARD = "credit_card"
+BANK_ACCOUNT = "bank_account"
+ADDRESS = "address"
+
+IMPORT_FORMS: dict[str, tuple[type[Form], ...]] = {
+    CREDIT_CARD: (forms.AddressForm, forms.CreditCardForm),
+    BANK_ACCOUNT: (forms.AddressForm, forms.BankAccountForm),
+    ADDRESS: (forms.AddressForm,),
+}
+"""Forms validating each type of import row."""
+
+IMPORT_CSV_HEADER = (
+    "customer_profile_id",
+    "type",
+    *serializers.ADDRESS_FIELDS,
+    "cardNumber",
+    "cardCode",
+    "expirationDate",
+    "accountType",
+    "accountNumber",
+    "routingNumber",
+    "nameOnAccount",
+    "bankName",
+)
+"""Columns of an import file. Only ``customer_profile_id``, ``type`` and the fields required by the row's type need values."""
+
+RESULT_CSV_HEADER = (
+    "line",
+    "customer_profile_id",
+    "type",
+    "status",
+    "id",
+    "error",
+)
+
+CREATED = "created"
+INVALID = "invalid"
+FAILED = "failed"
+
+PROFILE_CACHE_SIZE = 4096
+RESULT_SUFFIX = ".csv"
+
+
+def get_import_dir() -> Path:
+    """Returns the ``PAYMENTS_IMPORT_DIR`` setting, the directory import result files are written to, default ``"payments-imports"``."""
+    return Path(getattr(settings, "PAYMENTS_IMPORT_DIR", "payments-imports"))
+
+
+@dataclasses.dataclass
+class ImportRow:
+    """A validated import row and the request creating it in Authorizenet."""
+
+    line: int
+    customer_profile: CustomerProfile
+    type: str
+    request: tuple[typing.Any, type]
+
+
+@dataclasses.dataclass
+class ImportResult:
+    """The outcome of an import row."""
+
+    line: int
+    customer_profile_id: str
+    type: str
+    status: str
+    id: str = ""
+    error: str = ""
+
+    def to_row(self) -> tuple:
+        return (
+            self.line,
+            self.customer_profile_id,
+            self.type,
+            self.status,
+            self.id,
+            self.error,
+        )
+
+
+def format_errors(form: Form) -> str:
+    return "; ".join(
+        f"{field}: {' '.join(messages)}"
+        for field, messages in form.errors.items()
+    )
+
+
+def build_request(
+    customer_profile_id: int, row_type: str, validated: Mapping[str, Form]
+) -> tuple[typing.Any, type]:
+    """Returns the request creating a validated row, the same request :py:class:`~terminusgps_payments.views.AddCreditCardView` and :py:class:`~terminusgps_payments.views.AddBankAccountView` make."""
+    address = validated["addressform"].build_elements()
+    if row_type == ADDRESS:
+        return serializers.create_customer_shipping_address(
+            customer_profile_id=customer_profile_id, address=address
+        )
+    if row_type == CREDIT_CARD:
+        payment = [
+            ("creditCard", validated["creditcardform"].build_elements())
+        ]
+    else:
+        payment = [
+            ("bankAccount", validated["bankaccountform"].build_elements())
+        ]
+    return serializers.create_customer_payment_profile(
+        customer_profile_id=customer_profile_id,
+        bill_to=address,
+        payment=payment,
+    )
+
+
+def validate_row(
+    line: int,
+    data: Mapping[str, str],
+    get_customer_profile: Callable[[int], CustomerProfile | None],
+) -> ImportRow:
+    """
+    Validates an import row with the forms for its type in :py:data:`IMPORT_FORMS`.
+
+    :raises ValidationError: If the row was invalid. The message lists every invalid field.
+    :returns: The validated row.
+    :rtype: ~terminusgps_payments.imports.ImportRow
+
+    """
+    row_type = (data.get("type") or "").strip()
+    if row_type not in IMPORT_FORMS:
+        raise ValidationError(f"type: Invalid type '{row_type}'.")
+    profile_id = (data.get("customer_profile_id") or "").strip()
+    if not profile_id.isdigit():
+        raise ValidationError(
+            f"customer_profile_id: Invalid customer profile id '{profile_id}'."
+        )
+    if (profile := get_customer_profile(int(profile_id))) is None:
+        raise ValidationError(
+            f"customer_profile_id: Customer profile #{profile_id} doesn't exist."
+        )
+    data = {field: (value or "").strip() for field, value in data.items()}
+    validated = {
+        form_cls.__name__.lower(): form_cls(data=data)
+        for form_cls in IMPORT_FORMS[row_type]
+    }
+    if errors := [
+        format_errors(form)
+        for form in validated.values()
+        if not form.is_valid()
+    ]:
+        raise ValidationError("; ".join(errors))
+    return ImportRow(
+        line=line,
+        customer_profile=profile,
+        type=row_type,
+        request=build_request(profile.pk, row_type, validated),
+    )
+
+
+def get_created_id(response) -> str:
+    for tag in ("customerPaymentProfileId", "customerAddressId"):
+        if (value := getattr(response, tag, None)) is not None:
+            return str(value)
+    return ""
+
+
+def import_rows(
+    rows: Iterable[Mapping[str, str]], service=None, **kwargs
+) -> Iterator[ImportResult]:
+    """
+    Creates a payment profile or shipping address in Authorizenet for each valid row in ``rows``, yielding a result for every row in order.
+
+    Rows are validated as they're read and valid rows are submitted concurrently under the service's rate limit, so a stream of any length is imported in constant memory. Invalid rows aren't submitted and don't count against the rate limit.
+
+    Extra ``kwargs`` are passed to :py:func:`~terminusgps_payments.bulk.iter_concurrently`.
+
+    :param rows: Import rows, e.g. from a :py:class:`csv.DictReader`. See :py:data:`IMPORT_CSV_HEADER`.
+    :type rows: ~collections.abc.Iterable[~collections.abc.Mapping[str, str]]
+    :param service: An Authorizenet service. Default is each customer's merchant service with batch priority.
+    :yields: A result for each row.
+    :ytype: ~terminusgps_payments.imports.ImportResult
+
+    """
+
+    @functools.lru_cache(maxsize=PROFILE_CACHE_SIZE)
+    def get_customer_profile(pk: int) -> CustomerProfile | None:
+        return CustomerProfile.objects.filter(pk=pk).first()
+
+    get_service = services.get_merchant_services(throttling.BATCH, service)
+
+    def validate(rows: Iterable[Mapping[str, str]]):
+        for line, data in enumerate(rows, start=2):
+            try:
+                yield validate_row(line, data, get_customer_profile)
+            except ValidationError as error:
+                yield ImportResult(
+                    line=line,
+                    customer_profile_id=data.get("customer_profile_id") or "",
+                    type=data.get("type") or "",
+                    status=INVALID,
+                    error=" ".join(error.messages),
+                )
+
+    def submit(item: ImportRow | ImportResult):
+        if isinstance(item, ImportResult):
+            return item
+        profile = item.customer_profile
+        response = get_service(profile.merchant_id).execute(item.request)
+        caching.invalidate_customer_profile(profile.pk)
+        return get_created_id(response)
+
+    for result in bulk.iter_concurrently(submit, validate(rows), **kwargs):
+        item = result.item
+        if isinstance(item, ImportResult):
+            yield item
+            continue
+        outcome = ImportResult(
+            line=item.line,
+            customer_profile_id=str(item.customer_profile.pk),
+            type=item.type,
+            status=CREATED if result.ok else FAILED,
+            id=(result.value or "") if result.ok else "",
+            error=str(result.error) if result.error else "",
+        )
+        if not result.ok:
+            logger.warning(f"Couldn't import line {item.line}: {result.error}")
+        yield outcome
+
+
+def import_csv(file: typing.TextIO, **kwargs) -> Iterator[ImportResult]:
+    """Imports the rows of a CSV file with :py:func:`import_rows`. The file must start with a header row, see :py:data:`IMPORT_CSV_HEADER`."""
+    yield from import_rows(csv.DictReader(file), **kwargs)
+
+
+def iter_result_rows(results: Iterable[ImportResult]) -> Iterator[tuple]:
+    """Yields a CSV row for each import result."""
+    for result in results:
+        yield result.to_row()
+
+
+def new_result_name() -> str:
+    """Returns a unique name for an import's result file."""
+    return f"{time.time_ns()}-{uuid.uuid4().hex[:8]}{RESULT_SUFFIX}"
+
+
+def write_results(
+    name: str, results: Iterable[ImportResult], directory: Path | None = None
+) -> Path:
+    """
+    Writes a CSV row for each import result to the result file ``name`` in the import directory.
+
+    Rows are written to a temporary file that replaces the result file once every result was written, so a result file only exists for a finished import. The temporary file is deleted if the import fails.
+
+    """
+    directory = directory or get_import_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / name
+    tmp = path.with_suffix(".tmp")
+    try:
+        with tmp.open("w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(RESULT_CSV_HEADER)
+            writer.writerows(iter_result_rows(results))
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def get_result_path(name: str, directory: Path | None = None) -> Path:
+    """Returns the path of a finished import's result file. Raises :py:exc:`FileNotFoundError` if there's no such file."""
+    directory = directory or get_import_dir()
+    if Path(name).name != name or not name.endswith(RESULT_SUFFIX):
+        raise FileNotFoundError(name)
+    if not (path := directory / name).is_file():
+        raise FileNotFoundError(name)
+    return path
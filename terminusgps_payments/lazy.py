@@ -0,0 +1,30 @@
+import importlib
+import types
+
+from django.utils.functional import SimpleLazyObject
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """
+    Returns a proxy for the module ``name`` that imports it on first attribute access.
+
+    :param name: A dotted module path.
+    :type name: str
+    :returns: A lazy module proxy.
+    :rtype: ~types.ModuleType
+
+    """
+    return SimpleLazyObject(lambda: importlib.import_module(name))
+
+
+api = lazy_module("terminusgps.authorizenet.api")
+"""Lazy :py:mod:`terminusgps.authorizenet.api`."""
+
+apicontractsv1 = lazy_module("authorizenet.apicontractsv1")
+"""Lazy :py:mod:`authorizenet.apicontractsv1`, the generated PyXB contract bindings."""
+
+authorizenet_service = lazy_module("terminusgps.authorizenet.service")
+"""Lazy :py:mod:`terminusgps.authorizenet.service`."""
+
+apicontrollers = lazy_module("authorizenet.apicontrollers")
+"""Lazy :py:mod:`authorizenet.apicontrollers`."""
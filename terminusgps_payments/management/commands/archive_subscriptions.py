@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from terminusgps_payments import archive
+
+
+class Command(BaseCommand):
+    help = "Moves subscriptions finished longer ago than the retention window into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            help="Days a finished subscription is kept. Default is the SUBSCRIPTION_ARCHIVE_RETENTION_DAYS setting.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=archive.ARCHIVE_BATCH_SIZE,
+            help="Subscriptions moved per transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches.",
+        )
+
+    def handle(self, *args, **options):
+        count = archive.archive_subscriptions(
+            retention_days=options["retention_days"],
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+        )
+        self.stdout.write(f"Archived {count} subscription(s).")
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from terminusgps_payments import outbox
+
+
+class Command(BaseCommand):
+    help = "Dispatches pending outbox events to their handlers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=outbox.DISPATCH_BATCH_SIZE,
+            help="Events per transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running, polling for new events every INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            dispatched = outbox.dispatch_all(batch_size=options["batch_size"])
+            if dispatched:
+                self.stdout.write(f"Dispatched {dispatched} event(s).")
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,31 @@
+import datetime
+import decimal
+
+from django.core.management.base import BaseCommand
+
+from terminusgps_payments import schedule
+
+
+class Command(BaseCommand):
+    help = "Prints the charges scheduled for active subscriptions each day, computed from their billing schedules."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=90, help="Days to forecast."
+        )
+        parser.add_argument(
+            "--since",
+            type=datetime.date.fromisoformat,
+            help="First day to forecast (YYYY-MM-DD). Default is today.",
+        )
+
+    def handle(self, *args, **options):
+        days = schedule.forecast(days=options["days"], since=options["since"])
+        for day in days:
+            self.stdout.write(
+                f"{day.date.isoformat()}\t{day.charges}\t{day.amount}"
+            )
+        total = sum((day.amount for day in days), decimal.Decimal("0.00"))
+        self.stdout.write(
+            f"Forecast {sum(day.charges for day in days)} charge(s) totaling {total}."
+        )
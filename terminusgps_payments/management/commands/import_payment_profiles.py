@@ -0,0 +1,42 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from terminusgps_payments import imports
+
+
+class Command(BaseCommand):
+    help = "Adds the credit cards, bank accounts and shipping addresses in a CSV file to their customer profiles in Authorizenet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import.")
+        parser.add_argument(
+            "--results",
+            help="CSV file to write a result for each row to. Default is the imported file's path with a '.results.csv' suffix.",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            help="Maximum number of concurrent Authorizenet calls. Default is the AUTHORIZENET_MAX_WORKERS setting.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        results_path = options["results"] or f"{path}.results.csv"
+        counts = {imports.CREATED: 0, imports.INVALID: 0, imports.FAILED: 0}
+        with (
+            open(path, newline="", encoding="utf-8-sig") as file,
+            open(results_path, "w", newline="") as results_file,
+        ):
+            writer = csv.writer(results_file)
+            writer.writerow(imports.RESULT_CSV_HEADER)
+            for result in imports.import_csv(
+                file, max_workers=options["max_workers"]
+            ):
+                writer.writerow(result.to_row())
+                counts[result.status] += 1
+        self.stdout.write(
+            f"Created {counts[imports.CREATED]}, "
+            f"{counts[imports.INVALID]} invalid, "
+            f"{counts[imports.FAILED]} failed. Results written to {results_path}."
+        )
@@ -0,0 +1,60 @@
+import decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from terminusgps_payments import pricing, tasks
+from terminusgps_payments.models import SubscriptionPlan
+
+
+class Command(BaseCommand):
+    help = "Updates the amount of every active subscription on a plan, resuming an unfinished migration if there is one."
+
+    def add_arguments(self, parser):
+        parser.add_argument("plan", type=int, help="Subscription plan id.")
+        parser.add_argument(
+            "--amount",
+            type=decimal.Decimal,
+            help="New subscription amount. Default is the plan's current amount.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=pricing.MIGRATION_BATCH_SIZE,
+            help="Subscriptions per checkpoint.",
+        )
+        parser.add_argument(
+            "--max-workers", type=int, help="Concurrent gateway calls."
+        )
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Run the migration as a background task.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            plan = SubscriptionPlan.objects.get(pk=options["plan"])
+        except SubscriptionPlan.DoesNotExist:
+            raise CommandError(f"Plan #{options['plan']} doesn't exist.")
+        migration, created = pricing.get_or_create_plan_price_migration(
+            plan, amount=options["amount"]
+        )
+        verb = "Starting" if created else "Resuming"
+        self.stdout.write(
+            f"{verb} migration #{migration.pk} after subscription #{migration.last_subscription_id}."
+        )
+        kwargs = {"batch_size": options["batch_size"]}
+        if options["max_workers"] is not None:
+            kwargs["max_workers"] = options["max_workers"]
+        if options["enqueue"]:
+            result = tasks.run_plan_price_migration.enqueue(
+                migration_pk=migration.pk, **kwargs
+            )
+            self.stdout.write(f"Enqueued task {result.id}.")
+            return
+        migration = pricing.run_plan_price_migration(migration, **kwargs)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated {migration.updated_count} subscription(s), {len(migration.failed_ids)} failed."
+            )
+        )
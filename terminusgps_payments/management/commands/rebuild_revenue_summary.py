@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from terminusgps_payments import revenue
+
+
+class Command(BaseCommand):
+    help = "Recomputes today's per-plan revenue summaries from the subscriptions table."
+
+    def handle(self, *args, **options):
+        count = revenue.rebuild()
+        self.stdout.write(
+            f"Rebuilt {count} revenue summar{'y' if count == 1 else 'ies'}."
+        )
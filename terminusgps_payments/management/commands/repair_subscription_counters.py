@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from terminusgps_payments import counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes the per-status subscription counters of every customer profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=counters.REPAIR_BATCH_SIZE,
+            help="Customer profiles written per query.",
+        )
+
+    def handle(self, *args, **options):
+        repaired = counters.repair(batch_size=options["batch_size"])
+        self.stdout.write(f"Repaired {repaired} customer profile(s).")
@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from terminusgps_payments import reminders
+
+
+class Command(BaseCommand):
+    help = "Emails customers a digest of their subscriptions expiring or leaving their trial soon."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=datetime.date.fromisoformat,
+            help="Remind about subscriptions due on DATE (YYYY-MM-DD). Default is SUBSCRIPTION_REMINDER_DAYS days from today.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=reminders.REMINDER_CHUNK_SIZE,
+            help="Rows fetched from the database at a time.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=reminders.REMINDER_BATCH_SIZE,
+            help="Digests per send task.",
+        )
+
+    def handle(self, *args, **options):
+        count = reminders.send_reminders(
+            on=options["date"],
+            chunk_size=options["chunk_size"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(f"Enqueued {count} reminder digest(s).")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from terminusgps_payments import bulk
+from terminusgps_payments.models import Subscription
+
+
+class Command(BaseCommand):
+    help = "Retrieves the billing start date of active subscriptions that don't have one, or are missing their trial end date, from Authorizenet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Retrieve the billing start date of every active subscription.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Subscription.objects.filter(
+            status=Subscription.SubscriptionStatus.ACTIVE
+        )
+        if not options["all"]:
+            queryset = queryset.filter(
+                Q(billing_starts_on__isnull=True)
+                | Q(trial_ends_on__isnull=True, plan__trial_occurrences__gt=0)
+            )
+        results = bulk.bulk_sync_billing_start_dates(queryset)
+        for result in results:
+            if not result.ok:
+                self.stderr.write(
+                    f"Subscription #{result.item.pk}: {result.error}"
+                )
+        synced = sum(result.ok for result in results)
+        self.stdout.write(f"Synced {synced} subscription(s).")
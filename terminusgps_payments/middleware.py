@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+from collections.abc import Callable
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse
+
+from terminusgps_payments import profiling, routers, tracing
+
+
+class ReplicaPinMiddleware:
+    """Pins a client to the primary database for a short while after any successful write request, so it reads its own writes."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        if (
+            request.method not in routers.SAFE_METHODS
+            and response.status_code < 400
+            and routers.get_replica_databases()
+        ):
+            routers.pin(response)
+        return response
+
+
+class TracingMiddleware:
+    """
+    Traces a sample of requests, see :py:func:`~terminusgps_payments.tracing.start_trace`.
+
+    The root span covers the whole request. A ``view.dispatch`` span covers the view, from the end of view middleware to the response, and is tagged with the view's name.
+
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with tracing.start_trace(
+            "http.request", "http", method=request.method, path=request.path
+        ) as root:
+            response = self.get_response(request)
+            tracing.close_span(getattr(request, "_tracing_view_span", None))
+            if root is not None:
+                root.attributes["status_code"] = response.status_code
+            return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if tracing.get_current_span() is None:
+            return
+        view_class = getattr(view_func, "view_class", None)
+        view = view_class or view_func
+        request._tracing_view_span = tracing.open_span(
+            "view.dispatch",
+            "view",
+            activate=False,
+            view=f"{view.__module__}.{view.__qualname__}",
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests to this app's views with the :py:class:`~terminusgps_payments.profiling.StackSampler`: a ``PAYMENTS_PROFILE_SAMPLE_RATE`` fraction of them, and every one slower than ``PAYMENTS_PROFILE_SLOW_MS``.
+
+    Profiles are saved to ``PAYMENTS_PROFILE_DIR``, tagged with the view's name and the user's id. The middleware is removed if neither setting is configured.
+
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        if not profiling.is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        started_at = time.time()
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            if (profiled := getattr(request, "_profiling", None)) is not None:
+                self.finish(request, response, profiled, started_at, started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        view = view_class or view_func
+        if not view.__module__.startswith("terminusgps_payments."):
+            return
+        sampled = random.random() < profiling.get_sample_rate()
+        if sampled or profiling.get_slow_threshold() is not None:
+            profiling.get_sampler().start(threading.get_ident())
+            request._profiling = (
+                f"{view.__module__}.{view.__qualname__}",
+                sampled,
+            )
+
+    def finish(self, request, response, profiled, started_at, started) -> None:
+        stacks = profiling.get_sampler().stop(threading.get_ident())
+        duration_ms = (time.perf_counter() - started) * 1000
+        view, sampled = profiled
+        threshold = profiling.get_slow_threshold()
+        if not sampled and (threshold is None or duration_ms < threshold):
+            return
+        user = getattr(request, "user", None)
+        profiling.save_profile(
+            profiling.Profile(
+                view=view,
+                path=request.path,
+                method=request.method,
+                user_id=user.pk if user and user.is_authenticated else None,
+                status_code=getattr(response, "status_code", None),
+                duration_ms=round(duration_ms, 3),
+                started_at=started_at,
+                interval_ms=profiling.get_sample_interval(),
+                stacks=dict(stacks),
+            )
+        )
@@ -0,0 +1,40 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_payments', '0002_subscription_expires_on'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanPriceMigration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed')], default='pending', max_length=9)),
+                ('last_subscription_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_count', models.PositiveIntegerField(default=0)),
+                ('failed_ids', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'plan price migration',
+                'verbose_name_plural': 'plan price migrations',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['plan', 'status', 'id'], name='terminusgps_plan_id_1b1ce1_idx'),
+        ),
+        migrations.AddField(
+            model_name='planpricemigration',
+            name='plan',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_migrations', to='terminusgps_payments.subscriptionplan'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_payments', '0004_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='trial_ends_on',
+            field=models.DateField(blank=True, default=None, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'expires_on'], name='terminusgps_status_c6d5b8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'trial_ends_on'], name='terminusgps_status_bfd4b9_idx'),
+        ),
+    ]
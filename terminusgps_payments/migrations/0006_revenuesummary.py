@@ -0,0 +1,30 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:29
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_payments', '0005_subscription_trial_ends_on'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevenueSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('active_count', models.IntegerField(default=0)),
+                ('monthly_revenue', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=16)),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revenue_summaries', to='terminusgps_payments.subscriptionplan')),
+            ],
+            options={
+                'verbose_name': 'revenue summary',
+                'verbose_name_plural': 'revenue summaries',
+                'constraints': [models.UniqueConstraint(fields=('date', 'plan'), name='revenue_summary_date_plan_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:33
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_subscriptions(apps, schema_editor):
+    CustomerProfile = apps.get_model('terminusgps_payments', 'CustomerProfile')
+    Subscription = apps.get_model('terminusgps_payments', 'Subscription')
+    statuses = ['active', 'expired', 'suspended', 'canceled', 'terminated']
+    profiles = CustomerProfile.objects.in_bulk()
+    rows = (
+        Subscription.objects.filter(status__in=statuses)
+        .values_list('customer_profile', 'status')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    for customer_profile_id, status, count in rows:
+        setattr(profiles[customer_profile_id], f'{status}_subscription_count', count)
+    CustomerProfile.objects.bulk_update(
+        profiles.values(),
+        [f'{status}_subscription_count' for status in statuses],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_payments', '0006_revenuesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerprofile',
+            name='active_subscription_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='customerprofile',
+            name='canceled_subscription_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='customerprofile',
+            name='expired_subscription_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='customerprofile',
+            name='suspended_subscription_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='customerprofile',
+            name='terminated_subscription_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_subscriptions, migrations.RunPython.noop),
+    ]
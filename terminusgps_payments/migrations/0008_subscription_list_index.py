@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_payments', '0007_customerprofile_subscription_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['customer_profile', 'status', 'id'], name='terminusgps_custome_8c832c_idx'),
+        ),
+    ]
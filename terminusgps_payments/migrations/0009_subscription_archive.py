@@ -0,0 +1,52 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_payments', '0008_subscription_list_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSubscription',
+            fields=[
+                ('id', models.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(blank=True, choices=[('active', 'Active'), ('expired', 'Expired'), ('suspended', 'Suspended'), ('canceled', 'Canceled'), ('terminated', 'Terminated')])),
+                ('expires_on', models.DateField(blank=True, default=None, null=True)),
+                ('trial_ends_on', models.DateField(blank=True, default=None, null=True)),
+                ('finished_on', models.DateField(blank=True, default=None, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'archived subscription',
+                'verbose_name_plural': 'archived subscriptions',
+            },
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='finished_on',
+            field=models.DateField(blank=True, default=None, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'finished_on'], name='terminusgps_status_a67a32_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedsubscription',
+            name='customer_profile',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_subscriptions', to='terminusgps_payments.customerprofile'),
+        ),
+        migrations.AddField(
+            model_name='archivedsubscription',
+            name='plan',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_subscriptions', to='terminusgps_payments.subscriptionplan'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedsubscription',
+            index=models.Index(fields=['customer_profile', 'id'], name='terminusgps_custome_7f6308_idx'),
+        ),
+    ]
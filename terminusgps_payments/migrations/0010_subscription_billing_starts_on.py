@@ -0,0 +1,27 @@
+# Generated by Django 6.1.2 on 2026-10-19 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_payments', '0009_subscription_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedsubscription',
+            name='billing_starts_on',
+            field=models.DateField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='billing_starts_on',
+            field=models.DateField(blank=True, default=None, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'plan', 'billing_starts_on'], name='terminusgps_status_ba3360_idx'),
+        ),
+    ]
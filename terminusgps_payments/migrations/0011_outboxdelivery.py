@@ -0,0 +1,28 @@
+# Generated by Django 6.1.2 on 2026-10-19 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('terminusgps_payments', '0010_subscription_billing_starts_on'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('handler', models.CharField(max_length=255)),
+                ('delivered_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='terminusgps_payments.outboxevent')),
+            ],
+            options={
+                'verbose_name': 'outbox delivery',
+                'verbose_name_plural': 'outbox deliveries',
+                'constraints': [models.UniqueConstraint(fields=('event', 'handler'), name='outbox_delivery_event_handler_uniq')],
+            },
+        ),
+    ]
@@ -1,33 +1,39 @@
 import typing
 
-from django.conf import settings
-from django.core.exceptions import ImproperlyConfigured
-from django.http import HttpRequest
-from django.utils.module_loading import import_string
-from terminusgps.authorizenet.service import AuthorizenetService
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.contrib.messages import get_messages
+from django.core.exceptions import BadRequest
+from django.core.files.uploadhandler import MemoryFileUploadHandler
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import (
+    add_never_cache_headers,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
+from terminusgps_payments import caching, pools, routers, services
 from terminusgps_payments.models import CustomerProfile
 
+if typing.TYPE_CHECKING:
+    from terminusgps.authorizenet.service import AuthorizenetService
+
 
 class AuthorizenetServiceMixin:
     """
     Adds an Authorizenet service to the view's :py:attr:`service` attribute.
 
-    Passes `service_kwargs` to the service constructor if provided.
+    If the view has a :py:attr:`customer_profile` whose merchant is configured in ``AUTHORIZENET_MERCHANTS``, the service is that merchant pool's shared service. Otherwise passes `service_kwargs` to the service constructor if provided.
 
     """
 
     service_kwargs: dict[str, typing.Any] | None = None
 
-    def get_service_class(self) -> type[AuthorizenetService]:
-        if not hasattr(settings, "AUTHORIZENET_SERVICE"):
-            raise ImproperlyConfigured(
-                "'AUTHORIZENET_SERVICE' setting is required."
-            )
-        try:
-            return import_string(settings.AUTHORIZENET_SERVICE)
-        except ImportError as error:
-            raise ImproperlyConfigured(error)
+    def get_service_class(self) -> type["AuthorizenetService"]:
+        return services.get_service_class()
 
     def get_service_kwargs(self) -> dict[str, typing.Any]:
         return (
@@ -36,15 +42,30 @@ class AuthorizenetServiceMixin:
             else {}
         )
 
-    def setup(self, request: HttpRequest, *args, **kwargs) -> None:
-        super().setup(request, *args, **kwargs)
+    def get_merchant_id(self) -> str | None:
+        if (profile := getattr(self, "customer_profile", None)) is not None:
+            return profile.merchant_id
+
+    def get_service(self) -> "AuthorizenetService":
+        if merchant_id := self.get_merchant_id():
+            if (pool := pools.get_pool(merchant_id)) is not None:
+                return pool.get_service()
         service_class = self.get_service_class()
         service_kwargs = self.get_service_kwargs()
-        self.service = service_class(**service_kwargs)
+        return service_class(**service_kwargs)
+
+    def setup(self, request: HttpRequest, *args, **kwargs) -> None:
+        super().setup(request, *args, **kwargs)
+        self.service = self.get_service()
 
 
 class CustomerProfileMixin:
-    """Adds an authenticated user's customer profile to the view's :py:attr:`customer_profile` attribute."""
+    """
+    Adds an authenticated user's customer profile to the view's :py:attr:`customer_profile` attribute.
+
+    The profile is cached across requests, so it's always read from the primary: a copy read from a replica would be served to requests pinned to the primary too.
+
+    """
 
     def setup(self, request: HttpRequest, *args, **kwargs) -> None:
         super().setup(request, *args, **kwargs)
@@ -56,7 +77,131 @@ class CustomerProfileMixin:
             return
         if request.user.is_anonymous:
             return
+
         try:
-            return CustomerProfile.objects.get(user=request.user)
+            return caching.get_or_fetch(
+                caching.get_user_customer_profile_key(request.user.pk),
+                lambda: CustomerProfile.objects.using(DEFAULT_DB_ALIAS).get(
+                    user=request.user
+                ),
+            )
         except CustomerProfile.DoesNotExist:
             return
+
+
+class ReplicaReadMixin:
+    """Routes the view's reads, including those made while rendering its template response, to a read replica. See :py:func:`~terminusgps_payments.routers.replica_reads`."""
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        with routers.replica_reads(request):
+            response = super().dispatch(request, *args, **kwargs)
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+            return response
+
+
+class InMemoryUploadHandler(MemoryFileUploadHandler):
+    """Keeps uploaded files in memory whatever their size, instead of only up to ``FILE_UPLOAD_MAX_MEMORY_SIZE``."""
+
+    def handle_raw_input(self, *args, **kwargs) -> None:
+        super().handle_raw_input(*args, **kwargs)
+        self.activated = True
+
+
+class InMemoryUploadMixin:
+    """
+    Keeps the view's uploads in memory, so files holding card or bank account numbers are never written to ``FILE_UPLOAD_TEMP_DIR``.
+
+    Upload handlers must be replaced before the request body is read, so CSRF protection is applied inside :py:meth:`dispatch` instead of by the middleware.
+
+    """
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        request.upload_handlers = [InMemoryUploadHandler(request)]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+
+class StaffRequiredMixin(UserPassesTestMixin):
+    """Restricts the view to authenticated staff users."""
+
+    def test_func(self) -> bool:
+        return self.request.user.is_staff
+
+
+class DeferredPanelMixin:
+    """
+    Renders the view's gateway-backed sections, its "panels", in separate requests so the page itself only waits on local data.
+
+    A ``GET`` request renders the page with every panel in :py:attr:`panels` deferred: the template gets its URL in ``deferred_panels`` and renders a placeholder that htmx loads. Requesting that URL, the page URL with a ``panel`` parameter, renders only the ``#<panel>`` partial. Other requests, and views with :py:attr:`defer_panels` disabled, render every panel inline.
+
+    A panel is cached privately by the browser for :py:attr:`panel_max_age` seconds, varying on the ``HX-Request`` header, so reloading the page doesn't call Authorizenet again. In exchange a write made elsewhere can take that long to show up in the panel. Panels in :py:attr:`uncached_panels`, which render flash messages or are shown right after a write, and panels whose request added a message, are never cached.
+
+    Views add a panel's context in :py:meth:`get_panel_context_data`.
+
+    """
+
+    panels: tuple[str, ...] = ()
+    uncached_panels: tuple[str, ...] = ()
+    panel_max_age: int = 10
+    defer_panels: bool = True
+
+    def get_panel(self) -> str | None:
+        """Returns the requested panel, or :py:obj:`None` if the whole page was requested."""
+        if (panel := self.request.GET.get("panel")) is None:
+            return
+        if panel not in self.panels:
+            raise BadRequest(f"Invalid panel '{panel}'.")
+        return panel
+
+    def get_rendered_panels(self) -> tuple[str, ...]:
+        """Returns the panels rendered by this request."""
+        if (panel := self.get_panel()) is not None:
+            return (panel,)
+        if self.defer_panels and self.request.method == "GET":
+            return ()
+        return self.panels
+
+    def get_panel_url(self, panel: str) -> str:
+        query = self.request.GET.copy()
+        query["panel"] = panel
+        return f"{self.request.path}?{query.urlencode()}"
+
+    def get_panel_context_data(self, panel: str) -> dict[str, typing.Any]:
+        return {}
+
+    def get_context_data(self, **kwargs) -> dict[str, typing.Any]:
+        context = super().get_context_data(**kwargs)
+        rendered = self.get_rendered_panels()
+        for panel in rendered:
+            context.update(self.get_panel_context_data(panel))
+        context["deferred_panels"] = {
+            panel: self.get_panel_url(panel)
+            for panel in self.panels
+            if panel not in rendered
+        }
+        return context
+
+    def get_template_names(self) -> list[str]:
+        if (panel := self.get_panel()) is not None:
+            return [f"{self.template_name}#{panel}"]
+        return super().get_template_names()
+
+    def is_panel_cacheable(self, panel: str) -> bool:
+        """Returns whether the response rendering ``panel`` can be cached by the browser."""
+        if panel in self.uncached_panels:
+            return False
+        return not getattr(get_messages(self.request), "added_new", False)
+
+    def render_to_response(self, context, **response_kwargs) -> HttpResponse:
+        response = super().render_to_response(context, **response_kwargs)
+        if (panel := self.get_panel()) is None:
+            return response
+        if self.is_panel_cacheable(panel):
+            patch_cache_control(
+                response, private=True, max_age=self.panel_max_age
+            )
+            patch_vary_headers(response, ["HX-Request"])
+        else:
+            add_never_cache_headers(response)
+        return response
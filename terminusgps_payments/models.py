@@ -1,13 +1,15 @@
+import datetime
 import decimal
 import logging
 from functools import cached_property
 
-from authorizenet import apicontractsv1
+from dateutil.relativedelta import relativedelta
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+DAYS_PER_MONTH = decimal.Decimal("30.4375")
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +31,17 @@ class CustomerProfile(AuthorizenetModel):
     )
     merchant_id = models.CharField(max_length=20, blank=True)
     description = models.TextField(max_length=254, blank=True)
+    active_subscription_count = models.IntegerField(default=0, editable=False)
+    expired_subscription_count = models.IntegerField(default=0, editable=False)
+    suspended_subscription_count = models.IntegerField(
+        default=0, editable=False
+    )
+    canceled_subscription_count = models.IntegerField(
+        default=0, editable=False
+    )
+    terminated_subscription_count = models.IntegerField(
+        default=0, editable=False
+    )
 
     class Meta:
         verbose_name = _("customer profile")
@@ -55,6 +68,11 @@ class Subscription(AuthorizenetModel):
 
     status = models.CharField(blank=True, choices=SubscriptionStatus.choices)
     expires_on = models.DateField(blank=True, null=True, default=None)
+    trial_ends_on = models.DateField(blank=True, null=True, default=None)
+    billing_starts_on = models.DateField(blank=True, null=True, default=None)
+    finished_on = models.DateField(
+        blank=True, null=True, default=None, editable=False
+    )
     customer_profile = models.ForeignKey(
         "terminusgps_payments.CustomerProfile",
         on_delete=models.CASCADE,
@@ -67,6 +85,14 @@ class Subscription(AuthorizenetModel):
     )
 
     class Meta:
+        indexes = [
+            models.Index(fields=["plan", "status", "id"]),
+            models.Index(fields=["customer_profile", "status", "id"]),
+            models.Index(fields=["status", "expires_on"]),
+            models.Index(fields=["status", "trial_ends_on"]),
+            models.Index(fields=["status", "finished_on"]),
+            models.Index(fields=["status", "plan", "billing_starts_on"]),
+        ]
         verbose_name = _("subscription")
         verbose_name_plural = _("subscriptions")
 
@@ -76,11 +102,45 @@ class Subscription(AuthorizenetModel):
         )
 
 
+class ArchivedSubscription(AuthorizenetModel):
+    """A finished :py:class:`Subscription` moved out of the subscriptions table by :py:func:`~terminusgps_payments.archive.archive_subscriptions`."""
+
+    status = models.CharField(
+        blank=True, choices=Subscription.SubscriptionStatus.choices
+    )
+    expires_on = models.DateField(blank=True, null=True, default=None)
+    trial_ends_on = models.DateField(blank=True, null=True, default=None)
+    billing_starts_on = models.DateField(blank=True, null=True, default=None)
+    finished_on = models.DateField(blank=True, null=True, default=None)
+    customer_profile = models.ForeignKey(
+        "terminusgps_payments.CustomerProfile",
+        on_delete=models.CASCADE,
+        related_name="archived_subscriptions",
+    )
+    plan = models.ForeignKey(
+        "terminusgps_payments.SubscriptionPlan",
+        on_delete=models.CASCADE,
+        related_name="archived_subscriptions",
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["customer_profile", "id"])]
+        verbose_name = _("archived subscription")
+        verbose_name_plural = _("archived subscriptions")
+
+
 class SubscriptionPlan(models.Model):
     class SubscriptionPlanVisibility(models.TextChoices):
         VISIBLE = "vis", _("Visible")
         HIDDEN = "hid", _("Hidden")
 
+    class SubscriptionPlanUnit(models.TextChoices):
+        """Mirrors ``authorizenet.apicontractsv1.ARBSubscriptionUnitEnum``."""
+
+        MONTHS = "months", _("Months")
+        DAYS = "days", _("Days")
+
     name = models.CharField(max_length=50)
     amount = models.DecimalField(decimal_places=2, max_digits=12)
     trial_amount = models.DecimalField(
@@ -90,11 +150,8 @@ class SubscriptionPlan(models.Model):
     trial_occurrences = models.IntegerField(default=0)
     length = models.IntegerField(default=1)
     unit = models.CharField(
-        choices=[
-            (apicontractsv1.ARBSubscriptionUnitEnum.months, _("Months")),
-            (apicontractsv1.ARBSubscriptionUnitEnum.days, _("Days")),
-        ],
-        default=apicontractsv1.ARBSubscriptionUnitEnum.months,
+        choices=SubscriptionPlanUnit.choices,
+        default=SubscriptionPlanUnit.MONTHS,
     )
     description = models.TextField(blank=True)
     visibility = models.CharField(
@@ -115,3 +172,125 @@ class SubscriptionPlan(models.Model):
             "terminusgps_payments:subscription plan details",
             query={"pk": self.pk},
         )
+
+    def get_monthly_amount(self) -> decimal.Decimal:
+        """Returns the plan's amount normalized to one month, assuming months of 365.25 / 12 days."""
+        amount = decimal.Decimal(self.amount)
+        if self.unit == self.SubscriptionPlanUnit.DAYS:
+            amount = amount * DAYS_PER_MONTH / self.length
+        else:
+            amount = amount / self.length
+        return amount.quantize(decimal.Decimal("0.0001"))
+
+    def get_trial_ends_on(
+        self, start_date: datetime.date
+    ) -> datetime.date | None:
+        """Returns the date a subscription to this plan starting on ``start_date`` leaves its trial, or :py:obj:`None` if the plan has no trial."""
+        if self.trial_occurrences <= 0:
+            return
+        length = self.length * self.trial_occurrences
+        if self.unit == self.SubscriptionPlanUnit.DAYS:
+            return start_date + relativedelta(days=length)
+        return start_date + relativedelta(months=length)
+
+
+class PlanPriceMigration(models.Model):
+    class PlanPriceMigrationStatus(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        RUNNING = "running", _("Running")
+        COMPLETED = "completed", _("Completed")
+
+    plan = models.ForeignKey(
+        "terminusgps_payments.SubscriptionPlan",
+        on_delete=models.CASCADE,
+        related_name="price_migrations",
+    )
+    amount = models.DecimalField(decimal_places=2, max_digits=12)
+    status = models.CharField(
+        choices=PlanPriceMigrationStatus.choices,
+        default=PlanPriceMigrationStatus.PENDING,
+        max_length=9,
+    )
+    last_subscription_id = models.PositiveBigIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    failed_ids = models.JSONField(blank=True, default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("plan price migration")
+        verbose_name_plural = _("plan price migrations")
+
+    def __str__(self) -> str:
+        return f"{self.plan} -> ${self.amount}"
+
+
+class OutboxEvent(models.Model):
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(blank=True, default=dict)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(blank=True, null=True, default=None)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(dispatched_at__isnull=True),
+                name="outbox_pending_idx",
+            )
+        ]
+        verbose_name = _("outbox event")
+        verbose_name_plural = _("outbox events")
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.pk}"
+
+
+class OutboxDelivery(models.Model):
+    event = models.ForeignKey(
+        "terminusgps_payments.OutboxEvent",
+        on_delete=models.CASCADE,
+        related_name="deliveries",
+    )
+    handler = models.CharField(max_length=255)
+    delivered_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "handler"],
+                name="outbox_delivery_event_handler_uniq",
+            )
+        ]
+        verbose_name = _("outbox delivery")
+        verbose_name_plural = _("outbox deliveries")
+
+    def __str__(self) -> str:
+        return f"{self.handler} for {self.event}"
+
+
+class RevenueSummary(models.Model):
+    plan = models.ForeignKey(
+        "terminusgps_payments.SubscriptionPlan",
+        on_delete=models.CASCADE,
+        related_name="revenue_summaries",
+    )
+    date = models.DateField()
+    active_count = models.IntegerField(default=0)
+    monthly_revenue = models.DecimalField(
+        decimal_places=4, default=decimal.Decimal("0.0000"), max_digits=16
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "plan"], name="revenue_summary_date_plan_uniq"
+            )
+        ]
+        verbose_name = _("revenue summary")
+        verbose_name_plural = _("revenue summaries")
+
+    def __str__(self) -> str:
+        return f"{self.plan} on {self.date}"
@@ -0,0 +1,156 @@
+import contextvars
+import logging
+import typing
+from collections import defaultdict
+from collections.abc import Callable
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from terminusgps_payments.models import OutboxDelivery, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_BATCH_SIZE = 100
+
+Handler = Callable[[dict[str, typing.Any]], typing.Any]
+_handlers: dict[str, list[Handler]] = defaultdict(list)
+_current_event: contextvars.ContextVar[OutboxEvent | None] = (
+    contextvars.ContextVar("outbox_event", default=None)
+)
+
+
+def get_max_attempts() -> int:
+    """Returns the ``OUTBOX_MAX_ATTEMPTS`` setting, default ``5``."""
+    return int(getattr(settings, "OUTBOX_MAX_ATTEMPTS", 5))
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    """Registers the decorated function as a handler for outbox events of ``kind``."""
+
+    def decorator(func: Handler) -> Handler:
+        _handlers[kind].append(func)
+        return func
+
+    return decorator
+
+
+def get_handler_name(func: Handler) -> str:
+    """Returns the name a handler's deliveries are recorded under."""
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def get_current_event() -> OutboxEvent | None:
+    """Returns the outbox event whose handlers are running, or :py:obj:`None` outside of a dispatch."""
+    return _current_event.get()
+
+
+def publish(kind: str, payload: dict[str, typing.Any]) -> OutboxEvent:
+    """
+    Saves an outbox event in the current transaction and schedules a dispatch after it commits.
+
+    Call this inside the same :py:func:`~django.db.transaction.atomic` block as the change it describes, so the event exists if and only if the change was committed.
+
+    :param kind: Event kind, e.g. ``"subscription.created"``.
+    :type kind: str
+    :param payload: A JSON-serializable event payload.
+    :type payload: dict[str, ~typing.Any]
+    :returns: The saved outbox event.
+    :rtype: ~terminusgps_payments.models.OutboxEvent
+
+    """
+    from terminusgps_payments import tasks
+
+    event = OutboxEvent.objects.create(kind=kind, payload=payload)
+    transaction.on_commit(tasks.dispatch_outbox.enqueue)
+    return event
+
+
+def dispatch_batch(
+    batch_size: int = DISPATCH_BATCH_SIZE, after: int = 0
+) -> tuple[int, int | None]:
+    """
+        Runs the handlers for one batch of undispatched outbox events with ids greater than ``after``, oldest first.
+
+        Events are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` and marked dispatched in the same transaction, so concurrent dispatchers never claim the same event at once.
+
+    Each handler runs in its own savepoint, which also records its :py:class:`~terminusgps_payments.models.OutboxDelivery`, so a handler's side effects and the record that it ran are committed together. An event whose handler raised is retried on a later dispatch until it reaches ``OUTBOX_MAX_ATTEMPTS``, and only the handlers without a delivery run again, so each handler runs to completion once per event.
+
+        :param batch_size: Maximum number of events to dispatch. Default is ``100``.
+        :type batch_size: int
+        :param after: Only dispatch events with a greater id. Default is ``0``.
+        :type after: int
+        :returns: Number of events dispatched and the id of the last event attempted, or :py:obj:`None` if there were no events.
+        :rtype: tuple[int, int | None]
+
+    """
+    dispatched = 0
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(
+                pk__gt=after,
+                dispatched_at__isnull=True,
+                attempts__lt=get_max_attempts(),
+            )
+            .order_by("pk")[:batch_size]
+        )
+        delivered = defaultdict(set)
+        for event_id, name in OutboxDelivery.objects.filter(
+            event__in=events
+        ).values_list("event_id", "handler"):
+            delivered[event_id].add(name)
+        for event in events:
+            if _dispatch_event(event, delivered[event.pk]):
+                event.dispatched_at = timezone.now()
+                dispatched += 1
+        OutboxEvent.objects.bulk_update(
+            events, ["attempts", "last_error", "dispatched_at"]
+        )
+    return dispatched, events[-1].pk if events else None
+
+
+def _dispatch_event(event: OutboxEvent, delivered: set[str]) -> bool:
+    """Runs an event's handlers that weren't delivered yet, returning whether every handler has now been delivered."""
+    token = _current_event.set(event)
+    try:
+        for func in _handlers.get(event.kind, []):
+            if (name := get_handler_name(func)) in delivered:
+                continue
+            try:
+                with transaction.atomic():
+                    func(event.payload)
+                    OutboxDelivery.objects.create(event=event, handler=name)
+            except Exception as error:
+                logger.exception(
+                    f"Couldn't dispatch outbox event {event} to {name}."
+                )
+                event.attempts += 1
+                event.last_error = str(error)
+                return False
+        return True
+    finally:
+        _current_event.reset(token)
+
+
+def dispatch(batch_size: int = DISPATCH_BATCH_SIZE) -> int:
+    """Dispatches the oldest batch of outbox events, see :py:func:`dispatch_batch`. Returns the number of events dispatched."""
+    return dispatch_batch(batch_size=batch_size)[0]
+
+
+def dispatch_all(batch_size: int = DISPATCH_BATCH_SIZE) -> int:
+    """
+    Dispatches batches of outbox events until every pending event has been attempted once. Returns the number of events dispatched.
+
+    Batches are paged by id, so events that keep failing don't hold up the events behind them.
+
+    """
+    total = 0
+    after = 0
+    while True:
+        dispatched, last = dispatch_batch(batch_size=batch_size, after=after)
+        if last is None:
+            return total
+        total += dispatched
+        after = last
@@ -0,0 +1,198 @@
+import contextlib
+import dataclasses
+import logging
+import threading
+import time
+import typing
+from collections.abc import Iterator
+
+from django.conf import settings
+
+from terminusgps_payments import throttling
+from terminusgps_payments.lazy import apicontractsv1
+
+if typing.TYPE_CHECKING:
+    from terminusgps_payments.gateway import PooledAuthorizenetService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 8
+DEFAULT_ACQUIRE_TIMEOUT = 10.0
+
+
+@dataclasses.dataclass
+class PoolMetrics:
+    """Counters for the Authorizenet API calls made through a merchant pool."""
+
+    calls: int = 0
+    errors: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    wait_seconds: float = 0.0
+    call_seconds: float = 0.0
+
+
+class MerchantPool:
+    """
+    Long-lived Authorizenet services sharing one merchant account's credentials, connection limit, rate limit buckets and metrics.
+
+    At most ``max_connections`` calls run at once through the pool; further calls wait up to ``acquire_timeout`` seconds for a free connection, then raise :py:exc:`~terminusgps_payments.gateway.PoolExhausted`. Pools don't share connections or tokens, so one merchant's traffic can't starve another's.
+
+    :param merchant_id: The merchant id, as stored on :py:attr:`CustomerProfile.merchant_id <terminusgps_payments.models.CustomerProfile.merchant_id>`.
+    :type merchant_id: str
+    :param login_id: Authorizenet API login id.
+    :type login_id: str
+    :param transaction_key: Authorizenet API transaction key.
+    :type transaction_key: str
+    :param environment: Authorizenet API environment. Default is the ``MERCHANT_AUTH_ENVIRONMENT`` setting.
+    :type environment: str | None
+    :param max_connections: Maximum concurrent calls. Default is ``8``.
+    :type max_connections: int
+    :param acquire_timeout: Seconds to wait for a free connection. Default is ``10``.
+    :type acquire_timeout: float
+
+    """
+
+    def __init__(
+        self,
+        merchant_id: str,
+        login_id: str,
+        transaction_key: str,
+        environment: str | None = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT,
+    ) -> None:
+        if max_connections <= 0:
+            raise ValueError(
+                f"'max_connections' must be positive, got '{max_connections}'."
+            )
+        self.merchant_id = merchant_id
+        self.login_id = login_id
+        self.transaction_key = transaction_key
+        self.environment = str(
+            environment
+            if environment is not None
+            else settings.MERCHANT_AUTH_ENVIRONMENT
+        )
+        self.max_connections = max_connections
+        self.acquire_timeout = acquire_timeout
+        self.metrics = PoolMetrics()
+        self._semaphore = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._services: dict[str, "PooledAuthorizenetService"] = {}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.merchant_id!r}, max_connections={self.max_connections})"
+
+    @property
+    def merchant_authentication(self):
+        """A new merchant authentication element for one of the pool's Authorizenet API requests. Requests executed concurrently can't share an element, since assigning it to a request makes it the request's child."""
+        return apicontractsv1.merchantAuthenticationType(
+            name=str(self.login_id), transactionKey=str(self.transaction_key)
+        )
+
+    def get_service(
+        self, priority: str = throttling.INTERACTIVE
+    ) -> "PooledAuthorizenetService":
+        """Returns the pool's service for ``priority``, created on first use and shared by every caller afterwards."""
+        from terminusgps_payments.gateway import PooledAuthorizenetService
+
+        with self._lock:
+            if priority not in self._services:
+                self._services[priority] = PooledAuthorizenetService(
+                    self, priority=priority
+                )
+            return self._services[priority]
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[None]:
+        """
+        Holds one of the pool's connections for the duration of the block.
+
+        :raises ~terminusgps_payments.gateway.PoolExhausted: If no connection was freed within :py:attr:`acquire_timeout`.
+
+        """
+        from terminusgps_payments.gateway import PoolExhausted
+
+        start = time.monotonic()
+        if not self._semaphore.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self.metrics.rejected += 1
+            logger.warning(f"Merchant pool '{self.merchant_id}' is exhausted.")
+            raise PoolExhausted(self.merchant_id)
+        acquired = time.monotonic()
+        with self._lock:
+            self.metrics.calls += 1
+            self.metrics.in_flight += 1
+            self.metrics.peak_in_flight = max(
+                self.metrics.peak_in_flight, self.metrics.in_flight
+            )
+            self.metrics.wait_seconds += acquired - start
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                self.metrics.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.metrics.in_flight -= 1
+                self.metrics.call_seconds += time.monotonic() - acquired
+            self._semaphore.release()
+
+    def get_metrics(self) -> dict[str, typing.Any]:
+        """Returns a snapshot of the pool's metrics."""
+        with self._lock:
+            return {
+                "max_connections": self.max_connections,
+                **dataclasses.asdict(self.metrics),
+            }
+
+
+_pools: dict[str, tuple[dict[str, typing.Any], MerchantPool]] = {}
+_pools_lock = threading.Lock()
+
+
+def get_merchants() -> dict[str, dict[str, typing.Any]]:
+    """
+    Returns the ``AUTHORIZENET_MERCHANTS`` setting, default ``{}``.
+
+    Maps merchant ids to :py:class:`MerchantPool` keyword arguments, e.g. ``{"acme": {"login_id": "...", "transaction_key": "...", "max_connections": 4}}``.
+
+    """
+    return dict(getattr(settings, "AUTHORIZENET_MERCHANTS", {}))
+
+
+def get_pool(merchant_id: str | None) -> MerchantPool | None:
+    """
+    Returns the pool for ``merchant_id``, or :py:obj:`None` if the merchant isn't configured in ``AUTHORIZENET_MERCHANTS``.
+
+    Pools live for the rest of the process; a pool is only replaced if its merchant's configuration changed.
+
+    """
+    if not merchant_id:
+        return
+    if (config := get_merchants().get(merchant_id)) is None:
+        return
+    with _pools_lock:
+        entry = _pools.get(merchant_id)
+        if entry is None or entry[0] != config:
+            entry = _pools[merchant_id] = (
+                dict(config),
+                MerchantPool(merchant_id, **config),
+            )
+        return entry[1]
+
+
+def get_pool_metrics() -> dict[str, dict[str, typing.Any]]:
+    """Returns a metrics snapshot for every pool created so far, keyed by merchant id."""
+    with _pools_lock:
+        pools = [pool for _, pool in _pools.values()]
+    return {pool.merchant_id: pool.get_metrics() for pool in pools}
+
+
+def clear_pools() -> None:
+    """Discards every pool and its metrics."""
+    with _pools_lock:
+        _pools.clear()
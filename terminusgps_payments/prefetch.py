@@ -0,0 +1,74 @@
+import logging
+
+from django.conf import settings
+
+from terminusgps_payments import bulk, caching, services, throttling
+from terminusgps_payments.lazy import api, authorizenet_service
+from terminusgps_payments.models import CustomerProfile, Subscription
+
+ACTIVE = Subscription.SubscriptionStatus.ACTIVE
+logger = logging.getLogger(__name__)
+
+
+def get_prefetch_on_login() -> bool:
+    """Returns the ``AUTHORIZENET_PREFETCH_ON_LOGIN`` setting, whether logging in prefetches the user's payment caches, default :py:obj:`True`."""
+    return bool(getattr(settings, "AUTHORIZENET_PREFETCH_ON_LOGIN", True))
+
+
+def prefetch_customer(
+    user_id: int,
+    service=None,
+    subscription_limit: int = caching.PREFETCH_SUBSCRIPTION_LIMIT,
+    **kwargs,
+) -> int:
+    """
+    Caches a user's customer profile, its Authorizenet response (payment and shipping profiles) and its most recent active subscriptions.
+
+    Without a ``service``, Authorizenet is called with the merchant's batch rate limit priority, so prefetches can't starve interactive calls.
+
+    Subscription snapshots are retrieved concurrently and without transactions, matching what :py:class:`~terminusgps_payments.views.SubscriptionDetailView` reads by default. Extra ``kwargs`` are passed to :py:func:`~terminusgps_payments.bulk.run_concurrently`.
+
+    :param user_id: A user id.
+    :type user_id: int
+    :param subscription_limit: Maximum number of subscriptions to prefetch. Default is ``25``.
+    :type subscription_limit: int
+    :returns: Number of Authorizenet responses cached.
+    :rtype: int
+
+    """
+    try:
+        profile = CustomerProfile.objects.get(user_id=user_id)
+    except CustomerProfile.DoesNotExist:
+        return 0
+    caching.set_value(caching.get_user_customer_profile_key(user_id), profile)
+    if service is None:
+        service = services.get_service(
+            priority=throttling.BATCH, merchant_id=profile.merchant_id
+        )
+    try:
+        response = service.execute(
+            api.get_customer_profile(customer_profile_id=profile.pk)
+        )
+    except authorizenet_service.AuthorizenetError as error:
+        logger.warning(f"Couldn't prefetch {profile!r}: {error}")
+        return 0
+    cached = {caching.get_customer_profile_key(profile.pk): response}
+    subscription_ids = list(
+        Subscription.objects.filter(customer_profile=profile, status=ACTIVE)
+        .order_by("-pk")
+        .values_list("pk", flat=True)[:subscription_limit]
+    )
+    results = bulk.run_concurrently(
+        lambda pk: service.execute(
+            api.get_subscription(
+                subscription_id=pk, include_transactions=False
+            )
+        ),
+        subscription_ids,
+        **kwargs,
+    )
+    for result in results:
+        if result.ok:
+            cached[caching.get_subscription_key(result.item)] = result.value
+    caching.set_many(cached)
+    return len(cached)
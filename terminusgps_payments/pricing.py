@@ -0,0 +1,112 @@
+import decimal
+import logging
+
+from terminusgps_payments import (
+    bulk,
+    caching,
+    serializers,
+    services,
+    throttling,
+)
+from terminusgps_payments.models import (
+    PlanPriceMigration,
+    Subscription,
+    SubscriptionPlan,
+)
+
+ACTIVE = Subscription.SubscriptionStatus.ACTIVE
+PENDING = PlanPriceMigration.PlanPriceMigrationStatus.PENDING
+RUNNING = PlanPriceMigration.PlanPriceMigrationStatus.RUNNING
+COMPLETED = PlanPriceMigration.PlanPriceMigrationStatus.COMPLETED
+logger = logging.getLogger(__name__)
+
+MIGRATION_BATCH_SIZE = 500
+
+
+def get_or_create_plan_price_migration(
+    plan: SubscriptionPlan, amount: decimal.Decimal | None = None
+) -> tuple[PlanPriceMigration, bool]:
+    """
+    Returns the unfinished price migration for ``plan`` and ``amount``, or a new one if there wasn't any.
+
+    :param plan: A subscription plan.
+    :type plan: ~terminusgps_payments.models.SubscriptionPlan
+    :param amount: The new subscription amount. Default is the plan's current amount.
+    :type amount: ~decimal.Decimal | None
+    :returns: A tuple containing the migration and whether it was created.
+    :rtype: tuple[~terminusgps_payments.models.PlanPriceMigration, bool]
+
+    """
+    if amount is None:
+        amount = plan.amount
+    migration = (
+        PlanPriceMigration.objects.filter(plan=plan, amount=amount)
+        .exclude(status=COMPLETED)
+        .order_by("pk")
+        .first()
+    )
+    if migration is not None:
+        return migration, False
+    return PlanPriceMigration.objects.create(plan=plan, amount=amount), True
+
+
+def run_plan_price_migration(
+    migration: PlanPriceMigration,
+    service=None,
+    batch_size: int = MIGRATION_BATCH_SIZE,
+    **kwargs,
+) -> PlanPriceMigration:
+    """
+    Updates the amount of every active subscription on the migration's plan in Authorizenet.
+
+    Subscriptions are walked in primary key order starting after :py:attr:`~PlanPriceMigration.last_subscription_id`, which is saved after every batch, so an interrupted migration resumes where it stopped.
+
+    Extra ``kwargs`` are passed to :py:func:`~terminusgps_payments.bulk.run_concurrently`.
+
+    """
+    get_service = services.get_merchant_services(throttling.BATCH, service)
+
+    def update(subscription: Subscription) -> int:
+        get_service(subscription.customer_profile.merchant_id).execute(
+            serializers.update_subscription(
+                subscription_id=subscription.pk,
+                subscription=[("amount", migration.amount)],
+            )
+        )
+        return subscription.pk
+
+    migration.status = RUNNING
+    migration.save(update_fields=["status", "updated_at"])
+    queryset = (
+        Subscription.objects.filter(plan_id=migration.plan_id, status=ACTIVE)
+        .select_related("customer_profile")
+        .only("pk", "customer_profile__merchant_id")
+        .order_by("pk")
+    )
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=migration.last_subscription_id)[:batch_size]
+        )
+        if not batch:
+            break
+        results = bulk.run_concurrently(update, batch, **kwargs)
+        for result in results:
+            if not result.ok:
+                logger.warning(
+                    f"Couldn't update subscription #{result.item.pk} amount: {result.error}"
+                )
+        migration.updated_count += len([r for r in results if r.ok])
+        migration.failed_ids += [r.item.pk for r in results if not r.ok]
+        caching.invalidate_subscriptions([r.value for r in results if r.ok])
+        migration.last_subscription_id = batch[-1].pk
+        migration.save(
+            update_fields=[
+                "last_subscription_id",
+                "updated_count",
+                "failed_ids",
+                "updated_at",
+            ]
+        )
+    migration.status = COMPLETED
+    migration.save(update_fields=["status", "updated_at"])
+    return migration
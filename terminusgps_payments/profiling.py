@@ -0,0 +1,222 @@
+import collections
+import dataclasses
+import json
+import os
+import sys
+import threading
+import time
+import typing
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+PROFILE_SUFFIX = ".jsonl"
+
+
+def get_sample_rate() -> float:
+    """Returns the ``PAYMENTS_PROFILE_SAMPLE_RATE`` setting, the fraction of requests profiled, default ``0.0``."""
+    return float(getattr(settings, "PAYMENTS_PROFILE_SAMPLE_RATE", 0.0))
+
+
+def get_slow_threshold() -> float | None:
+    """Returns the ``PAYMENTS_PROFILE_SLOW_MS`` setting, the latency in milliseconds over which requests are always profiled, default :py:obj:`None`."""
+    threshold = getattr(settings, "PAYMENTS_PROFILE_SLOW_MS", None)
+    return float(threshold) if threshold is not None else None
+
+
+def get_profile_dir() -> Path:
+    """Returns the ``PAYMENTS_PROFILE_DIR`` setting, default ``"payments-profiles"``."""
+    return Path(getattr(settings, "PAYMENTS_PROFILE_DIR", "payments-profiles"))
+
+
+def get_max_profiles() -> int:
+    """Returns the ``PAYMENTS_PROFILE_MAX_FILES`` setting, the number of profiles kept in the profile directory, default ``200``."""
+    return int(getattr(settings, "PAYMENTS_PROFILE_MAX_FILES", 200))
+
+
+def get_sample_interval() -> float:
+    """Returns the ``PAYMENTS_PROFILE_INTERVAL_MS`` setting, the time between stack samples in milliseconds, default ``5``."""
+    return float(getattr(settings, "PAYMENTS_PROFILE_INTERVAL_MS", 5))
+
+
+def is_enabled() -> bool:
+    """Returns whether any requests are profiled."""
+    return get_sample_rate() > 0 or get_slow_threshold() is not None
+
+
+def get_frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{code.co_qualname}:{frame.f_lineno}"
+
+
+def fold_stack(frame) -> str:
+    """Returns a frame's stack, outermost first, as a line of the "folded" format read by ``flamegraph.pl`` and speedscope."""
+    names = []
+    while frame is not None:
+        names.append(get_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """
+    Counts the stacks of registered threads, sampled every ``interval`` seconds from a background thread.
+
+    The background thread only wakes up while threads are registered, and the registered threads pay nothing but the GIL handoffs, so every request can be sampled without the overhead of a tracing profiler like :py:mod:`cProfile`.
+
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._stacks: dict[int, collections.Counter[str]] = {}
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, thread_id: int) -> None:
+        """Starts sampling a thread."""
+        with self._lock:
+            self._stacks[thread_id] = collections.Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self.run, name="payments-stack-sampler", daemon=True
+                )
+                self._thread.start()
+            self._active.set()
+
+    def stop(self, thread_id: int) -> collections.Counter[str]:
+        """Stops sampling a thread, returning the number of samples of each of its stacks."""
+        with self._lock:
+            stacks = self._stacks.pop(thread_id, collections.Counter())
+            if not self._stacks:
+                self._active.clear()
+        return stacks
+
+    def sample(self) -> None:
+        frames = sys._current_frames()
+        with self._lock:
+            for thread_id, stacks in self._stacks.items():
+                if (frame := frames.get(thread_id)) is not None:
+                    stacks[fold_stack(frame)] += 1
+
+    def run(self) -> None:
+        while True:
+            self._active.wait()
+            self.sample()
+            time.sleep(self.interval)
+
+
+_sampler: StackSampler | None = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> StackSampler:
+    """Returns this process's stack sampler."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = StackSampler(get_sample_interval() / 1000)
+        return _sampler
+
+
+@dataclasses.dataclass
+class Profile:
+    """A profiled request: its metadata and the number of samples of each of its stacks."""
+
+    view: str
+    path: str
+    method: str
+    user_id: int | None
+    status_code: int | None
+    duration_ms: float
+    started_at: float
+    interval_ms: float
+    stacks: dict[str, int] = dataclasses.field(default_factory=dict)
+    name: str = ""
+
+    def get_metadata(self) -> dict[str, typing.Any]:
+        metadata = dataclasses.asdict(self)
+        del metadata["stacks"], metadata["name"]
+        metadata["samples"] = sum(self.stacks.values())
+        return metadata
+
+    def get_functions(self, limit: int = 25) -> list[dict[str, typing.Any]]:
+        """Returns the ``limit`` functions sampled most often, with their self (innermost) and total sample counts, hottest first."""
+        own = collections.Counter()
+        total = collections.Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        hottest = sorted(total, key=lambda f: (own[f], total[f]), reverse=True)
+        return [
+            {"name": name, "self": own[name], "total": total[name]}
+            for name in hottest[:limit]
+        ]
+
+    def to_folded(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.items()
+        )
+
+
+def save_profile(profile: Profile, directory: Path | None = None) -> Path:
+    """
+    Writes a profile to the profile directory, deleting the oldest profiles beyond ``PAYMENTS_PROFILE_MAX_FILES``.
+
+    Profiles are written as two JSON lines, the metadata then the stacks, so listing them only reads the first line of each.
+
+    """
+    directory = directory or get_profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}{PROFILE_SUFFIX}"
+    path = directory / name
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w") as file:
+        file.write(json.dumps(profile.get_metadata()) + "\n")
+        file.write(json.dumps(profile.stacks) + "\n")
+    os.replace(tmp, path)
+    paths = sorted(directory.glob(f"*{PROFILE_SUFFIX}"))
+    for old in paths[: max(len(paths) - get_max_profiles(), 0)]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def get_profile_path(name: str, directory: Path | None = None) -> Path:
+    """Returns the path of a saved profile. Raises :py:exc:`FileNotFoundError` if there's no such profile."""
+    directory = directory or get_profile_dir()
+    if Path(name).name != name or not name.endswith(PROFILE_SUFFIX):
+        raise FileNotFoundError(name)
+    if not (path := directory / name).is_file():
+        raise FileNotFoundError(name)
+    return path
+
+
+def load_profile(name: str, directory: Path | None = None) -> Profile:
+    """Returns a saved profile. Raises :py:exc:`FileNotFoundError` if there's no such profile."""
+    with get_profile_path(name, directory).open() as file:
+        metadata = json.loads(file.readline())
+        stacks = json.loads(file.readline())
+    metadata.pop("samples", None)
+    return Profile(**metadata, stacks=stacks, name=name)
+
+
+def list_profiles(
+    limit: int = 50, directory: Path | None = None
+) -> list[dict[str, typing.Any]]:
+    """Returns the metadata of the ``limit`` slowest saved profiles, slowest first."""
+    directory = directory or get_profile_dir()
+    profiles = []
+    for path in directory.glob(f"*{PROFILE_SUFFIX}"):
+        try:
+            with path.open() as file:
+                metadata = json.loads(file.readline())
+        except (OSError, ValueError):
+            continue
+        metadata["name"] = path.name
+        profiles.append(metadata)
+    profiles.sort(key=lambda profile: profile["duration_ms"], reverse=True)
+    return profiles[:limit]
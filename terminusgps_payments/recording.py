@@ -0,0 +1,234 @@
+import copy
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import typing
+from pathlib import Path
+
+from django.conf import settings
+from lxml import etree, objectify
+
+from terminusgps_payments import throttling
+from terminusgps_payments.lazy import authorizenet_service
+
+if typing.TYPE_CHECKING:
+    from lxml.objectify import ObjectifiedElement
+
+logger = logging.getLogger(__name__)
+
+REDACTED = "REDACTED"
+REDACTED_ELEMENTS = frozenset(
+    {
+        "name",
+        "transactionKey",
+        "cardCode",
+        "firstName",
+        "lastName",
+        "company",
+        "address",
+        "city",
+        "zip",
+        "phoneNumber",
+        "faxNumber",
+        "email",
+        "nameOnAccount",
+    }
+)
+"""Elements whose text is always replaced with ``"REDACTED"``: credentials and customer details. ``name`` is only redacted inside ``merchantAuthentication``. ``state`` and ``country`` are kept."""
+
+MASKED_ELEMENTS = frozenset({"cardNumber", "accountNumber", "routingNumber"})
+"""Elements whose text is replaced with ``"REDACTED"``, unless it's already masked by Authorizenet (starts with ``"X"``)."""
+
+VOLATILE_ELEMENTS = frozenset({"clientId", "refId"})
+"""Request elements removed before matching, because they change between otherwise identical calls."""
+
+FIXTURE_SUFFIX = ".jsonl.gz"
+
+
+def redact(xml: bytes, volatile: bool = False) -> bytes:
+    """
+    Returns ``xml`` with credentials, payment account numbers and customer details replaced by ``"REDACTED"``.
+
+    If ``volatile`` is :py:obj:`True`, :py:data:`VOLATILE_ELEMENTS` are removed as well.
+
+    """
+    root = etree.fromstring(xml)
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue
+        tag = etree.QName(element).localname
+        if volatile and tag in VOLATILE_ELEMENTS:
+            element.getparent().remove(element)
+            continue
+        if not element.text or len(element):
+            continue
+        if tag in MASKED_ELEMENTS:
+            if not element.text.startswith("X"):
+                element.text = REDACTED
+            continue
+        if tag not in REDACTED_ELEMENTS:
+            continue
+        if tag == "name" and (
+            (parent := element.getparent()) is None
+            or etree.QName(parent).localname != "merchantAuthentication"
+        ):
+            continue
+        element.text = REDACTED
+    return etree.tostring(root)
+
+
+def get_operation(controller_cls: type) -> str:
+    """Returns the Authorizenet operation name for a controller class, e.g. ``"getCustomerProfile"``."""
+    return controller_cls.__name__.removesuffix("Controller")
+
+
+def build_request(request: typing.Any, controller_cls: type) -> bytes:
+    """
+    Returns the request XML the controller would send, with credentials redacted and volatile elements removed.
+
+    Sets a redacted ``merchantAuthentication`` on ``request`` if it has none, since the controller requires one.
+
+    """
+    if getattr(request, "merchantAuthentication", None) is None:
+        from terminusgps_payments.lazy import apicontractsv1
+
+        request.merchantAuthentication = (
+            apicontractsv1.merchantAuthenticationType(
+                name=REDACTED, transactionKey=REDACTED
+            )
+        )
+    return redact(controller_cls(request).buildrequest(), volatile=True)
+
+
+def get_key(operation: str, request_xml: bytes) -> str:
+    """Returns the fixture key for a redacted request."""
+    return hashlib.sha256(operation.encode() + b"\0" + request_xml).hexdigest()
+
+
+def dump_response(response: "ObjectifiedElement") -> bytes:
+    response = copy.deepcopy(response)
+    objectify.deannotate(response, cleanup_namespaces=True)
+    return redact(etree.tostring(response))
+
+
+class Recorder:
+    """
+    Appends Authorizenet API calls to compressed fixture files in ``directory``, one file per operation.
+
+    Each call is a gzip member holding one JSON line with the operation, key, redacted request and either the redacted response or the error. Members can be appended by several threads and processes, and are read back as one stream by :py:func:`load_fixtures`.
+
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        request: typing.Any,
+        controller_cls: type,
+        response: "ObjectifiedElement | None" = None,
+        error: Exception | None = None,
+    ) -> None:
+        operation = get_operation(controller_cls)
+        request_xml = build_request(request, controller_cls)
+        entry = {
+            "operation": operation,
+            "key": get_key(operation, request_xml),
+            "request": request_xml.decode(),
+            "response": None,
+            "error": None,
+        }
+        if error is not None:
+            entry["error"] = {
+                "message": getattr(error, "message", str(error)),
+                "code": getattr(error, "code", ""),
+            }
+        else:
+            entry["response"] = dump_response(response).decode()
+        line = json.dumps(entry, separators=(",", ":")).encode() + b"\n"
+        path = self.directory / f"{operation}{FIXTURE_SUFFIX}"
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with path.open("ab") as file:
+                file.write(gzip.compress(line))
+
+
+_recorder: Recorder | None = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> Recorder | None:
+    """Returns the recorder for the ``AUTHORIZENET_RECORD_DIR`` setting, or :py:obj:`None` if recording is off (the default)."""
+    global _recorder
+    if not (directory := getattr(settings, "AUTHORIZENET_RECORD_DIR", None)):
+        return
+    with _recorder_lock:
+        if _recorder is None or _recorder.directory != Path(directory):
+            _recorder = Recorder(directory)
+        return _recorder
+
+
+def load_fixtures(directory: str | Path) -> dict[str, dict[str, typing.Any]]:
+    """Returns every recorded call in ``directory`` keyed by fixture key. Later recordings of the same call win."""
+    fixtures = {}
+    for path in sorted(Path(directory).glob(f"*{FIXTURE_SUFFIX}")):
+        with gzip.open(path, "rt") as file:
+            for line in file:
+                entry = json.loads(line)
+                fixtures[entry["key"]] = entry
+    return fixtures
+
+
+_fixtures: dict[Path, dict[str, dict[str, typing.Any]]] = {}
+_fixtures_lock = threading.Lock()
+
+
+def get_fixtures(directory: str | Path) -> dict[str, dict[str, typing.Any]]:
+    """Returns :py:func:`load_fixtures` for ``directory``, loaded once per process."""
+    directory = Path(directory)
+    with _fixtures_lock:
+        if directory not in _fixtures:
+            _fixtures[directory] = load_fixtures(directory)
+        return _fixtures[directory]
+
+
+class ReplayAuthorizenetService:
+    """
+    Answers Authorizenet API calls from fixtures recorded with ``AUTHORIZENET_RECORD_DIR``, without network access.
+
+    Set ``AUTHORIZENET_SERVICE`` to ``"terminusgps_payments.recording.ReplayAuthorizenetService"`` and ``AUTHORIZENET_REPLAY_DIR`` to the fixture directory. Calls are matched on their operation and redacted request; recorded errors are raised again, and unrecorded calls raise an :py:exc:`~terminusgps.authorizenet.service.AuthorizenetError` with code ``"REPLAY_MISS"``.
+
+    """
+
+    def __init__(
+        self,
+        priority: str = throttling.INTERACTIVE,
+        directory: str | Path | None = None,
+    ) -> None:
+        self.priority = priority
+        if directory is None:
+            directory = getattr(settings, "AUTHORIZENET_REPLAY_DIR", None)
+        if not directory:
+            raise ValueError("'AUTHORIZENET_REPLAY_DIR' setting is required.")
+        self.directory = Path(directory)
+
+    def execute(
+        self, request_tuple: tuple, reference_id: str | None = None
+    ) -> "ObjectifiedElement":
+        request, controller_cls = request_tuple[0], request_tuple[1]
+        operation = get_operation(controller_cls)
+        key = get_key(operation, build_request(request, controller_cls))
+        entry = get_fixtures(self.directory).get(key)
+        if entry is None:
+            raise authorizenet_service.AuthorizenetError(
+                message=f"No recorded '{operation}' response for this request.",
+                code="REPLAY_MISS",
+            )
+        if (error := entry["error"]) is not None:
+            raise authorizenet_service.AuthorizenetError(
+                message=error["message"], code=error["code"]
+            )
+        return objectify.fromstring(entry["response"].encode())
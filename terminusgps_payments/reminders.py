@@ -0,0 +1,120 @@
+import datetime
+import itertools
+import logging
+import typing
+from collections.abc import Iterable, Iterator
+from operator import attrgetter
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.template.defaultfilters import date
+
+from terminusgps_payments.models import Subscription
+
+ACTIVE = Subscription.SubscriptionStatus.ACTIVE
+CANCELED = Subscription.SubscriptionStatus.CANCELED
+REMINDER_BATCH_SIZE = 500
+REMINDER_CHUNK_SIZE = 2000
+logger = logging.getLogger(__name__)
+
+Digest = dict[str, typing.Any]
+
+
+def get_reminder_days() -> int:
+    """Returns the ``SUBSCRIPTION_REMINDER_DAYS`` setting, default ``7``."""
+    return int(getattr(settings, "SUBSCRIPTION_REMINDER_DAYS", 7))
+
+
+def get_due_subscriptions(on: datetime.date) -> QuerySet:
+    """
+    Returns the subscriptions whose access expires or whose trial ends on ``on``, ordered by customer.
+
+    Canceled subscriptions are matched on ``expires_on`` and active subscriptions on ``trial_ends_on``, each served by a ``(status, <date>)`` index. Customers without an email address are excluded.
+
+    """
+    return (
+        Subscription.objects.filter(
+            Q(status=CANCELED, expires_on=on)
+            | Q(status=ACTIVE, trial_ends_on=on)
+        )
+        .exclude(customer_profile__user__email="")
+        .select_related("customer_profile__user", "plan")
+        .order_by("customer_profile_id", "pk")
+    )
+
+
+def build_digest(subscriptions: Iterable[Subscription]) -> Digest:
+    """Returns the email arguments for one customer's reminder digest, covering every subscription in ``subscriptions``."""
+    expiring, trials_ending = [], []
+    for subscription in subscriptions:
+        item = {
+            "name": str(subscription),
+            "plan_name": subscription.plan.name,
+            "plan_amount": float(subscription.plan.amount),
+        }
+        if subscription.status == CANCELED:
+            expiring.append(item)
+        else:
+            trials_ending.append(item)
+    return {
+        "recipient_list": [subscription.customer_profile.user.email],
+        "context": {
+            "on": date(
+                subscription.expires_on or subscription.trial_ends_on,
+                "l, F jS Y",
+            ),
+            "expiring": expiring,
+            "trials_ending": trials_ending,
+        },
+    }
+
+
+def iter_digests(
+    on: datetime.date, chunk_size: int = REMINDER_CHUNK_SIZE
+) -> Iterator[Digest]:
+    """
+    Yields one reminder digest per customer with a subscription due on ``on``.
+
+    The due subscriptions are streamed from a single query ``chunk_size`` rows at a time and grouped by customer as they arrive, so memory use doesn't grow with the number of rows.
+
+    """
+    subscriptions = get_due_subscriptions(on).iterator(chunk_size=chunk_size)
+    for _, group in itertools.groupby(
+        subscriptions, key=attrgetter("customer_profile_id")
+    ):
+        yield build_digest(group)
+
+
+def send_reminders(
+    on: datetime.date | None = None,
+    chunk_size: int = REMINDER_CHUNK_SIZE,
+    batch_size: int = REMINDER_BATCH_SIZE,
+) -> int:
+    """
+    Emails a reminder digest to every customer with a canceled subscription expiring, or a trial ending, on ``on``.
+
+    Each customer gets a single digest listing all of their due subscriptions. Digests are handed to :py:func:`~terminusgps_payments.tasks.send_reminder_digests` ``batch_size`` at a time, which sends each batch over one mail connection.
+
+    :param on: Date the subscriptions are due. Default is ``SUBSCRIPTION_REMINDER_DAYS`` days from today.
+    :type on: ~datetime.date | None
+    :param chunk_size: Rows fetched from the database at a time. Default is ``2000``.
+    :type chunk_size: int
+    :param batch_size: Digests per send task. Default is ``500``.
+    :type batch_size: int
+    :returns: Number of digests enqueued.
+    :rtype: int
+
+    """
+    from terminusgps_payments import tasks
+
+    if on is None:
+        on = datetime.date.today() + datetime.timedelta(
+            days=get_reminder_days()
+        )
+    count = 0
+    digests = iter_digests(on, chunk_size=chunk_size)
+    while batch := list(itertools.islice(digests, batch_size)):
+        tasks.send_reminder_digests.enqueue(batch)
+        count += len(batch)
+    logger.info(f"Enqueued {count} reminder digest(s) for {on}.")
+    return count
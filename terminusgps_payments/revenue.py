@@ -0,0 +1,179 @@
+import datetime
+import logging
+from collections import Counter
+from collections.abc import Iterable, Mapping
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from terminusgps_payments import outbox
+from terminusgps_payments.models import (
+    OutboxEvent,
+    RevenueSummary,
+    Subscription,
+    SubscriptionPlan,
+)
+
+ACTIVE = Subscription.SubscriptionStatus.ACTIVE
+logger = logging.getLogger(__name__)
+
+
+def get_active_deltas(
+    changes: Iterable[tuple[int, str, str]],
+) -> dict[str, int]:
+    """
+    Returns the net change in active subscriptions per plan for a set of status changes.
+
+    :param changes: ``(plan_id, old_status, new_status)`` tuples. A new subscription's old status is ``""``.
+    :type changes: ~collections.abc.Iterable[tuple[int, str, str]]
+    :returns: A JSON-serializable mapping of plan ids to deltas, without zero deltas.
+    :rtype: dict[str, int]
+
+    """
+    deltas = Counter()
+    for plan_id, old_status, new_status in changes:
+        deltas[str(plan_id)] += (new_status == ACTIVE) - (old_status == ACTIVE)
+    return {plan_id: delta for plan_id, delta in deltas.items() if delta}
+
+
+def rebuild(plans: Iterable[SubscriptionPlan] | None = None) -> int:
+    """
+    Recomputes today's revenue summaries from the subscriptions table, replacing any existing ones.
+
+    Active subscriptions are counted per plan with a single grouped query. The subscriptions table only holds current statuses, so earlier summaries can't be rebuilt and are never overwritten.
+
+    :param plans: Plans to rebuild. Default is every plan.
+    :type plans: ~collections.abc.Iterable[~terminusgps_payments.models.SubscriptionPlan] | None
+    :returns: Number of summaries written.
+    :rtype: int
+
+    """
+    on = datetime.date.today()
+    queryset = SubscriptionPlan.objects.all()
+    if plans is not None:
+        queryset = queryset.filter(pk__in=[plan.pk for plan in plans])
+    queryset = queryset.annotate(
+        active_count=Count(
+            "subscriptions", filter=Q(subscriptions__status=ACTIVE)
+        )
+    )
+    summaries = RevenueSummary.objects.bulk_create(
+        [
+            RevenueSummary(
+                plan=plan,
+                date=on,
+                active_count=plan.active_count,
+                monthly_revenue=plan.get_monthly_amount() * plan.active_count,
+            )
+            for plan in queryset
+        ],
+        update_conflicts=True,
+        unique_fields=["date", "plan"],
+        update_fields=["active_count", "monthly_revenue"],
+    )
+    return len(summaries)
+
+
+def get_pending_delta(plan: SubscriptionPlan) -> int:
+    """Returns the net change in ``plan``'s active subscriptions in outbox events that will still be dispatched to :py:func:`~terminusgps_payments.tasks.update_revenue_summary`, other than the one being dispatched. These changes are already in the subscriptions table."""
+    from terminusgps_payments import tasks
+
+    events = OutboxEvent.objects.filter(
+        dispatched_at__isnull=True,
+        attempts__lt=outbox.get_max_attempts(),
+        payload__active_deltas__has_key=str(plan.pk),
+    )
+    if (event := outbox.get_current_event()) is not None:
+        events = events.exclude(pk=event.pk)
+    events = events.exclude(
+        deliveries__handler=outbox.get_handler_name(
+            tasks.update_revenue_summary
+        )
+    )
+    return sum(
+        int(payload["active_deltas"][str(plan.pk)])
+        for payload in events.values_list("payload", flat=True)
+    )
+
+
+def _apply_delta(
+    plan: SubscriptionPlan, delta: int, on: datetime.date
+) -> None:
+    summaries = RevenueSummary.objects.filter(plan=plan, date=on)
+    if summaries.update(
+        active_count=F("active_count") + delta,
+        monthly_revenue=F("monthly_revenue")
+        + plan.get_monthly_amount() * delta,
+    ):
+        return
+    previous = (
+        RevenueSummary.objects.filter(plan=plan, date__lt=on)
+        .order_by("-date")
+        .first()
+    )
+    if previous is None:
+        if on != datetime.date.today():
+            logger.info(
+                f"Skipped revenue change for plan #{plan.pk} on {on}, "
+                "there's no earlier summary to carry forward."
+            )
+            return
+        # No summary to carry forward, the current table already includes this change
+        # and the pending ones, which are added when they're dispatched
+        rebuild(plans=[plan])
+        if pending := get_pending_delta(plan):
+            _apply_delta(plan, -pending, on)
+        return
+    active_count = previous.active_count + delta
+    try:
+        with transaction.atomic():
+            RevenueSummary.objects.create(
+                plan=plan,
+                date=on,
+                active_count=active_count,
+                monthly_revenue=plan.get_monthly_amount() * active_count,
+            )
+    except IntegrityError:
+        _apply_delta(plan, delta, on)
+
+
+def apply_deltas(
+    deltas: Mapping[str, int], on: datetime.date | None = None
+) -> None:
+    """
+    Adds per-plan changes in active subscriptions to the revenue summaries for ``on``.
+
+    A plan's first summary of the day is carried forward from its latest earlier summary, so each change costs a single-row update instead of a recount. A plan without an earlier summary gets today's summary rebuilt; changes dated before today are skipped for it, since past summaries can't be rebuilt.
+
+    :param deltas: Plan ids mapped to changes in active subscriptions, as returned by :py:func:`get_active_deltas`.
+    :type deltas: ~collections.abc.Mapping[str, int]
+    :param on: Summary date. Default is the date the outbox event being dispatched was created, or today outside of a dispatch.
+    :type on: ~datetime.date | None
+    :rtype: None
+
+    """
+    if on is None and (event := outbox.get_current_event()) is not None:
+        on = timezone.localdate(event.created_at)
+    if on is None:
+        on = datetime.date.today()
+    plans = SubscriptionPlan.objects.in_bulk([int(pk) for pk in deltas])
+    for plan_id, delta in deltas.items():
+        if not delta:
+            continue
+        if (plan := plans.get(int(plan_id))) is None:
+            logger.warning(
+                f"Skipped revenue change for missing plan #{plan_id}."
+            )
+            continue
+        with transaction.atomic():
+            _apply_delta(plan, delta, on)
+
+
+def reprice(plan: SubscriptionPlan, on: datetime.date | None = None) -> None:
+    """Recomputes the monthly revenue of ``plan``'s summary for ``on`` after its amount, length or unit changed."""
+    if on is None:
+        on = datetime.date.today()
+    RevenueSummary.objects.filter(plan=plan, date=on).update(
+        monthly_revenue=F("active_count") * plan.get_monthly_amount()
+    )
@@ -0,0 +1,82 @@
+import contextlib
+import contextvars
+import random
+import time
+from collections.abc import Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpRequest, HttpResponse
+
+PIN_COOKIE_NAME = "payments_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+def get_replica_databases() -> list[str]:
+    """Returns the ``PAYMENTS_REPLICA_DATABASES`` setting, database aliases of read replicas of the primary, default ``[]``."""
+    return list(getattr(settings, "PAYMENTS_REPLICA_DATABASES", []))
+
+
+def get_pin_timeout() -> int:
+    """Returns the ``PAYMENTS_REPLICA_PIN_TIMEOUT`` setting in seconds, default ``10``."""
+    return int(getattr(settings, "PAYMENTS_REPLICA_PIN_TIMEOUT", 10))
+
+
+def is_pinned(request: HttpRequest) -> bool:
+    """Returns whether ``request`` must read from the primary, because it writes or because its client wrote recently."""
+    if request.method not in SAFE_METHODS:
+        return True
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE_NAME, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def pin(response: HttpResponse) -> None:
+    """Pins the client that receives ``response`` to the primary for ``PAYMENTS_REPLICA_PIN_TIMEOUT`` seconds."""
+    timeout = get_pin_timeout()
+    response.set_cookie(
+        PIN_COOKIE_NAME,
+        str(time.time() + timeout),
+        max_age=timeout,
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+@contextlib.contextmanager
+def replica_reads(request: HttpRequest) -> Iterator[None]:
+    """
+    Routes reads made inside the block to a read replica, unless ``request`` is pinned to the primary.
+
+    Writes always go to the primary. Querysets are routed when they're evaluated, so evaluate them, and render template responses, inside the block.
+
+    """
+    token = _replica_reads.set(not is_pinned(request))
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sends reads made inside :py:func:`replica_reads` to a random database in ``PAYMENTS_REPLICA_DATABASES``, and everything else to the primary.
+
+    Add it to ``DATABASE_ROUTERS`` and :py:class:`~terminusgps_payments.middleware.ReplicaPinMiddleware` to ``MIDDLEWARE``. Without replicas configured it routes nothing.
+
+    """
+
+    def db_for_read(self, model, **hints) -> str | None:
+        if _replica_reads.get() and (replicas := get_replica_databases()):
+            return random.choice(replicas)
+
+    def db_for_write(self, model, **hints) -> str | None:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        databases = {DEFAULT_DB_ALIAS, *get_replica_databases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
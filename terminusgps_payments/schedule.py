@@ -0,0 +1,187 @@
+import calendar
+import dataclasses
+import datetime
+import decimal
+import typing
+from collections.abc import Iterable, Iterator
+
+from django.db.models import Count, QuerySet
+
+from terminusgps_payments.models import Subscription, SubscriptionPlan
+
+ACTIVE = Subscription.SubscriptionStatus.ACTIVE
+DAYS = SubscriptionPlan.SubscriptionPlanUnit.DAYS
+
+
+@dataclasses.dataclass(frozen=True)
+class Charge:
+    """A scheduled Authorizenet charge of a subscription."""
+
+    date: datetime.date
+    occurrence: int
+    """Zero-based occurrence number. Occurrences below the plan's ``trial_occurrences`` charge its trial amount."""
+    amount: decimal.Decimal
+
+
+@dataclasses.dataclass
+class ForecastDay:
+    """Charges scheduled on one day of a forecast."""
+
+    date: datetime.date
+    charges: int = 0
+    amount: decimal.Decimal = decimal.Decimal("0.00")
+
+
+def add_months(date: datetime.date, months: int) -> datetime.date:
+    """Returns ``date`` moved by ``months`` months, clamped to the last day of the resulting month. Equivalent to adding a :py:class:`~dateutil.relativedelta.relativedelta`, but several times faster."""
+    years, month = divmod(date.month - 1 + months, 12)
+    year = date.year + years
+    month += 1
+    if date.day <= 28:
+        return date.replace(year=year, month=month)
+    return datetime.date(
+        year, month, min(date.day, calendar.monthrange(year, month)[1])
+    )
+
+
+def get_occurrence_date(
+    plan: SubscriptionPlan, start_date: datetime.date, occurrence: int
+) -> datetime.date:
+    """
+    Returns the date of a subscription's ``occurrence``-th charge.
+
+    Monthly charges are counted from ``start_date``, so a subscription started on the 31st is charged on the last day of shorter months and on the 31st again afterwards, like Authorizenet does.
+
+    """
+    if plan.unit == DAYS:
+        return start_date + datetime.timedelta(days=plan.length * occurrence)
+    return add_months(start_date, plan.length * occurrence)
+
+
+def get_first_occurrence(
+    plan: SubscriptionPlan, start_date: datetime.date, since: datetime.date
+) -> int:
+    """Returns the number of the first occurrence charged on or after ``since``, computed arithmetically rather than by walking the schedule."""
+    if since <= start_date:
+        return 0
+    if plan.unit == DAYS:
+        return -(-(since - start_date).days // plan.length)
+    months = (
+        (since.year - start_date.year) * 12 + since.month - start_date.month
+    )
+    occurrence = max(months // plan.length, 0)
+    while get_occurrence_date(plan, start_date, occurrence) < since:
+        occurrence += 1
+    return occurrence
+
+
+def iter_charges(
+    plan: SubscriptionPlan,
+    start_date: datetime.date,
+    since: datetime.date,
+    until: datetime.date,
+) -> Iterator[Charge]:
+    """
+    Yields the charges of a subscription to ``plan`` billed from ``start_date``, between ``since`` and ``until`` inclusive.
+
+    The schedule ends after the plan's ``total_occurrences``. The first ``trial_occurrences`` charges are the plan's ``trial_amount``.
+
+    """
+    occurrence = get_first_occurrence(plan, start_date, since)
+    while occurrence < plan.total_occurrences:
+        date = get_occurrence_date(plan, start_date, occurrence)
+        if date > until:
+            return
+        amount = (
+            plan.trial_amount
+            if occurrence < plan.trial_occurrences
+            else plan.amount
+        )
+        yield Charge(date=date, occurrence=occurrence, amount=amount)
+        occurrence += 1
+
+
+def get_next_charge(
+    subscription: Subscription, today: datetime.date | None = None
+) -> Charge | None:
+    """
+    Returns a subscription's next charge on or after ``today``, computed from its ``billing_starts_on`` date without calling Authorizenet.
+
+    Returns :py:obj:`None` if the subscription isn't active, its billing start date isn't known or its schedule has ended.
+
+    """
+    if subscription.status != ACTIVE or subscription.billing_starts_on is None:
+        return
+    if today is None:
+        today = datetime.date.today()
+    return next(
+        iter_charges(
+            subscription.plan,
+            subscription.billing_starts_on,
+            since=today,
+            until=datetime.date.max,
+        ),
+        None,
+    )
+
+
+def get_schedule_groups(queryset: QuerySet | None = None) -> QuerySet:
+    """
+    Returns ``(plan_id, billing_starts_on, count)`` rows for the active subscriptions in ``queryset``.
+
+    Subscriptions on the same plan that started billing on the same day share a schedule, so a forecast only computes one schedule per row instead of one per subscription.
+
+    """
+    if queryset is None:
+        queryset = Subscription.objects.all()
+    return (
+        queryset.filter(status=ACTIVE, billing_starts_on__isnull=False)
+        .values_list("plan", "billing_starts_on")
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+
+
+def forecast_groups(
+    groups: Iterable[tuple[int, datetime.date, int]],
+    plans: typing.Mapping[int, SubscriptionPlan],
+    since: datetime.date,
+    until: datetime.date,
+) -> list[ForecastDay]:
+    """Returns the charges scheduled each day between ``since`` and ``until`` for ``(plan_id, billing_starts_on, count)`` groups, in date order. Days without charges are omitted."""
+    days: dict[datetime.date, ForecastDay] = {}
+    for plan_id, start_date, count in groups:
+        for charge in iter_charges(plans[plan_id], start_date, since, until):
+            if (day := days.get(charge.date)) is None:
+                day = days[charge.date] = ForecastDay(date=charge.date)
+            day.charges += count
+            day.amount += charge.amount * count
+    return [days[date] for date in sorted(days)]
+
+
+def forecast(
+    days: int = 90,
+    since: datetime.date | None = None,
+    queryset: QuerySet | None = None,
+) -> list[ForecastDay]:
+    """
+    Returns the charges scheduled for active subscriptions over the next ``days`` days, computed locally in one grouped query.
+
+    Subscriptions without a known ``billing_starts_on`` date are left out; see :py:func:`~terminusgps_payments.bulk.bulk_sync_billing_start_dates`.
+
+    :param days: Length of the forecast in days. Default is ``90``.
+    :type days: int
+    :param since: First day of the forecast. Default is today.
+    :type since: ~datetime.date | None
+    :returns: One entry per day with scheduled charges, in date order.
+    :rtype: list[~terminusgps_payments.schedule.ForecastDay]
+
+    """
+    if since is None:
+        since = datetime.date.today()
+    until = since + datetime.timedelta(days=days - 1)
+    groups = list(get_schedule_groups(queryset))
+    plans = SubscriptionPlan.objects.in_bulk(
+        {plan_id for plan_id, _, _ in groups}
+    )
+    return forecast_groups(groups, plans, since, until)
@@ -0,0 +1,263 @@
+import datetime
+import decimal
+import typing
+from collections.abc import Mapping, Sequence
+
+from django.utils import timezone
+
+from terminusgps_payments.lazy import apicontrollers
+from terminusgps_payments.models import SubscriptionPlan
+
+NAMESPACE = "AnetApi/xml/v1/schema/AnetApiSchema.xsd"
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-8"?>'
+
+ADDRESS_FIELDS = (
+    "firstName",
+    "lastName",
+    "company",
+    "address",
+    "city",
+    "state",
+    "zip",
+    "country",
+    "phoneNumber",
+    "faxNumber",
+)
+BANK_ACCOUNT_FIELDS = (
+    "accountType",
+    "routingNumber",
+    "accountNumber",
+    "nameOnAccount",
+    "echeckType",
+    "bankName",
+)
+
+Element = tuple[str, typing.Any]
+"""A ``(tag, value)`` pair. The value is a scalar, a sequence of elements or :py:obj:`None` to omit the element."""
+
+
+def format_value(value: typing.Any) -> str:
+    """
+    Returns the XML text of ``value`` as PyXB would write it.
+
+    Decimals are written in fixed-point notation with at least one fractional digit, and dates and datetimes as ``xs:date``, keeping the datetime's UTC offset.
+
+    """
+    if isinstance(value, decimal.Decimal):
+        text = format(value.normalize(), "f")
+        return text if "." in text else f"{text}.0"
+    if isinstance(value, datetime.datetime):
+        text = value.strftime("%Y-%m-%d")
+        if (offset := value.utcoffset()) is None:
+            return text
+        if not offset:
+            return f"{text}Z"
+        minutes = int(offset.total_seconds()) // 60
+        sign = "-" if minutes < 0 else "+"
+        hours, minutes = divmod(abs(minutes), 60)
+        return f"{text}{sign}{hours:02d}:{minutes:02d}"
+    if isinstance(value, datetime.date):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def escape(text: str) -> str:
+    """Escapes XML character data the way PyXB's minidom writer does."""
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace('"', "&quot;")
+        .replace(">", "&gt;")
+    )
+
+
+def write_elements(elements: Sequence[Element], parts: list[str]) -> None:
+    """Appends the serialized ``elements`` to ``parts``."""
+    for tag, value in elements:
+        if value is None:
+            continue
+        parts.append(f"<{tag}>")
+        if isinstance(value, (list, tuple)):
+            write_elements(value, parts)
+        else:
+            parts.append(escape(format_value(value)))
+        parts.append(f"</{tag}>")
+
+
+class XmlRequest:
+    """
+    An Authorizenet API request serialized straight to XML, without PyXB contract bindings.
+
+    Authorizenet SDK controllers accept it in place of a PyXB request: they only set :py:attr:`merchantAuthentication`, :py:attr:`clientId` and :py:attr:`refId` on the request and call :py:meth:`toxml`, which returns the same bytes the PyXB request would.
+
+    :param elements: Request body elements following the API request header.
+    :type elements: ~collections.abc.Sequence[~terminusgps_payments.serializers.Element]
+
+    """
+
+    def __init__(self, elements: Sequence[Element]) -> None:
+        self.elements = elements
+        self.merchantAuthentication = None
+        self.clientId = None
+        self.refId = None
+
+    def __getattr__(self, name: str) -> typing.Any:
+        for tag, value in self.__dict__.get("elements", ()):
+            if tag == name:
+                return value
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def get_header_elements(self) -> list[Element]:
+        auth = self.merchantAuthentication
+        if auth is not None:
+            auth = [
+                ("name", auth.name),
+                ("transactionKey", auth.transactionKey),
+            ]
+        return [
+            ("merchantAuthentication", auth),
+            ("clientId", self.clientId),
+            ("refId", self.refId),
+        ]
+
+    def toxml(self, encoding: str = "utf-8", element_name: str = "") -> bytes:
+        parts = [XML_DECLARATION, f'<{element_name} xmlns="{NAMESPACE}">']
+        write_elements(self.get_header_elements(), parts)
+        write_elements(self.elements, parts)
+        parts.append(f"</{element_name}>")
+        return "".join(parts).encode(encoding)
+
+
+def build_address(data: Mapping[str, typing.Any]) -> list[Element]:
+    """Returns ``customerAddressType`` elements for the non-empty fields of :py:class:`~terminusgps_payments.forms.AddressForm` data."""
+    return [
+        (field, data[field]) for field in ADDRESS_FIELDS if data.get(field)
+    ]
+
+
+def build_credit_card(data: Mapping[str, typing.Any]) -> list[Element]:
+    """Returns ``creditCardType`` elements for :py:class:`~terminusgps_payments.forms.CreditCardForm` data."""
+    return [
+        ("cardNumber", data["cardNumber"]),
+        ("expirationDate", data["expirationDate"].strftime("%Y-%m")),
+        ("cardCode", data["cardCode"]),
+    ]
+
+
+def build_bank_account(data: Mapping[str, typing.Any]) -> list[Element]:
+    """Returns ``bankAccountType`` elements for :py:class:`~terminusgps_payments.forms.BankAccountForm` data."""
+    data = {**data, "echeckType": "PPD"}
+    return [
+        (field, data[field])
+        for field in BANK_ACCOUNT_FIELDS
+        if data.get(field)
+    ]
+
+
+def build_profile(
+    customer_profile_id: int | str,
+    payment_profile_id: int | str,
+    shipping_profile_id: int | str,
+) -> list[Element]:
+    """Returns ``customerProfileIdType`` elements. See :py:func:`~terminusgps_payments.contracts.build_profile_contract`."""
+    return [
+        ("customerProfileId", customer_profile_id),
+        ("customerPaymentProfileId", payment_profile_id),
+        ("customerAddressId", shipping_profile_id),
+    ]
+
+
+def build_subscription(
+    plan: SubscriptionPlan,
+    customer_profile_id: int | str,
+    payment_profile_id: int | str,
+    shipping_profile_id: int | str,
+    name: str | None = None,
+    start_date: datetime.date | None = None,
+) -> list[Element]:
+    """Returns ``ARBSubscriptionType`` elements billed from ``start_date``, default now. See :py:func:`~terminusgps_payments.contracts.build_subscription_contract`."""
+    return [
+        ("name", name or plan.name),
+        (
+            "paymentSchedule",
+            [
+                ("interval", [("length", plan.length), ("unit", plan.unit)]),
+                ("startDate", start_date or timezone.now()),
+                ("totalOccurrences", plan.total_occurrences),
+                ("trialOccurrences", plan.trial_occurrences),
+            ],
+        ),
+        ("amount", plan.amount),
+        ("trialAmount", plan.trial_amount),
+        (
+            "profile",
+            build_profile(
+                customer_profile_id, payment_profile_id, shipping_profile_id
+            ),
+        ),
+    ]
+
+
+def create_customer_payment_profile(
+    customer_profile_id: int,
+    bill_to: Sequence[Element],
+    payment: Sequence[Element],
+    validation: str = "liveMode",
+) -> tuple[XmlRequest, type]:
+    """
+    Serialized equivalent of :py:func:`terminusgps.authorizenet.api.create_customer_payment_profile`.
+
+    :param customer_profile_id: An Authorizenet customer profile id.
+    :type customer_profile_id: int
+    :param bill_to: Billing address elements, see :py:func:`build_address`.
+    :type bill_to: ~collections.abc.Sequence[~terminusgps_payments.serializers.Element]
+    :param payment: ``paymentType`` elements, e.g. ``[("creditCard", build_credit_card(data))]``.
+    :type payment: ~collections.abc.Sequence[~terminusgps_payments.serializers.Element]
+    :param validation: Validation mode. Default is ``"liveMode"``.
+    :type validation: str
+    :returns: A tuple containing a request and the controller class to execute it with.
+    :rtype: tuple[~terminusgps_payments.serializers.XmlRequest, type[~authorizenet.apicontrollersbase.APIOperationBase]]
+
+    """
+    request = XmlRequest(
+        [
+            ("customerProfileId", customer_profile_id),
+            ("paymentProfile", [("billTo", bill_to), ("payment", payment)]),
+            ("validationMode", validation),
+        ]
+    )
+    return request, apicontrollers.createCustomerPaymentProfileController
+
+
+def create_customer_shipping_address(
+    customer_profile_id: int, address: Sequence[Element], default: bool = False
+) -> tuple[XmlRequest, type]:
+    """Serialized equivalent of :py:func:`terminusgps.authorizenet.api.create_customer_shipping_address`."""
+    request = XmlRequest(
+        [
+            ("customerProfileId", customer_profile_id),
+            ("address", address),
+            ("defaultShippingAddress", "true" if default else "false"),
+        ]
+    )
+    return request, apicontrollers.createCustomerShippingAddressController
+
+
+def create_subscription(
+    subscription: Sequence[Element],
+) -> tuple[XmlRequest, type]:
+    """Serialized equivalent of :py:func:`terminusgps.authorizenet.api.create_subscription`."""
+    request = XmlRequest([("subscription", subscription)])
+    return request, apicontrollers.ARBCreateSubscriptionController
+
+
+def update_subscription(
+    subscription_id: int, subscription: Sequence[Element]
+) -> tuple[XmlRequest, type]:
+    """Serialized equivalent of :py:func:`terminusgps.authorizenet.api.update_subscription`."""
+    request = XmlRequest(
+        [("subscriptionId", subscription_id), ("subscription", subscription)]
+    )
+    return request, apicontrollers.ARBUpdateSubscriptionController
@@ -0,0 +1,106 @@
+import datetime
+import functools
+import logging
+import typing
+from collections.abc import Callable
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.dateparse import parse_date
+from django.utils.module_loading import import_string
+
+from terminusgps_payments import pools, throttling
+from terminusgps_payments.lazy import api, authorizenet_service
+
+if typing.TYPE_CHECKING:
+    from terminusgps.authorizenet.service import AuthorizenetService
+
+logger = logging.getLogger(__name__)
+
+
+def get_service_class() -> type["AuthorizenetService"]:
+    """
+    Returns the Authorizenet service class set by the ``AUTHORIZENET_SERVICE`` setting.
+
+    :raises ImproperlyConfigured: If the setting was missing or couldn't be imported.
+    :returns: An Authorizenet service class.
+    :rtype: type[~terminusgps.authorizenet.service.AuthorizenetService]
+
+    """
+    if not hasattr(settings, "AUTHORIZENET_SERVICE"):
+        raise ImproperlyConfigured(
+            "'AUTHORIZENET_SERVICE' setting is required."
+        )
+    try:
+        return import_string(settings.AUTHORIZENET_SERVICE)
+    except ImportError as error:
+        raise ImproperlyConfigured(error)
+
+
+def get_service(
+    priority: str | None = None,
+    merchant_id: str | None = None,
+    **kwargs: typing.Any,
+) -> "AuthorizenetService":
+    """
+    Returns an Authorizenet service for code that runs outside of a view.
+
+    If ``merchant_id`` is configured in ``AUTHORIZENET_MERCHANTS``, returns that merchant pool's shared service for ``priority`` and ignores ``kwargs``. Otherwise returns a new ``AUTHORIZENET_SERVICE`` instance, passing ``kwargs`` to its constructor and setting ``priority`` as its rate limit priority if provided.
+
+    """
+    if merchant_id:
+        if (pool := pools.get_pool(merchant_id)) is not None:
+            return pool.get_service(priority or throttling.INTERACTIVE)
+    service = get_service_class()(**kwargs)
+    if priority is not None:
+        service.priority = priority
+    return service
+
+
+def get_merchant_services(
+    priority: str | None = None, service: "AuthorizenetService | None" = None
+) -> Callable[[str | None], "AuthorizenetService"]:
+    """
+    Returns a function returning the Authorizenet service for a merchant id, for code that calls Authorizenet for many customers.
+
+    The function returns ``service`` if provided, otherwise :py:func:`get_service` for the merchant and ``priority``, created once per merchant.
+
+    """
+
+    @functools.cache
+    def get_merchant_service(merchant_id: str | None) -> "AuthorizenetService":
+        if service is not None:
+            return service
+        return get_service(priority=priority, merchant_id=merchant_id)
+
+    return get_merchant_service
+
+
+def get_expires_on(
+    service: "AuthorizenetService", subscription_id: int
+) -> datetime.date | None:
+    """
+    Returns the date a canceled subscription stops granting access, one month after its current billing day.
+
+    Returns :py:obj:`None` if the subscription couldn't be retrieved or its start date couldn't be parsed.
+
+    """
+    try:
+        response = service.execute(
+            api.get_subscription(
+                subscription_id=subscription_id, include_transactions=False
+            )
+        )
+        date_str = str(response.subscription.paymentSchedule.startDate)
+        start_date = parse_date(date_str)
+        if start_date is not None:
+            return datetime.date.today().replace(
+                day=start_date.day
+            ) + relativedelta(months=1)
+    except authorizenet_service.AuthorizenetError as error:
+        logger.error(error)
+        return
+    except ValueError as error:
+        logger.critical(error)
+        return
@@ -0,0 +1,97 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from terminusgps_payments import (
+    caching,
+    catalog,
+    counters,
+    prefetch,
+    revenue,
+    tasks,
+)
+from terminusgps_payments.models import (
+    CustomerProfile,
+    Subscription,
+    SubscriptionPlan,
+)
+
+
+COUNTED_FIELDS = {"status", "customer_profile"}
+"""Subscription fields that change the customer profiles' subscription counters."""
+
+
+@receiver(user_logged_in)
+def prefetch_customer_on_login(sender, request, user, **kwargs) -> None:
+    """
+    Enqueues a prefetch of the user's payment caches unless one is already running.
+
+    The prefetch calls Authorizenet with batch priority. Disabled by setting ``AUTHORIZENET_PREFETCH_ON_LOGIN`` to :py:obj:`False`.
+
+    """
+    if not prefetch.get_prefetch_on_login():
+        return
+    if caching.acquire_prefetch_lock(user.pk):
+        tasks.prefetch_customer.enqueue(user_id=user.pk)
+
+
+@receiver(post_save, sender=CustomerProfile)
+@receiver(post_delete, sender=CustomerProfile)
+def invalidate_user_customer_profile(sender, instance, **kwargs) -> None:
+    caching.delete_many(
+        [caching.get_user_customer_profile_key(instance.user_id)]
+    )
+
+
+@receiver(post_save, sender=SubscriptionPlan)
+def reprice_revenue_summary(sender, instance, raw, **kwargs) -> None:
+    if not raw:
+        revenue.reprice(instance)
+
+
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(post_delete, sender=SubscriptionPlan)
+def invalidate_plan_catalog(sender, instance, **kwargs) -> None:
+    transaction.on_commit(catalog.invalidate)
+
+
+@receiver(pre_save, sender=Subscription)
+def read_saved_subscription_status(
+    sender, instance, raw, update_fields, using, **kwargs
+) -> None:
+    """Reads the customer profile and status a subscription is saved over, for :py:func:`update_subscription_counters`."""
+    instance._saved_counter_state = None
+    if raw:
+        return
+    if update_fields is not None and not COUNTED_FIELDS & set(update_fields):
+        return
+    saved = None
+    if not instance._state.adding:
+        saved = (
+            Subscription.objects.using(using)
+            .filter(pk=instance.pk)
+            .values_list("customer_profile_id", "status")
+            .first()
+        )
+    instance._saved_counter_state = saved or (None, "")
+
+
+@receiver(post_save, sender=Subscription)
+def update_subscription_counters(sender, instance, **kwargs) -> None:
+    if (saved := instance.__dict__.pop("_saved_counter_state", None)) is None:
+        return
+    customer_profile_id, status = saved
+    counters.apply_changes(
+        [
+            (customer_profile_id, status, ""),
+            (instance.customer_profile_id, "", instance.status),
+        ]
+    )
+
+
+@receiver(post_delete, sender=Subscription)
+def decrement_subscription_counter(sender, instance, **kwargs) -> None:
+    counters.apply_changes(
+        [(instance.customer_profile_id, instance.status, "")]
+    )
@@ -1,23 +1,34 @@
+import functools
 import logging
 from collections.abc import Sequence
 
-from django.core.mail import EmailMultiAlternatives
-from django.tasks import task
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
 from django.template.loader import render_to_string
 
-from terminusgps_payments.models import Subscription
+from terminusgps_payments import (
+    archive,
+    caching,
+    outbox,
+    prefetch,
+    pricing,
+    reminders,
+    revenue,
+)
+from terminusgps_payments.models import PlanPriceMigration, Subscription
+from terminusgps_payments.tracing import task
 
 ACTIVE = Subscription.SubscriptionStatus.ACTIVE
 logger = logging.getLogger(__name__)
 
 
-def send_emails(
+def build_email(
     recipient_list: Sequence[str],
     subject: str,
     template_name: str,
     context: dict | None = None,
     html_template_name: str | None = None,
-):
+) -> EmailMultiAlternatives:
     msg = EmailMultiAlternatives(
         subject=subject,
         body=render_to_string(template_name, context=context),
@@ -26,6 +37,23 @@ def send_emails(
     if html_template_name is not None:
         html_content = render_to_string(html_template_name, context=context)
         msg.attach_alternative(html_content, "text/html")
+    return msg
+
+
+def send_emails(
+    recipient_list: Sequence[str],
+    subject: str,
+    template_name: str,
+    context: dict | None = None,
+    html_template_name: str | None = None,
+):
+    msg = build_email(
+        recipient_list=recipient_list,
+        subject=subject,
+        template_name=template_name,
+        context=context,
+        html_template_name=html_template_name,
+    )
     return msg.send(fail_silently=True)
 
 
@@ -53,3 +81,110 @@ def send_subscription_canceled_email(
         context=context or {},
         html_template_name="terminusgps_payments/emails/subscription_canceled.html",
     )
+
+
+@task
+def send_subscriptions_created_email(
+    recipient_list: Sequence[str], context: dict | None = None
+):
+    return send_emails(
+        recipient_list=recipient_list,
+        subject="Terminus GPS - Subscriptions Created",
+        template_name="terminusgps_payments/emails/subscriptions_created.txt",
+        context=context or {},
+        html_template_name="terminusgps_payments/emails/subscriptions_created.html",
+    )
+
+
+@task
+def send_reminder_digests(digests: Sequence[dict]):
+    messages = [
+        build_email(
+            recipient_list=digest["recipient_list"],
+            subject="Terminus GPS - Subscription Reminder",
+            template_name="terminusgps_payments/emails/subscription_reminder.txt",
+            context=digest["context"],
+        )
+        for digest in digests
+    ]
+    with get_connection(fail_silently=True) as connection:
+        return connection.send_messages(messages)
+
+
+@task
+def send_subscription_reminders():
+    return reminders.send_reminders()
+
+
+@task
+def run_plan_price_migration(migration_pk: int, **kwargs):
+    migration = PlanPriceMigration.objects.get(pk=migration_pk)
+    migration = pricing.run_plan_price_migration(migration, **kwargs)
+    return migration.updated_count
+
+
+@task
+def dispatch_outbox(batch_size: int = outbox.DISPATCH_BATCH_SIZE):
+    return outbox.dispatch_all(batch_size=batch_size)
+
+
+@outbox.handler("subscription.created")
+def handle_subscription_created(payload: dict):
+    transaction.on_commit(
+        functools.partial(
+            send_subscription_created_email.enqueue, **payload["email"]
+        )
+    )
+
+
+@outbox.handler("subscriptions.created")
+def handle_subscriptions_created(payload: dict):
+    transaction.on_commit(
+        functools.partial(
+            send_subscriptions_created_email.enqueue, **payload["email"]
+        )
+    )
+
+
+@outbox.handler("subscription.canceled")
+def handle_subscription_canceled(payload: dict):
+    transaction.on_commit(
+        functools.partial(
+            send_subscription_canceled_email.enqueue, **payload["email"]
+        )
+    )
+
+
+@outbox.handler("subscription.created")
+@outbox.handler("subscriptions.created")
+@outbox.handler("subscription.canceled")
+def invalidate_customer_profile_cache(payload: dict):
+    caching.invalidate_customer_profile(
+        payload["customer_profile_id"], payload.get("subscription_ids", [])
+    )
+
+
+@outbox.handler("subscription.created")
+@outbox.handler("subscriptions.created")
+@outbox.handler("subscription.canceled")
+@outbox.handler("subscriptions.status_changed")
+def update_revenue_summary(payload: dict):
+    revenue.apply_deltas(payload.get("active_deltas", {}))
+
+
+@task
+def rebuild_revenue_summary():
+    return revenue.rebuild()
+
+
+@task
+def archive_subscriptions():
+    return archive.archive_subscriptions()
+
+
+@task
+def prefetch_customer(user_id: int):
+    try:
+        return prefetch.prefetch_customer(user_id)
+    finally:
+        caching.release_prefetch_lock(user_id)
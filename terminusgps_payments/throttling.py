@@ -0,0 +1,134 @@
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+DEFAULT_BUCKETS = {
+    INTERACTIVE: {"rate": 20, "capacity": 20, "max_wait": 0},
+    BATCH: {"rate": 5, "capacity": 5, "max_wait": None},
+}
+
+
+class TokenBucket:
+    """
+    A token bucket shared by every process using the same Django cache.
+
+    The bucket holds at most ``capacity`` tokens and refills continuously at ``rate`` tokens per second, so no more than ``capacity`` calls can burst at once, including across refills.
+
+    The bucket is a single cache counter of tokens taken, offset so that ``rate * now + capacity`` is the number of tokens ever earned: a call takes a token with an atomic :py:meth:`~django.core.cache.BaseCache.incr` and gives it back with :py:meth:`~django.core.cache.BaseCache.decr` if none was left. Tokens earned beyond ``capacity`` while idle are forfeited by advancing the counter. Concurrent forfeits can over-correct, which only ever lowers the limit. The cache backend must be shared across processes (e.g. Redis or Memcached) for the limit to be cluster-wide.
+
+    If the cache doesn't store values (e.g. :py:class:`~django.core.cache.backends.dummy.DummyCache`), every call is allowed.
+
+    :param name: Bucket name, used in cache keys.
+    :type name: str
+    :param rate: Tokens added per second.
+    :type rate: float
+    :param capacity: Maximum burst size. Default is ``rate``.
+    :type capacity: int | None
+    :param max_wait: Seconds to wait for a token before raising :py:exc:`~terminusgps_payments.gateway.RateLimitExceeded`. :py:obj:`None` waits indefinitely, ``0`` fails fast.
+    :type max_wait: float | None
+    :param cache_alias: Django cache alias. Default is ``"default"``.
+    :type cache_alias: str
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        capacity: int | None = None,
+        max_wait: float | None = None,
+        cache_alias: str = "default",
+    ) -> None:
+        if rate <= 0:
+            raise ValueError(f"'rate' must be positive, got '{rate}'.")
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = int(capacity or max(1, math.ceil(rate)))
+        self.max_wait = max_wait
+        self.cache_alias = cache_alias
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r}, rate={self.rate})"
+
+    def get_key(self) -> str:
+        return f"terminusgps_payments:ratelimit:{self.name}"
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token from the bucket if one is available.
+
+        :returns: ``0`` if a token was taken, otherwise the seconds until the next token.
+        :rtype: float
+
+        """
+        cache = caches[self.cache_alias]
+        key = self.get_key()
+        earned = time.time() * self.rate
+        cache.add(key, math.floor(earned), timeout=None)
+        try:
+            taken = cache.incr(key)
+        except ValueError:
+            return 0.0
+        available = earned + self.capacity - (taken - 1)
+        if (excess := math.floor(available - self.capacity)) > 0:
+            cache.incr(key, excess)
+            available -= excess
+        if available >= 1:
+            return 0.0
+        cache.decr(key)
+        return max((1 - available) / self.rate, 0.001)
+
+    def acquire(self) -> None:
+        """
+        Takes a token from the bucket, waiting up to :py:attr:`max_wait` seconds for one.
+
+        :raises ~terminusgps_payments.gateway.RateLimitExceeded: If no token was available within :py:attr:`max_wait`.
+
+        """
+        from terminusgps_payments.gateway import RateLimitExceeded
+
+        deadline = (
+            None if self.max_wait is None else time.monotonic() + self.max_wait
+        )
+        while (delay := self.try_acquire()) > 0:
+            if deadline is not None and time.monotonic() + delay > deadline:
+                logger.warning(f"Rate limit exceeded for '{self.name}'.")
+                raise RateLimitExceeded(self.name)
+            time.sleep(delay)
+
+
+def get_bucket(
+    priority: str, namespace: str | None = None
+) -> TokenBucket | None:
+    """
+    Returns the token bucket for ``priority`` configured by the ``AUTHORIZENET_RATE_LIMIT_BUCKETS`` setting.
+
+    Buckets with different ``namespace`` values (e.g. merchant ids) have the same limits but separate tokens.
+
+    Returns :py:obj:`None` if rate limiting was disabled by setting ``AUTHORIZENET_RATE_LIMIT_BUCKETS`` to :py:obj:`None`.
+
+    :raises ValueError: If no bucket was configured for ``priority``.
+
+    """
+    buckets = getattr(
+        settings, "AUTHORIZENET_RATE_LIMIT_BUCKETS", DEFAULT_BUCKETS
+    )
+    if buckets is None:
+        return
+    if priority not in buckets:
+        raise ValueError(f"No rate limit bucket for priority '{priority}'.")
+    return TokenBucket(
+        name=priority if namespace is None else f"{namespace}:{priority}",
+        cache_alias=getattr(
+            settings, "AUTHORIZENET_RATE_LIMIT_CACHE", "default"
+        ),
+        **buckets[priority],
+    )
@@ -0,0 +1,279 @@
+import contextlib
+import contextvars
+import dataclasses
+import json
+import os
+import random
+import threading
+import time
+import typing
+from collections.abc import Iterator
+
+from django.conf import settings
+from django.db import connections
+from django.tasks import task as django_task
+from django.tasks.base import Task
+
+TRACE_KWARG = "_trace"
+"""Task keyword argument carrying the enqueuing span's context into the task."""
+
+SQL_ATTRIBUTE_LENGTH = 200
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def get_sample_rate() -> float:
+    """Returns the ``PAYMENTS_TRACE_SAMPLE_RATE`` setting, the fraction of requests and tasks traced, default ``0.0``."""
+    return float(getattr(settings, "PAYMENTS_TRACE_SAMPLE_RATE", 0.0))
+
+
+def get_trace_file() -> str:
+    """Returns the ``PAYMENTS_TRACE_FILE`` setting, default ``"payments-trace.json"``."""
+    return str(getattr(settings, "PAYMENTS_TRACE_FILE", "payments-trace.json"))
+
+
+@dataclasses.dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    category: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    spans: list["Span"] = dataclasses.field(repr=False)
+    """Finished spans of the trace, shared by all of its spans in this process."""
+    attributes: dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+    start_ns: int = dataclasses.field(default_factory=time.time_ns)
+    duration_ns: int | None = None
+    thread_id: int = dataclasses.field(default_factory=threading.get_ident)
+    _perf_ns: int = dataclasses.field(
+        default_factory=time.perf_counter_ns, repr=False
+    )
+
+    def finish(self) -> None:
+        self.duration_ns = time.perf_counter_ns() - self._perf_ns
+        self.spans.append(self)
+
+    def get_context(self) -> dict[str, str]:
+        """Returns the ids a span in another process needs to join this trace as a child of this span."""
+        return {"trace_id": self.trace_id, "span_id": self.span_id}
+
+    def to_event(self) -> dict[str, typing.Any]:
+        """Returns the span as a complete (``"ph": "X"``) event of the Chrome trace event format, which Perfetto and ``chrome://tracing`` load."""
+        return {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": self.start_ns // 1000,
+            "dur": (self.duration_ns or 0) // 1000,
+            "pid": os.getpid(),
+            "tid": self.thread_id,
+            "args": {
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                **self.attributes,
+            },
+        }
+
+
+class TraceFileExporter:
+    """
+    Appends finished traces to a file in the JSON array flavor of the Chrome trace event format, one event per line.
+
+    The format allows the array's closing bracket to be missing, so several processes can keep appending to the same file.
+
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        lines = "".join(
+            json.dumps(span.to_event(), default=str) + ",\n" for span in spans
+        )
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+            with os.fdopen(fd, "a") as file:
+                if file.tell() == 0:
+                    lines = "[\n" + lines
+                file.write(lines)
+
+
+_exporter: TraceFileExporter | None = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> TraceFileExporter:
+    """Returns the exporter for the ``PAYMENTS_TRACE_FILE`` setting."""
+    global _exporter
+    path = get_trace_file()
+    with _exporter_lock:
+        if _exporter is None or _exporter.path != path:
+            _exporter = TraceFileExporter(path)
+        return _exporter
+
+
+def new_id(size: int) -> str:
+    return random.getrandbits(size * 8).to_bytes(size).hex()
+
+
+def get_current_span() -> Span | None:
+    """Returns the innermost open span, or :py:obj:`None` if nothing is being traced."""
+    return _current_span.get()
+
+
+def get_context() -> dict[str, str] | None:
+    """Returns the context of the innermost open span, or :py:obj:`None` if nothing is being traced."""
+    if (current := _current_span.get()) is not None:
+        return current.get_context()
+
+
+def open_span(
+    name: str,
+    category: str = "app",
+    activate: bool = True,
+    **attributes: typing.Any,
+) -> tuple[Span, contextvars.Token | None] | None:
+    """
+    Starts a child of the current span, returning the span and the token to pass to :py:func:`close_span`. Returns :py:obj:`None` if nothing is being traced.
+
+    If ``activate`` is :py:obj:`True` the child becomes the current span until it's closed, so it must be closed in the same context. Otherwise spans started meanwhile are its siblings, though trace viewers still nest them by time.
+
+    """
+    if (parent := _current_span.get()) is None:
+        return
+    child = Span(
+        name=name,
+        category=category,
+        trace_id=parent.trace_id,
+        span_id=new_id(8),
+        parent_id=parent.span_id,
+        spans=parent.spans,
+        attributes=attributes,
+    )
+    return child, _current_span.set(child) if activate else None
+
+
+def close_span(opened: tuple[Span, contextvars.Token | None] | None) -> None:
+    """Finishes a span started with :py:func:`open_span` and restores the previous current span."""
+    if opened is None:
+        return
+    child, token = opened
+    child.finish()
+    if token is not None:
+        _current_span.reset(token)
+
+
+@contextlib.contextmanager
+def span(
+    name: str, category: str = "app", **attributes: typing.Any
+) -> Iterator[Span | None]:
+    """
+    Times the block as a child of the current span, yielding the span so attributes can be added to it.
+
+    Yields :py:obj:`None` and costs a single context variable lookup if nothing is being traced.
+
+    """
+    opened = open_span(name, category, **attributes)
+    try:
+        yield opened[0] if opened else None
+    except BaseException as error:
+        if opened:
+            opened[0].attributes["error"] = repr(error)
+        raise
+    finally:
+        close_span(opened)
+
+
+def trace_query(execute, sql, params, many, context):
+    with span("db.query", "db", alias=context["connection"].alias) as query:
+        if query is not None:
+            query.attributes["sql"] = sql[:SQL_ATTRIBUTE_LENGTH]
+            query.attributes["many"] = many
+        return execute(sql, params, many, context)
+
+
+@contextlib.contextmanager
+def start_trace(
+    name: str,
+    category: str = "app",
+    context: dict[str, str] | None = None,
+    **attributes: typing.Any,
+) -> Iterator[Span | None]:
+    """
+    Times the block as the root span of a new trace, and every ORM query made in it, then exports the trace with :py:func:`get_exporter`.
+
+    Traces are sampled at ``PAYMENTS_TRACE_SAMPLE_RATE``; the block is untraced and yields :py:obj:`None` otherwise. If there's already a current span the block is a child of it instead. A ``context`` from :py:func:`get_context` continues that trace, e.g. in a task, regardless of sampling.
+
+    """
+    if _current_span.get() is not None:
+        with span(name, category, **attributes) as child:
+            yield child
+        return
+    if context is None and random.random() >= get_sample_rate():
+        yield
+        return
+    root = Span(
+        name=name,
+        category=category,
+        trace_id=context["trace_id"] if context else new_id(16),
+        span_id=new_id(8),
+        parent_id=context["span_id"] if context else None,
+        spans=[],
+        attributes=attributes,
+    )
+    token = _current_span.set(root)
+    try:
+        with contextlib.ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(trace_query)
+                )
+            yield root
+    except BaseException as error:
+        root.attributes["error"] = repr(error)
+        raise
+    finally:
+        _current_span.reset(token)
+        root.finish()
+        get_exporter().export(root.spans)
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class TracedTask(Task):
+    """A :py:class:`~django.tasks.base.Task` whose enqueue and run are traced, with the enqueuing trace continued in the task."""
+
+    def enqueue(self, *args, **kwargs):
+        with span("task.enqueue", "task", task=self.module_path) as enqueue:
+            if enqueue is not None:
+                kwargs[TRACE_KWARG] = enqueue.get_context()
+            return Task.enqueue(self, *args, **kwargs)
+
+    def call(self, *args, **kwargs):
+        context = kwargs.pop(TRACE_KWARG, None)
+        with start_trace(
+            "task.run", "task", context=context, task=self.module_path
+        ):
+            return Task.call(self, *args, **kwargs)
+
+
+def task(function=None, **kwargs):
+    """Like :py:func:`django.tasks.task`, but returns a :py:class:`TracedTask`."""
+
+    def wrapper(func):
+        base = django_task(func, **kwargs)
+        return TracedTask(
+            **{
+                field.name: getattr(base, field.name)
+                for field in dataclasses.fields(base)
+            }
+        )
+
+    if function:
+        return wrapper(function)
+    return wrapper
@@ -19,16 +19,41 @@ urlpatterns = [
         views.AddBankAccountView.as_view(),
         name="add bank account",
     ),
+    path(
+        "customer-profiles/import/",
+        views.PaymentProfileImportView.as_view(),
+        name="import payment profiles",
+    ),
+    path(
+        "customer-profiles/import/<str:name>/",
+        views.PaymentProfileImportResultView.as_view(),
+        name="payment profile import results",
+    ),
+    path(
+        "subscriptions/",
+        views.SubscriptionListView.as_view(),
+        name="subscription list",
+    ),
     path(
         "subscriptions/create/",
         views.SubscriptionCreateView.as_view(),
         name="create subscription",
     ),
+    path(
+        "subscriptions/create/bulk/",
+        views.SubscriptionBulkCreateView.as_view(),
+        name="bulk create subscriptions",
+    ),
     path(
         "subscriptions/<int:pk>/details/",
         views.SubscriptionDetailView.as_view(),
         name="subscription details",
     ),
+    path(
+        "subscriptions/<int:pk>/row/",
+        views.SubscriptionRowView.as_view(),
+        name="subscription row",
+    ),
     path(
         "subscriptions/<int:pk>/update/",
         views.SubscriptionUpdateView.as_view(),
@@ -39,6 +64,27 @@ urlpatterns = [
         views.SubscriptionCancelView.as_view(),
         name="cancel subscription",
     ),
+    path(
+        "subscriptions/export/",
+        views.SubscriptionExportView.as_view(),
+        name="export subscriptions",
+    ),
+    path(
+        "subscriptions/export/transactions/",
+        views.TransactionExportView.as_view(),
+        name="export transactions",
+    ),
+    path(
+        "merchant-pools/metrics/",
+        views.MerchantPoolMetricsView.as_view(),
+        name="merchant pool metrics",
+    ),
+    path("profiles/", views.ProfileListView.as_view(), name="profile list"),
+    path(
+        "profiles/<str:name>/",
+        views.ProfileDetailView.as_view(),
+        name="profile details",
+    ),
     path(
         "subscription-plans/details/",
         views.SubscriptionPlanDetailView.as_view(),
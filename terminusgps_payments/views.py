@@ -1,40 +1,66 @@
 import datetime
+import io
 import logging
 import typing
 
-from authorizenet import apicontractsv1
-from dateutil.relativedelta import relativedelta
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.core.exceptions import ValidationError
-from django.db.models import QuerySet
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.core.exceptions import BadRequest, ValidationError
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.template.defaultfilters import date
-from django.urls import reverse_lazy
-from django.utils import timezone
-from django.utils.dateparse import parse_date
+from django.urls import reverse, reverse_lazy
 from django.views.generic import (
     DeleteView,
     DetailView,
     FormView,
+    ListView,
     TemplateView,
     UpdateView,
+    View,
 )
 from lxml.objectify import ObjectifiedElement
 from shapeshifter.views import MultiFormView
-from terminusgps.authorizenet import api
-from terminusgps.authorizenet.service import AuthorizenetError
 from terminusgps.mixins import HtmxTemplateResponseMixin
 
-from terminusgps_payments import forms, tasks
+from terminusgps_payments import (
+    bulk,
+    caching,
+    catalog,
+    counters,
+    exports,
+    forms,
+    imports,
+    outbox,
+    pools,
+    profiling,
+    revenue,
+    schedule,
+    serializers,
+    services,
+)
+from terminusgps_payments.lazy import api, authorizenet_service
 from terminusgps_payments.mixins import (
+    DeferredPanelMixin,
     AuthorizenetServiceMixin,
     CustomerProfileMixin,
+    InMemoryUploadMixin,
+    ReplicaReadMixin,
+    StaffRequiredMixin,
 )
 from terminusgps_payments.models import Subscription, SubscriptionPlan
 
 VISIBLE = SubscriptionPlan.SubscriptionPlanVisibility.VISIBLE
+ACTIVE = Subscription.SubscriptionStatus.ACTIVE
 CANCELED = Subscription.SubscriptionStatus.CANCELED
 logger = logging.getLogger(__name__)
 
@@ -82,21 +108,19 @@ class AddCreditCardView(
 
     def forms_valid(self) -> HttpResponse:
         forms = self.get_forms()
-        billTo = forms["addressform"].build_contract()
-        payment = apicontractsv1.paymentType()
-        payment.creditCard = forms["creditcardform"].build_contract()
-        contract = apicontractsv1.customerPaymentProfileType()
-        contract.billTo = billTo
-        contract.payment = payment
+        billTo = forms["addressform"].build_elements()
+        creditCard = forms["creditcardform"].build_elements()
         try:
             self.service.execute(
-                api.create_customer_payment_profile(
+                serializers.create_customer_payment_profile(
                     customer_profile_id=self.customer_profile.pk,
-                    contract=contract,
+                    bill_to=billTo,
+                    payment=[("creditCard", creditCard)],
                 )
             )
+            caching.invalidate_customer_profile(self.customer_profile.pk)
             return HttpResponseRedirect(self.get_success_url())
-        except AuthorizenetError as error:
+        except authorizenet_service.AuthorizenetError as error:
             messages.error(self.request, error)
             return self.forms_invalid()
 
@@ -118,27 +142,26 @@ class AddBankAccountView(
 
     def forms_valid(self) -> HttpResponse:
         forms = self.get_forms()
-        billTo = forms["addressform"].build_contract()
-        payment = apicontractsv1.paymentType()
-        payment.bankAccount = forms["bankaccountform"].build_contract()
-        contract = apicontractsv1.customerPaymentProfileType()
-        contract.billTo = billTo
-        contract.payment = payment
+        billTo = forms["addressform"].build_elements()
+        bankAccount = forms["bankaccountform"].build_elements()
         try:
             self.service.execute(
-                api.create_customer_payment_profile(
+                serializers.create_customer_payment_profile(
                     customer_profile_id=self.customer_profile.pk,
-                    contract=contract,
+                    bill_to=billTo,
+                    payment=[("bankAccount", bankAccount)],
                 )
             )
+            caching.invalidate_customer_profile(self.customer_profile.pk)
             return HttpResponseRedirect(self.get_success_url())
-        except AuthorizenetError as error:
+        except authorizenet_service.AuthorizenetError as error:
             messages.error(self.request, error)
             return self.forms_invalid()
 
 
 class CustomerProfileDetailView(
     LoginRequiredMixin,
+    DeferredPanelMixin,
     HtmxTemplateResponseMixin,
     AuthorizenetServiceMixin,
     CustomerProfileMixin,
@@ -146,7 +169,11 @@ class CustomerProfileDetailView(
 ):
     content_type = "text/html"
     http_method_names = ["get"]
+    panels = ("profile", "subscriptions")
+    uncached_panels = ("profile", "subscriptions")
     template_name = "terminusgps_payments/customerprofile_detail.html"
+    subscription_limit = caching.PREFETCH_SUBSCRIPTION_LIMIT
+    subscription_timeout = 2.0
 
     def get_include_issuer_info(self) -> bool:
         return self.request.GET.get("include_issuer_info") == "on"
@@ -155,21 +182,93 @@ class CustomerProfileDetailView(
         return self.request.GET.get("unmask_expiration_date") == "on"
 
     def get_authorizenet_response(self) -> ObjectifiedElement | None:
+        include_issuer_info = self.get_include_issuer_info()
+        unmask_expiration_date = self.get_unmask_expiration_date()
+        request_tuple = api.get_customer_profile(
+            customer_profile_id=self.customer_profile.pk,
+            include_issuer_info=include_issuer_info,
+            unmask_expiration_date=unmask_expiration_date,
+        )
         try:
-            return self.service.execute(
-                api.get_customer_profile(
-                    customer_profile_id=self.customer_profile.pk,
-                    include_issuer_info=self.get_include_issuer_info(),
-                    unmask_expiration_date=self.get_unmask_expiration_date(),
-                )
+            if include_issuer_info or unmask_expiration_date:
+                return self.service.execute(request_tuple)
+            return caching.get_or_fetch(
+                caching.get_customer_profile_key(self.customer_profile.pk),
+                lambda: self.service.execute(request_tuple),
             )
-        except AuthorizenetError as error:
+        except authorizenet_service.AuthorizenetError as error:
             messages.error(self.request, error)
             return
 
+    def get_subscription_response(
+        self, subscription_id: int
+    ) -> ObjectifiedElement:
+        return caching.get_or_fetch(
+            caching.get_subscription_key(subscription_id),
+            lambda: self.service.execute(
+                api.get_subscription(
+                    subscription_id=subscription_id, include_transactions=False
+                )
+            ),
+        )
+
+    def get_subscriptions(self) -> list[Subscription]:
+        """Returns the customer's :py:attr:`subscription_limit` most recent subscriptions."""
+        if self.customer_profile is None:
+            return []
+        return list(
+            self.customer_profile.subscriptions.select_related(
+                "plan"
+            ).order_by("-pk")[: self.subscription_limit]
+        )
+
+    def has_more_subscriptions(self) -> bool:
+        """Returns whether the customer has more subscriptions than :py:meth:`get_subscriptions` returns."""
+        if self.customer_profile is None:
+            return False
+        return (
+            self.customer_profile.subscriptions.count()
+            > self.subscription_limit
+        )
+
+    def get_subscription_rows(self) -> list[dict[str, typing.Any]]:
+        """
+        Returns the customer's most recent subscriptions merged with their Authorizenet responses.
+
+        At most :py:attr:`subscription_limit` subscriptions are retrieved, so a customer with thousands of them can't drain the shared rate limit bucket; the rest are in :py:class:`SubscriptionListView`. Responses are retrieved concurrently for up to :py:attr:`subscription_timeout` seconds in total. Rows that missed the deadline are marked ``loading`` and fetched again by htmx.
+
+        """
+        subscriptions = self.get_subscriptions()
+        results = bulk.run_concurrently(
+            self.get_subscription_response,
+            [subscription.pk for subscription in subscriptions],
+            timeout=self.subscription_timeout,
+        )
+        return [
+            {
+                "subscription": subscription,
+                "response": result.value,
+                "loading": isinstance(result.error, TimeoutError),
+            }
+            for subscription, result in zip(subscriptions, results)
+        ]
+
+    def get_panel_context_data(self, panel: str) -> dict[str, typing.Any]:
+        if panel == "profile":
+            return {"response": self.get_authorizenet_response()}
+        return {
+            "subscription_rows": self.get_subscription_rows(),
+            "more_subscriptions": self.has_more_subscriptions(),
+        }
+
     def get_context_data(self, **kwargs) -> dict[str, typing.Any]:
         context = super().get_context_data(**kwargs)
-        context["response"] = self.get_authorizenet_response()
+        if "subscriptions" in context["deferred_panels"]:
+            context["subscription_rows"] = [
+                {"subscription": subscription, "response": None}
+                for subscription in self.get_subscriptions()
+            ]
+            context["more_subscriptions"] = self.has_more_subscriptions()
         return context
 
 
@@ -187,22 +286,7 @@ class SubscriptionCancelView(
     template_name = "terminusgps_payments/subscription_cancel.html"
 
     def get_expires_on(self) -> datetime.date | None:
-        try:
-            response = self.service.execute(
-                api.get_subscription(subscription_id=self.object.pk)
-            )
-            date_str = str(response.subscription.paymentSchedule.startDate)
-            start_date = parse_date(date_str)
-            if start_date is not None:
-                return datetime.date.today().replace(
-                    day=start_date.day
-                ) + relativedelta(months=1)
-        except AuthorizenetError as error:
-            logger.error(error)
-            return
-        except ValueError as error:
-            logger.critical(error)
-            return
+        return services.get_expires_on(self.service, self.object.pk)
 
     def get_queryset(self) -> QuerySet:
         qs = super().get_queryset()
@@ -215,20 +299,39 @@ class SubscriptionCancelView(
             self.service.execute(
                 api.cancel_subscription(subscription_id=self.object.pk)
             )
+            previous = self.object.status
+            active_deltas = revenue.get_active_deltas(
+                [(self.object.plan_id, previous, CANCELED)]
+            )
             self.object.status = CANCELED
             self.object.expires_on = self.get_expires_on()
-            self.object.save(update_fields=["status", "expires_on"])
-            tasks.send_subscription_canceled_email.enqueue(
-                recipient_list=[self.object.customer_profile.user.email],
-                context={
-                    "today": date(datetime.date.today(), "l, F jS Y"),
-                    "expires_on": date(self.object.expires_on, "l, F jS Y"),
-                    "plan_name": self.object.plan.name,
-                    "plan_amount": float(self.object.plan.amount),
-                },
-            )
+            with transaction.atomic():
+                self.object.save(update_fields=["status", "expires_on"])
+                outbox.publish(
+                    "subscription.canceled",
+                    {
+                        "customer_profile_id": self.object.customer_profile_id,
+                        "subscription_ids": [self.object.pk],
+                        "active_deltas": active_deltas,
+                        "email": {
+                            "recipient_list": [
+                                self.object.customer_profile.user.email
+                            ],
+                            "context": {
+                                "today": date(
+                                    datetime.date.today(), "l, F jS Y"
+                                ),
+                                "expires_on": date(
+                                    self.object.expires_on, "l, F jS Y"
+                                ),
+                                "plan_name": self.object.plan.name,
+                                "plan_amount": float(self.object.plan.amount),
+                            },
+                        },
+                    },
+                )
             return HttpResponseRedirect(self.get_success_url())
-        except AuthorizenetError as error:
+        except authorizenet_service.AuthorizenetError as error:
             form.add_error(
                 None,
                 ValidationError(
@@ -240,6 +343,7 @@ class SubscriptionCancelView(
 
 class SubscriptionUpdateView(
     LoginRequiredMixin,
+    DeferredPanelMixin,
     HtmxTemplateResponseMixin,
     AuthorizenetServiceMixin,
     CustomerProfileMixin,
@@ -249,6 +353,7 @@ class SubscriptionUpdateView(
     form_class = forms.UpdateSubscriptionForm
     http_method_names = ["get", "post"]
     model = Subscription
+    panels = ("profile_choices",)
     template_name = "terminusgps_payments/subscription_update.html"
 
     def get_authorizenet_response(self) -> ObjectifiedElement | None:
@@ -258,8 +363,13 @@ class SubscriptionUpdateView(
                 "include_issuer_info": False,
                 "unmask_expiration_date": False,
             }
-            return self.service.execute(api.get_customer_profile(**kwargs))
-        except AuthorizenetError as error:
+            return caching.get_or_fetch(
+                caching.get_customer_profile_key(self.customer_profile.pk),
+                lambda: self.service.execute(
+                    api.get_customer_profile(**kwargs)
+                ),
+            )
+        except authorizenet_service.AuthorizenetError as error:
             messages.error(self.request, error)
             return
 
@@ -276,6 +386,8 @@ class SubscriptionUpdateView(
 
     def get_form(self, form_class=None) -> forms.UpdateSubscriptionForm:
         form = super().get_form(form_class=form_class)
+        if "profile_choices" not in self.get_rendered_panels():
+            return form
         response = self.get_authorizenet_response()
         if response is not None:
             paymentProfiles = response.profile.paymentProfiles
@@ -290,22 +402,20 @@ class SubscriptionUpdateView(
 
     def form_valid(self, form: forms.UpdateSubscriptionForm) -> HttpResponse:
         try:
-            customerProfileId = self.customer_profile.pk
-            customerAddressId = form.cleaned_data["shipping_profile"]
-            customerPaymentProfileId = form.cleaned_data["payment_profile"]
-            profile = apicontractsv1.customerProfileIdType()
-            profile.customerProfileId = str(customerProfileId)
-            profile.customerAddressId = str(customerAddressId)
-            profile.customerPaymentProfileId = str(customerPaymentProfileId)
-            contract = apicontractsv1.ARBSubscriptionType()
-            contract.profile = profile
+            profile = serializers.build_profile(
+                customer_profile_id=self.customer_profile.pk,
+                payment_profile_id=form.cleaned_data["payment_profile"],
+                shipping_profile_id=form.cleaned_data["shipping_profile"],
+            )
             self.service.execute(
-                api.update_subscription(
-                    subscription_id=self.object.pk, contract=contract
+                serializers.update_subscription(
+                    subscription_id=self.object.pk,
+                    subscription=[("profile", profile)],
                 )
             )
+            caching.invalidate_subscriptions([self.object.pk])
             return HttpResponseRedirect(self.object.get_absolute_url())
-        except AuthorizenetError as error:
+        except authorizenet_service.AuthorizenetError as error:
             form.add_error(
                 None,
                 ValidationError(
@@ -317,6 +427,8 @@ class SubscriptionUpdateView(
 
 class SubscriptionDetailView(
     LoginRequiredMixin,
+    ReplicaReadMixin,
+    DeferredPanelMixin,
     HtmxTemplateResponseMixin,
     AuthorizenetServiceMixin,
     CustomerProfileMixin,
@@ -325,19 +437,26 @@ class SubscriptionDetailView(
     content_type = "text/html"
     http_method_names = ["get"]
     model = Subscription
+    panels = ("subscription",)
+    template_name = "terminusgps_payments/subscription_detail.html"
 
     def get_include_transactions(self) -> bool:
         return self.request.GET.get("include_transactions") == "on"
 
     def get_authorizenet_response(self) -> ObjectifiedElement | None:
+        include_transactions = self.get_include_transactions()
+        request_tuple = api.get_subscription(
+            subscription_id=self.object.pk,
+            include_transactions=include_transactions,
+        )
         try:
-            return self.service.execute(
-                api.get_subscription(
-                    subscription_id=self.object.pk,
-                    include_transactions=self.get_include_transactions(),
-                )
+            if include_transactions:
+                return self.service.execute(request_tuple)
+            return caching.get_or_fetch(
+                caching.get_subscription_key(self.object.pk),
+                lambda: self.service.execute(request_tuple),
             )
-        except AuthorizenetError as error:
+        except authorizenet_service.AuthorizenetError as error:
             messages.error(self.request, error)
             return
 
@@ -347,14 +466,89 @@ class SubscriptionDetailView(
             return qs.filter(customer_profile=self.customer_profile)
         return qs.none()
 
+    def get_panel_context_data(self, panel: str) -> dict[str, typing.Any]:
+        return {"response": self.get_authorizenet_response()}
+
     def get_context_data(self, **kwargs) -> dict[str, typing.Any]:
         context = super().get_context_data(**kwargs)
-        context["response"] = self.get_authorizenet_response()
+        if self.get_panel() is None:
+            context["next_charge"] = schedule.get_next_charge(self.object)
+        return context
+
+
+class SubscriptionRowView(SubscriptionDetailView):
+    defer_panels = False
+    template_name = "terminusgps_payments/subscription_row.html"
+
+    def get_include_transactions(self) -> bool:
+        return False
+
+
+class SubscriptionListView(
+    LoginRequiredMixin,
+    ReplicaReadMixin,
+    HtmxTemplateResponseMixin,
+    CustomerProfileMixin,
+    ListView,
+):
+    """
+    Lists the customer's subscriptions ordered by ``(status, id)``, a page at a time.
+
+    Pages are keyset paginated: the ``after`` parameter holds the ``status:id`` of the previous page's last row, so every page is a single index range scan no matter how deep it is. Rows can be filtered by ``status`` and ``plan``.
+
+    """
+
+    content_type = "text/html"
+    context_object_name = "subscriptions"
+    http_method_names = ["get"]
+    model = Subscription
+    page_size = 50
+    template_name = "terminusgps_payments/subscription_list.html"
+
+    def get_cursor(self) -> tuple[str, int] | None:
+        if not (after := self.request.GET.get("after")):
+            return
+        status, _, pk = after.rpartition(":")
+        if not pk.isdigit():
+            raise BadRequest(f"Invalid cursor '{after}'.")
+        return status, int(pk)
+
+    def get_queryset(self) -> QuerySet:
+        if self.customer_profile is None:
+            return Subscription.objects.none()
+        qs = self.customer_profile.subscriptions.select_related("plan")
+        if status := self.request.GET.get("status"):
+            qs = qs.filter(status=status)
+        if plan := self.request.GET.get("plan"):
+            if not plan.isdigit():
+                raise BadRequest(f"Invalid plan '{plan}'.")
+            qs = qs.filter(plan_id=plan)
+        if (cursor := self.get_cursor()) is not None:
+            status, pk = cursor
+            qs = qs.filter(Q(status__gt=status) | Q(status=status, pk__gt=pk))
+        return qs.order_by("status", "pk")[: self.page_size + 1]
+
+    def get_next_url(self, last: Subscription) -> str:
+        query = self.request.GET.copy()
+        query["after"] = f"{last.status}:{last.pk}"
+        return f"{self.request.path}?{query.urlencode()}"
+
+    def get_context_data(self, **kwargs) -> dict[str, typing.Any]:
+        subscriptions = list(self.object_list)
+        has_next = len(subscriptions) > self.page_size
+        subscriptions = subscriptions[: self.page_size]
+        context = super().get_context_data(object_list=subscriptions, **kwargs)
+        context["next_url"] = (
+            self.get_next_url(subscriptions[-1]) if has_next else None
+        )
+        context["status_choices"] = Subscription.SubscriptionStatus.choices
+        context["plans"] = SubscriptionPlan.objects.order_by("name")
         return context
 
 
 class SubscriptionCreateView(
     LoginRequiredMixin,
+    DeferredPanelMixin,
     HtmxTemplateResponseMixin,
     AuthorizenetServiceMixin,
     CustomerProfileMixin,
@@ -363,17 +557,21 @@ class SubscriptionCreateView(
     content_type = "text/html"
     form_class = forms.CreateSubscriptionForm
     http_method_names = ["get", "post"]
+    panels = ("profile_choices",)
     plan_queryset = SubscriptionPlan.objects.filter(visibility=VISIBLE)
     template_name = "terminusgps_payments/subscription_create.html"
 
     def get_authorizenet_response(self) -> ObjectifiedElement | None:
         try:
-            return self.service.execute(
-                api.get_customer_profile(
-                    customer_profile_id=self.customer_profile.pk
-                )
+            return caching.get_or_fetch(
+                caching.get_customer_profile_key(self.customer_profile.pk),
+                lambda: self.service.execute(
+                    api.get_customer_profile(
+                        customer_profile_id=self.customer_profile.pk
+                    )
+                ),
             )
-        except AuthorizenetError as error:
+        except authorizenet_service.AuthorizenetError as error:
             messages.error(self.request, error)
             return
 
@@ -381,6 +579,8 @@ class SubscriptionCreateView(
         form = super().get_form(form_class=form_class)
         form.fields["plan"].queryset = self.plan_queryset
         form.fields["plan"].empty_label = None
+        if "profile_choices" not in self.get_rendered_panels():
+            return form
         response = self.get_authorizenet_response()
         if response is not None:
             paymentProfiles = response.profile.paymentProfiles
@@ -393,47 +593,72 @@ class SubscriptionCreateView(
                 form.fields["shipping_profile"].choices = choices
         return form
 
+    def get_context_data(self, **kwargs) -> dict[str, typing.Any]:
+        context = super().get_context_data(**kwargs)
+        plan_catalog = catalog.get_catalog()
+        context["plan_catalog"] = plan_catalog
+        context["subscriptionplan"] = self.get_selected_plan(
+            context["form"], plan_catalog["plans"]
+        )
+        return context
+
+    @staticmethod
+    def get_selected_plan(
+        form: forms.CreateSubscriptionForm, plans: list[dict[str, typing.Any]]
+    ) -> dict[str, typing.Any] | None:
+        """Returns the catalog entry of the form's selected plan, defaulting to the first plan."""
+        selected = str(form["plan"].value() or "")
+        for plan in plans:
+            if str(plan["pk"]) == selected:
+                return plan
+        return plans[0] if plans else None
+
     def form_valid(self, form: forms.CreateSubscriptionForm) -> HttpResponse:
-        plan = form.cleaned_data["plan"]
-        schedule = apicontractsv1.paymentScheduleType()
-        schedule.totalOccurrences = plan.total_occurrences
-        schedule.trialOccurrences = plan.trial_occurrences
-        schedule.startDate = timezone.now()
-        schedule.interval = apicontractsv1.paymentScheduleTypeInterval()
-        schedule.interval.length = plan.length
-        schedule.interval.unit = plan.unit
-        customerProfileId = str(self.customer_profile.pk)
-        customerAddressId = form.cleaned_data["shipping_profile"]
-        customerPaymentProfileId = form.cleaned_data["payment_profile"]
-        profile = apicontractsv1.customerProfileIdType()
-        profile.customerProfileId = customerProfileId
-        profile.customerAddressId = customerAddressId
-        profile.customerPaymentProfileId = customerPaymentProfileId
-        contract = apicontractsv1.ARBSubscriptionType()
-        contract.name = plan.name
-        contract.amount = plan.amount
-        contract.trialAmount = plan.trial_amount
-        contract.paymentSchedule = schedule
-        contract.profile = profile
+        start_date = datetime.date.today()
+        subscription = serializers.build_subscription(
+            plan=form.cleaned_data["plan"],
+            customer_profile_id=self.customer_profile.pk,
+            payment_profile_id=form.cleaned_data["payment_profile"],
+            shipping_profile_id=form.cleaned_data["shipping_profile"],
+            start_date=start_date,
+        )
         try:
             response = self.service.execute(
-                api.create_subscription(contract=contract)
+                serializers.create_subscription(subscription)
             )
             self.object = form.save(commit=False)
             self.object.pk = response.subscriptionId
             self.object.customer_profile = self.customer_profile
-            self.object.save()
-            tasks.send_subscription_created_email.enqueue(
-                recipient_list=[self.object.customer_profile.user.email],
-                context={
-                    "today": date(datetime.date.today(), "l, F jS Y"),
-                    "plan_name": self.object.plan.name,
-                    "plan_amount": float(self.object.plan.amount),
-                    "plan_description": self.object.plan.description,
-                },
+            self.object.status = ACTIVE
+            self.object.billing_starts_on = start_date
+            self.object.trial_ends_on = self.object.plan.get_trial_ends_on(
+                start_date
             )
+            with transaction.atomic():
+                self.object.save()
+                outbox.publish(
+                    "subscription.created",
+                    {
+                        "customer_profile_id": self.customer_profile.pk,
+                        "subscription_ids": [self.object.pk],
+                        "active_deltas": {str(self.object.plan_id): 1},
+                        "email": {
+                            "recipient_list": [
+                                self.customer_profile.user.email
+                            ],
+                            "context": {
+                                "today": date(
+                                    datetime.date.today(), "l, F jS Y"
+                                ),
+                                "plan_name": self.object.plan.name,
+                                "plan_amount": float(self.object.plan.amount),
+                                "plan_description": self.object.plan.description,
+                            },
+                        },
+                    },
+                )
             return HttpResponseRedirect(self.object.get_absolute_url())
-        except AuthorizenetError as error:
+        except authorizenet_service.AuthorizenetError as error:
             form.add_error(
                 None,
                 ValidationError(
@@ -443,7 +668,75 @@ class SubscriptionCreateView(
             return self.form_invalid(form=form)
 
 
-class SubscriptionPlanDetailView(HtmxTemplateResponseMixin, DetailView):
+class SubscriptionBulkCreateView(SubscriptionCreateView):
+    form_class = forms.BulkCreateSubscriptionForm
+    success_url = reverse_lazy("terminusgps_payments:customer profile details")
+    template_name = "terminusgps_payments/subscription_bulk_create.html"
+
+    def form_valid(
+        self, form: forms.BulkCreateSubscriptionForm
+    ) -> HttpResponse:
+        plan = form.cleaned_data["plan"]
+        results = bulk.bulk_create_subscriptions(
+            plan=plan,
+            customer_profile=self.customer_profile,
+            payment_profile_id=form.cleaned_data["payment_profile"],
+            shipping_profile_id=form.cleaned_data["shipping_profile"],
+            names=form.get_subscription_names(),
+            service=self.service,
+            commit=False,
+        )
+        created = [r for r in results if r.ok]
+        failed = [r for r in results if not r.ok]
+        if not created:
+            form.add_error(
+                None,
+                ValidationError(
+                    "%(error)s",
+                    code="invalid",
+                    params={"error": failed[0].error},
+                ),
+            )
+            return self.form_invalid(form=form)
+        with transaction.atomic():
+            Subscription.objects.bulk_create([r.value for r in created])
+            counters.apply_changes(
+                [(self.customer_profile.pk, "", ACTIVE)] * len(created)
+            )
+            outbox.publish(
+                "subscriptions.created",
+                {
+                    "customer_profile_id": self.customer_profile.pk,
+                    "subscription_ids": [r.value.pk for r in created],
+                    "active_deltas": {str(plan.pk): len(created)},
+                    "email": {
+                        "recipient_list": [self.customer_profile.user.email],
+                        "context": {
+                            "today": date(datetime.date.today(), "l, F jS Y"),
+                            "quantity": len(created),
+                            "subscription_names": [r.item for r in created],
+                            "plan_name": plan.name,
+                            "plan_amount": float(plan.amount),
+                            "plan_description": plan.description,
+                            "total_amount": float(plan.amount * len(created)),
+                        },
+                    },
+                },
+            )
+        messages.success(
+            self.request, f"Created {len(created)} subscription(s)."
+        )
+        if failed:
+            messages.error(
+                self.request,
+                f"{len(failed)} subscription(s) couldn't be created: {failed[0].error}",
+            )
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class SubscriptionPlanDetailView(
+    ReplicaReadMixin, HtmxTemplateResponseMixin, DetailView
+):
     content_type = "text/html"
     http_method_names = ["get"]
     model = SubscriptionPlan
@@ -460,3 +753,137 @@ class SubscriptionPlanDetailView(HtmxTemplateResponseMixin, DetailView):
             return queryset.get(pk=plan_pk)
         except SubscriptionPlan.DoesNotExist:
             raise Http404()
+
+
+class MerchantPoolMetricsView(StaffRequiredMixin, View):
+    """Returns the metrics of this process's merchant pools as JSON."""
+
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs) -> JsonResponse:
+        return JsonResponse(pools.get_pool_metrics())
+
+
+class PaymentProfileImportView(
+    InMemoryUploadMixin, StaffRequiredMixin, FormView
+):
+    """
+    Imports an uploaded CSV of payment profiles and shipping addresses, see :py:func:`~terminusgps_payments.imports.import_rows`.
+
+    The in-memory upload is read a row at a time and imported within the request, so card and bank account numbers never leave the process. The results are written to a file before the response is sent, so a client disconnecting doesn't interrupt the import, and the client is then redirected to :py:class:`PaymentProfileImportResultView` to download them.
+
+    """
+
+    content_type = "text/html"
+    form_class = forms.PaymentProfileImportForm
+    http_method_names = ["get", "post"]
+    template_name = "terminusgps_payments/payment_profile_import.html"
+
+    def form_valid(self, form: forms.PaymentProfileImportForm) -> HttpResponse:
+        name = imports.new_result_name()
+        file = io.TextIOWrapper(
+            form.cleaned_data["file"].file, encoding="utf-8-sig", newline=""
+        )
+        try:
+            imports.write_results(name, imports.import_csv(file))
+        except UnicodeDecodeError:
+            form.add_error("file", "File must be UTF-8 encoded.")
+            return self.form_invalid(form)
+        return HttpResponseRedirect(
+            reverse(
+                "terminusgps_payments:payment profile import results",
+                kwargs={"name": name},
+            )
+        )
+
+
+class PaymentProfileImportResultView(StaffRequiredMixin, View):
+    """Downloads the results of an import made by :py:class:`PaymentProfileImportView`."""
+
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs) -> FileResponse:
+        try:
+            path = imports.get_result_path(self.kwargs["name"])
+        except FileNotFoundError:
+            raise Http404("Import results not found.")
+        return FileResponse(
+            path.open("rb"),
+            as_attachment=True,
+            filename="import-results.csv",
+            content_type="text/csv",
+        )
+
+
+class ProfileListView(StaffRequiredMixin, TemplateView):
+    """Lists the slowest requests captured by :py:class:`~terminusgps_payments.middleware.ProfilingMiddleware`."""
+
+    content_type = "text/html"
+    http_method_names = ["get"]
+    limit = 50
+    template_name = "terminusgps_payments/profile_list.html"
+
+    def get_context_data(self, **kwargs) -> dict[str, typing.Any]:
+        context = super().get_context_data(**kwargs)
+        context["profiles"] = profiling.list_profiles(limit=self.limit)
+        return context
+
+
+class ProfileDetailView(StaffRequiredMixin, TemplateView):
+    """
+    Shows a captured profile's hottest functions.
+
+    With ``format=folded`` the profile's stacks are downloaded in the "folded" format instead, for ``flamegraph.pl`` or speedscope.
+
+    """
+
+    content_type = "text/html"
+    http_method_names = ["get"]
+    limit = 50
+    template_name = "terminusgps_payments/profile_detail.html"
+
+    def get_profile(self) -> profiling.Profile:
+        try:
+            return profiling.load_profile(self.kwargs["name"])
+        except FileNotFoundError:
+            raise Http404("Profile not found.")
+
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        self.profile = self.get_profile()
+        if request.GET.get("format") == "folded":
+            name = self.profile.name.removesuffix(profiling.PROFILE_SUFFIX)
+            return HttpResponse(
+                self.profile.to_folded(),
+                content_type="text/plain",
+                headers={
+                    "Content-Disposition": f'attachment; filename="{name}.folded"'
+                },
+            )
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs) -> dict[str, typing.Any]:
+        context = super().get_context_data(**kwargs)
+        context["profile"] = self.profile
+        context["samples"] = sum(self.profile.stacks.values())
+        context["functions"] = self.profile.get_functions(limit=self.limit)
+        return context
+
+
+class SubscriptionExportView(StaffRequiredMixin, View):
+    http_method_names = ["get"]
+
+    def get_queryset(self) -> QuerySet:
+        qs = Subscription.objects.all()
+        if status := self.request.GET.get("status"):
+            qs = qs.filter(status=status)
+        if (plan := self.request.GET.get("plan", "")).isdigit():
+            qs = qs.filter(plan__pk=plan)
+        return qs
+
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        return exports.subscription_csv_response(self.get_queryset())
+
+
+class TransactionExportView(SubscriptionExportView):
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        return exports.transaction_csv_response(self.get_queryset())
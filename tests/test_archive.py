@@ -0,0 +1,139 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from terminusgps_payments import archive, counters, revenue
+from terminusgps_payments.models import (
+    ArchivedSubscription,
+    CustomerProfile,
+    RevenueSummary,
+    Subscription,
+)
+
+TODAY = datetime.date(2026, 1, 1)
+
+
+class ArchiveSubscriptionsTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        Subscription.objects.bulk_create(
+            [
+                Subscription(
+                    pk=pk,
+                    customer_profile_id=1,
+                    plan_id=1,
+                    status="canceled",
+                    expires_on=datetime.date(2022, 1, 1),
+                )
+                for pk in range(10, 15)
+            ]
+            + [
+                Subscription(
+                    pk=20,
+                    customer_profile_id=1,
+                    plan_id=1,
+                    status="canceled",
+                    expires_on=datetime.date(2025, 12, 1),
+                ),
+                Subscription(
+                    pk=21,
+                    customer_profile_id=2,
+                    plan_id=1,
+                    status="terminated",
+                ),
+            ]
+        )
+        counters.repair()
+
+    def test_old_finished_subscriptions_are_archived(self):
+        """Fails if only subscriptions finished before the retention window weren't moved, in batches, with their fields."""
+        archived = archive.archive_subscriptions(
+            retention_days=365, today=TODAY, batch_size=2
+        )
+        self.assertEqual(archived, 5)
+        self.assertFalse(Subscription.objects.filter(pk__range=(10, 14)))
+        self.assertEqual(
+            set(Subscription.objects.values_list("pk", flat=True)),
+            {1, 2, 20, 21},
+        )
+        row = ArchivedSubscription.objects.get(pk=10)
+        self.assertEqual(row.status, "canceled")
+        self.assertEqual(row.expires_on, datetime.date(2022, 1, 1))
+        self.assertEqual(row.customer_profile_id, 1)
+
+    def test_finished_subscription_without_expiry_is_marked(self):
+        """Fails if a finished subscription without ``expires_on`` wasn't marked finished today and kept."""
+        archive.archive_subscriptions(retention_days=365, today=TODAY)
+        self.assertEqual(Subscription.objects.get(pk=21).finished_on, TODAY)
+        self.assertEqual(
+            archive.archive_subscriptions(
+                retention_days=365, today=TODAY + datetime.timedelta(days=366)
+            ),
+            2,
+        )
+
+    def test_old_subscription_without_expiry_is_archived(self):
+        """Fails if a subscription without ``expires_on`` that stopped billing years ago wasn't archived on its first run."""
+        Subscription.objects.filter(pk=21).update(
+            billing_starts_on=datetime.date(2021, 1, 1),
+            trial_ends_on=datetime.date(2020, 12, 1),
+        )
+        archive.archive_subscriptions(retention_days=365, today=TODAY)
+        self.assertEqual(
+            ArchivedSubscription.objects.get(pk=21).finished_on,
+            datetime.date(2021, 1, 1),
+        )
+
+    def test_conflicting_subscription_isnt_deleted(self):
+        """Fails if a subscription already in the archive table was deleted from the subscriptions table."""
+        ArchivedSubscription.objects.create(
+            pk=11, customer_profile_id=1, plan_id=1, status="canceled"
+        )
+        archived = archive.archive_subscriptions(
+            retention_days=365, today=TODAY, batch_size=2
+        )
+        self.assertEqual(archived, 4)
+        self.assertTrue(Subscription.objects.filter(pk=11).exists())
+        self.assertFalse(Subscription.objects.filter(pk=12).exists())
+        self.assertEqual(counters.repair(), 0)
+
+    def test_reactivated_subscription_is_unmarked(self):
+        """Fails if a subscription that left a finished status kept its ``finished_on``."""
+        archive.mark_finished(today=TODAY)
+        Subscription.objects.filter(pk=20).update(status="active")
+        archive.mark_finished(today=TODAY)
+        self.assertIsNone(Subscription.objects.get(pk=20).finished_on)
+
+    def test_archive_keeps_counters_and_revenue_coherent(self):
+        """Fails if archiving left the counters out of step with the subscriptions table or changed revenue."""
+        revenue.rebuild()
+        before = list(
+            RevenueSummary.objects.values_list("active_count", flat=True)
+        )
+        archive.archive_subscriptions(retention_days=365, today=TODAY)
+        self.assertEqual(counters.repair(), 0)
+        self.assertEqual(
+            CustomerProfile.objects.get(pk=1).canceled_subscription_count, 1
+        )
+        revenue.rebuild()
+        self.assertEqual(
+            list(
+                RevenueSummary.objects.values_list("active_count", flat=True)
+            ),
+            before,
+        )
+
+    def test_command_archives_subscriptions(self):
+        """Fails if the management command didn't archive subscriptions past the retention window."""
+        stdout = io.StringIO()
+        call_command(
+            "archive_subscriptions", "--retention-days", "30", stdout=stdout
+        )
+        self.assertIn("Archived 6 subscription(s).", stdout.getvalue())
@@ -0,0 +1,189 @@
+import contextvars
+import datetime
+import io
+import time
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from terminusgps.authorizenet.service import AuthorizenetError
+
+from terminusgps_payments import bulk
+from terminusgps_payments.models import Subscription, SubscriptionPlan
+
+
+class RunConcurrentlyTestCase(TestCase):
+    def test_results_preserve_order(self):
+        """Fails if results weren't returned in the same order as the items."""
+        results = bulk.run_concurrently(
+            lambda i: i * 2, range(20), max_workers=4
+        )
+        self.assertEqual([r.value for r in results], list(range(0, 40, 2)))
+
+    def test_errors_are_captured_per_item(self):
+        """Fails if an Authorizenet error aborted the run instead of being recorded on its item."""
+
+        def func(i):
+            if i == 3:
+                raise AuthorizenetError(message="Declined", code="E00001")
+            return i
+
+        results = bulk.run_concurrently(func, range(5))
+        self.assertEqual([r.ok for r in results], [1, 1, 1, 0, 1])
+        self.assertEqual(results[3].error.code, "E00001")
+
+    def test_items_past_timeout_are_timed_out(self):
+        """Fails if an item that missed the deadline wasn't recorded as timed out."""
+
+        def func(i):
+            if i == 1:
+                time.sleep(0.5)
+            return i
+
+        results = bulk.run_concurrently(func, range(3), timeout=0.1)
+        self.assertEqual([r.value for r in results], [0, None, 2])
+        self.assertIsInstance(results[1].error, TimeoutError)
+
+    def test_calls_run_in_callers_context(self):
+        """Fails if a call didn't see a context variable set by the caller."""
+        var = contextvars.ContextVar("var", default="unset")
+        token = var.set("set")
+        try:
+            for timeout in (None, 5):
+                results = bulk.run_concurrently(
+                    lambda item: var.get(), range(3), timeout=timeout
+                )
+                self.assertEqual([r.value for r in results], ["set"] * 3)
+        finally:
+            var.reset(token)
+
+
+class BulkCancelSubscriptionsTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def test_failed_subscriptions_are_not_canceled(self):
+        """Fails if a subscription that failed to cancel in Authorizenet was marked as canceled."""
+        service = MagicMock()
+
+        def execute(request_tuple):
+            request = request_tuple[0]
+            if str(request.subscriptionId) == "2":
+                raise AuthorizenetError(message="Not found", code="E00035")
+            return MagicMock()
+
+        service.execute.side_effect = execute
+        results = bulk.bulk_cancel_subscriptions(
+            Subscription.objects.all(), service=service
+        )
+        self.assertEqual(len([r for r in results if r.ok]), 1)
+        self.assertEqual(Subscription.objects.get(pk=1).status, "canceled")
+        self.assertEqual(Subscription.objects.get(pk=2).status, "active")
+
+
+class BulkSyncSubscriptionStatusesTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def test_statuses_are_saved(self):
+        """Fails if the Authorizenet subscription statuses weren't saved."""
+        service = MagicMock()
+        service.execute.return_value.status = "suspended"
+        bulk.bulk_sync_subscription_statuses(
+            Subscription.objects.all(), service=service
+        )
+        self.assertEqual(
+            set(Subscription.objects.values_list("status", flat=True)),
+            {"suspended"},
+        )
+
+
+class BulkSyncBillingStartDatesTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def test_trial_end_dates_are_backfilled(self):
+        """Fails if subscriptions synced without a trial end date didn't get one from their plan."""
+        SubscriptionPlan.objects.filter(pk=1).update(trial_occurrences=2)
+        service = MagicMock()
+        service.execute.return_value.subscription.paymentSchedule.startDate = (
+            "2026-01-31"
+        )
+        bulk.bulk_sync_billing_start_dates(
+            Subscription.objects.all(), service=service
+        )
+        subscription = Subscription.objects.get(pk=1)
+        self.assertEqual(
+            subscription.billing_starts_on, datetime.date(2026, 1, 31)
+        )
+        self.assertEqual(
+            subscription.trial_ends_on, datetime.date(2026, 3, 31)
+        )
+
+    def test_command_selects_missing_trial_end_dates(self):
+        """Fails if the command didn't sync subscriptions on a trial plan without a trial end date."""
+        Subscription.objects.update(
+            billing_starts_on=datetime.date(2026, 1, 1)
+        )
+        SubscriptionPlan.objects.filter(pk=1).update(trial_occurrences=2)
+        Subscription.objects.filter(pk=2).update(
+            trial_ends_on=datetime.date(2026, 3, 1)
+        )
+        with patch.object(bulk, "bulk_sync_billing_start_dates") as sync:
+            sync.return_value = []
+            call_command("sync_billing_start_dates", stdout=io.StringIO())
+        self.assertEqual([s.pk for s in sync.call_args.args[0]], [1])
+
+
+@override_settings(AUTHORIZENET_SERVICE="unittest.mock.Mock")
+class SubscriptionAdminTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        self.path = "/admin/terminusgps_payments/subscription/"
+        user = get_user_model().objects.get(pk=1)
+        user.is_staff = True
+        user.is_superuser = True
+        user.save(update_fields=["is_staff", "is_superuser"])
+        self.client = Client()
+        self.client.force_login(user)
+
+    def test_cancel_subscriptions_action(self):
+        """Fails if the admin action didn't cancel the selected subscriptions."""
+        response = self.client.post(
+            self.path,
+            data={
+                "action": "cancel_subscriptions",
+                "_selected_action": [1, 2],
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            Subscription.objects.filter(status="canceled").count(), 2
+        )
+
+    def test_change_profiles_requires_single_customer_profile(self):
+        """Fails if subscriptions from different customer profiles could be changed together."""
+        response = self.client.post(
+            self.path,
+            data={
+                "action": "change_subscription_profiles",
+                "_selected_action": [1, 2],
+            },
+            follow=True,
+        )
+        self.assertContains(response, "single customer profile")
@@ -0,0 +1,175 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from terminusgps_payments import caching
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+class LocalCacheTestCase(TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        """Fails if the least recently used entry wasn't evicted when the cache was full."""
+        local = caching.LocalCache(max_size=2, timeout=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+        self.assertEqual(local.get("a"), 1)
+        self.assertIsNone(local.get("b"))
+        self.assertEqual(local.get("c"), 3)
+
+    def test_expired_entry_is_a_miss(self):
+        """Fails if an expired entry was returned."""
+        local = caching.LocalCache(max_size=2, timeout=0)
+        local.set("a", 1)
+        self.assertIsNone(local.get("a"))
+        self.assertEqual(len(local), 0)
+
+    def test_zero_size_stores_nothing(self):
+        """Fails if a cache with no capacity stored a value."""
+        local = caching.LocalCache(max_size=0, timeout=60)
+        local.set("a", 1)
+        self.assertIsNone(local.get("a"))
+
+    def test_values_are_copied(self):
+        """Fails if the cache handed out the object it stored, or one another caller got."""
+        local = caching.LocalCache(max_size=2, timeout=60)
+        value = {"profile": [1]}
+        local.set("a", value)
+        value["profile"].append(2)
+        first = local.get("a")
+        first["profile"].append(3)
+        self.assertEqual(local.get("a"), {"profile": [1]})
+        self.assertIsNot(local.get("a"), local.get("a"))
+
+    def test_size_read_from_settings(self):
+        """Fails if a cache without an explicit size ignored ``AUTHORIZENET_LOCAL_CACHE_SIZE``."""
+        local = caching.LocalCache(timeout=60)
+        with override_settings(AUTHORIZENET_LOCAL_CACHE_SIZE=0):
+            local.set("a", 1)
+        self.assertIsNone(local.get("a"))
+        with override_settings(AUTHORIZENET_LOCAL_CACHE_SIZE=1):
+            local.set("a", 1)
+            local.set("b", 2)
+        self.assertEqual(len(local), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GetOrFetchTestCase(TestCase):
+    def setUp(self):
+        self.local_cache = caching.LocalCache(max_size=16, timeout=60)
+        patcher = patch.object(caching, "local_cache", self.local_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_second_read_is_a_local_hit(self):
+        """Fails if a cached value was fetched again."""
+        fetch = MagicMock(return_value="value")
+        self.assertEqual(caching.get_or_fetch("key", fetch), "value")
+        self.assertEqual(caching.get_or_fetch("key", fetch), "value")
+        fetch.assert_called_once()
+        self.assertEqual(self.local_cache.get("key"), "value")
+
+    def test_shared_hit_fills_local_tier(self):
+        """Fails if a value cached by another process wasn't copied into the local tier."""
+        caching.set_value("key", "value")
+        self.local_cache.clear()
+        fetch = MagicMock()
+        self.assertEqual(caching.get_or_fetch("key", fetch), "value")
+        fetch.assert_not_called()
+        self.assertEqual(self.local_cache.get("key"), "value")
+
+    def test_none_is_not_cached(self):
+        """Fails if a :py:obj:`None` result was cached."""
+        fetch = MagicMock(return_value=None)
+        caching.get_or_fetch("key", fetch)
+        caching.get_or_fetch("key", fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_fetch_error_propagates_on_miss(self):
+        """Fails if an error raised by fetch on a miss was swallowed or left the lock held."""
+        fetch = MagicMock(side_effect=ValueError("boom"))
+        with self.assertRaises(ValueError):
+            caching.get_or_fetch("key", fetch)
+        self.assertIsNone(cache.get(caching.get_fetch_lock_key("key")))
+
+    def test_invalidation_clears_both_tiers(self):
+        """Fails if an invalidated subscription was still cached in either tier."""
+        key = caching.get_subscription_key(1)
+        caching.set_value(key, "value")
+        caching.invalidate_subscriptions([1])
+        self.assertIsNone(self.local_cache.get(key))
+        self.assertIsNone(cache.get(key))
+
+    def test_concurrent_misses_fetch_once(self):
+        """Fails if concurrent misses in one process called fetch more than once."""
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    caching.get_or_fetch("key", fetch)
+                )
+            )
+            for _ in range(5)
+        ]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+
+    def test_miss_waits_for_other_process(self):
+        """Fails if a miss fetched while another process held the fetch lock."""
+        self.local_cache.max_size = 0
+        cache.add(caching.get_fetch_lock_key("key"), True)
+        timer = threading.Timer(0.1, caching.set_value, args=("key", "value"))
+        timer.start()
+        fetch = MagicMock()
+        self.assertEqual(caching.get_or_fetch("key", fetch), "value")
+        fetch.assert_not_called()
+        timer.join()
+
+    def test_stale_value_is_refreshed(self):
+        """Fails if a stale value wasn't refreshed by the first caller."""
+        cache.set("key", ("stale", 0))
+        fetch = MagicMock(return_value="fresh")
+        self.assertEqual(caching.get_or_fetch("key", fetch), "fresh")
+        self.assertEqual(cache.get("key")[0], "fresh")
+
+    def test_stale_value_is_served_during_refresh(self):
+        """Fails if a stale value wasn't served while another caller refreshed it."""
+        cache.set("key", ("stale", 0))
+        cache.add(caching.get_fetch_lock_key("key"), True)
+        fetch = MagicMock()
+        self.assertEqual(caching.get_or_fetch("key", fetch), "stale")
+        fetch.assert_not_called()
+
+    def test_stale_value_is_served_when_refresh_fails(self):
+        """Fails if a failed refresh raised instead of serving the stale value."""
+        cache.set("key", ("stale", 0))
+        fetch = MagicMock(side_effect=ValueError("boom"))
+        with self.assertLogs("terminusgps_payments.caching", "WARNING"):
+            self.assertEqual(caching.get_or_fetch("key", fetch), "stale")
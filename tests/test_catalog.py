@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from terminusgps_payments import catalog
+from terminusgps_payments.models import SubscriptionPlan
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PlanCatalogTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_catalog_contains_visible_plans(self):
+        """Fails if the catalog contained a hidden plan or a field that isn't displayed."""
+        plans = catalog.get_catalog()["plans"]
+        visible = SubscriptionPlan.objects.filter(visibility="vis")
+        self.assertEqual(
+            [plan["pk"] for plan in plans],
+            list(visible.values_list("pk", flat=True)),
+        )
+        self.assertEqual(set(plans[0]), set(catalog.CATALOG_FIELDS))
+
+    def test_catalog_is_cached_per_version(self):
+        """Fails if a cached catalog was rebuilt without a plan change."""
+        version = catalog.get_catalog()["version"]
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.get_catalog()["version"], version)
+
+    def test_plan_change_starts_new_version(self):
+        """Fails if saving a plan didn't start a new catalog version with the change."""
+        version = catalog.get_catalog()["version"]
+        plan = SubscriptionPlan.objects.filter(visibility="vis").first()
+        plan.name = "Renamed Plan"
+        with self.captureOnCommitCallbacks(execute=True):
+            plan.save()
+        result = catalog.get_catalog()
+        self.assertNotEqual(result["version"], version)
+        self.assertIn("Renamed Plan", [p["name"] for p in result["plans"]])
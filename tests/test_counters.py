@@ -0,0 +1,122 @@
+import io
+from unittest.mock import MagicMock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+from terminusgps_payments import bulk, caching, counters
+from terminusgps_payments.models import CustomerProfile, Subscription
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+class SubscriptionCountersTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        counters.repair()
+
+    def get_profile(self, pk: int = 1) -> CustomerProfile:
+        return CustomerProfile.objects.get(pk=pk)
+
+    def test_repair_counts_subscriptions(self):
+        """Fails if a repair didn't count each customer's subscriptions per status in one grouped query."""
+        CustomerProfile.objects.update(active_subscription_count=5)
+        with self.assertNumQueries(5):
+            self.assertEqual(counters.repair(), 2)
+        self.assertEqual(self.get_profile().active_subscription_count, 1)
+        self.assertEqual(counters.repair(), 0)
+
+    def test_repair_is_limited_to_queryset(self):
+        """Fails if a repair corrected customer profiles outside of the queryset."""
+        CustomerProfile.objects.update(active_subscription_count=5)
+        self.assertEqual(
+            counters.repair(CustomerProfile.objects.filter(pk=1)), 1
+        )
+        self.assertEqual(self.get_profile(1).active_subscription_count, 1)
+        self.assertEqual(self.get_profile(2).active_subscription_count, 5)
+
+    def test_admin_action_repairs_selected_profiles(self):
+        """Fails if the admin action repaired customer profiles that weren't selected."""
+        user = get_user_model().objects.get(pk=1)
+        user.is_staff = True
+        user.is_superuser = True
+        user.save(update_fields=["is_staff", "is_superuser"])
+        client = Client()
+        client.force_login(user)
+        CustomerProfile.objects.update(active_subscription_count=5)
+        response = client.post(
+            "/admin/terminusgps_payments/customerprofile/",
+            data={
+                "action": "repair_subscription_counters",
+                "_selected_action": [2],
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.get_profile(1).active_subscription_count, 5)
+        self.assertEqual(self.get_profile(2).active_subscription_count, 1)
+
+    def test_apply_changes_moves_counts(self):
+        """Fails if a status change didn't move one count between the status counters."""
+        with self.assertNumQueries(2):
+            counters.apply_changes([(1, "active", "canceled")])
+        profile = self.get_profile()
+        self.assertEqual(profile.active_subscription_count, 0)
+        self.assertEqual(profile.canceled_subscription_count, 1)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_apply_changes_invalidates_cached_profile(self):
+        """Fails if the cached customer profile kept its old counters after a change committed."""
+        key = caching.get_user_customer_profile_key(1)
+        caching.set_value(key, self.get_profile())
+        with self.captureOnCommitCallbacks(execute=True):
+            counters.apply_changes([(1, "active", "canceled")])
+        self.assertIsNone(caching.get(key))
+        caching.local_cache.clear()
+
+    def test_save_updates_counters(self):
+        """Fails if saving a subscription's new status or customer profile didn't move its counts."""
+        subscription = Subscription.objects.get(pk=1)
+        subscription.status = "suspended"
+        subscription.save(update_fields=["status"])
+        subscription.customer_profile_id = 2
+        subscription.save()
+        subscription.save(update_fields=["expires_on"])
+        self.assertEqual(counters.repair(), 0)
+        self.assertEqual(self.get_profile(2).suspended_subscription_count, 1)
+        Subscription.objects.create(
+            pk=3, customer_profile_id=1, plan_id=1, status="active"
+        )
+        self.assertEqual(self.get_profile(1).active_subscription_count, 1)
+        self.assertEqual(counters.repair(), 0)
+
+    def test_bulk_cancel_updates_counters(self):
+        """Fails if canceling subscriptions in bulk didn't update their customers' counters."""
+        bulk.bulk_cancel_subscriptions(
+            Subscription.objects.all(), service=MagicMock()
+        )
+        for profile in CustomerProfile.objects.all():
+            self.assertEqual(profile.active_subscription_count, 0)
+            self.assertEqual(profile.canceled_subscription_count, 1)
+
+    def test_delete_decrements_counter(self):
+        """Fails if deleting a subscription didn't decrement its customer's counter."""
+        Subscription.objects.get(pk=1).delete()
+        self.assertEqual(self.get_profile().active_subscription_count, 0)
+
+    def test_command_repairs_counters(self):
+        """Fails if the management command didn't repair drifted counters."""
+        CustomerProfile.objects.filter(pk=2).update(
+            terminated_subscription_count=3
+        )
+        stdout = io.StringIO()
+        call_command("repair_subscription_counters", stdout=stdout)
+        self.assertIn("Repaired 1 customer profile(s).", stdout.getvalue())
+        self.assertEqual(self.get_profile(2).terminated_subscription_count, 0)
@@ -0,0 +1,93 @@
+from unittest.mock import MagicMock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from lxml import objectify
+
+from terminusgps_payments import exports
+from terminusgps_payments.models import Subscription
+
+
+class StreamCsvTestCase(TestCase):
+    def test_stream_csv(self):
+        """Fails if :py:func:`stream_csv` doesn't yield one CSV line per row after the header."""
+        lines = list(
+            exports.stream_csv(("a", "b"), iter([(1, 2), (3, "x,y")]))
+        )
+        self.assertEqual(lines, ["a,b\r\n", "1,2\r\n", '3,"x,y"\r\n'])
+
+
+class IterSubscriptionRowsTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def test_rows(self):
+        """Fails if a row wasn't yielded for every subscription in the queryset."""
+        rows = list(exports.iter_subscription_rows(Subscription.objects.all()))
+        self.assertEqual([row[0] for row in rows], [1, 2])
+        self.assertEqual(rows[0][4], "testuser@domain.com")
+        self.assertEqual(rows[0][7], "Basic Subscription")
+
+    def test_rows_use_constant_queries(self):
+        """Fails if related objects were fetched with a query per row."""
+        with self.assertNumQueries(1):
+            list(exports.iter_subscription_rows(Subscription.objects.all()))
+
+
+class IterTransactionRowsTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def test_rows(self):
+        """Fails if a row wasn't yielded for every transaction in the Authorizenet response."""
+        response = objectify.fromstring(
+            "<response><subscription><arbTransactions>"
+            "<arbTransaction><transId>100</transId><payNum>1</payNum></arbTransaction>"
+            "<arbTransaction><transId>101</transId><payNum>2</payNum></arbTransaction>"
+            "</arbTransactions></subscription></response>"
+        )
+        service = MagicMock()
+        service.execute.return_value = response
+        queryset = Subscription.objects.filter(pk=1)
+        rows = list(exports.iter_transaction_rows(queryset, service))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(str(rows[0][1]), "100")
+        self.assertEqual(str(rows[1][4]), "2")
+
+
+@override_settings(AUTHORIZENET_SERVICE="unittest.mock.Mock")
+class SubscriptionExportViewTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        self.path = "/subscriptions/export/"
+        self.user = get_user_model().objects.get(pk=1)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_non_staff_user_returns_403(self):
+        """Fails if a request from a non-staff user returns anything other than 403."""
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 403)
+
+    def test_staff_user_receives_streaming_csv(self):
+        """Fails if a staff user doesn't receive a streaming CSV response."""
+        self.user.is_staff = True
+        self.user.save(update_fields=["is_staff"])
+        response = self.client.get(self.path, query_params={"plan": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode()
+        lines = content.splitlines()
+        self.assertEqual(lines[0], ",".join(exports.SUBSCRIPTION_CSV_HEADER))
+        self.assertEqual(len(lines), 3)
@@ -5,6 +5,7 @@ from django.test import TestCase
 from terminusgps_payments.forms import (
     AddressForm,
     BankAccountForm,
+    BulkCreateSubscriptionForm,
     CreditCardForm,
     luhn_check,
 )
@@ -86,3 +87,45 @@ class BankAccountFormTestCase(TestCase):
         form = BankAccountForm(data={})
         with self.assertRaises(ValueError):
             form.build_contract()
+
+
+class BulkCreateSubscriptionFormTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def get_form(self, **data):
+        form = BulkCreateSubscriptionForm(
+            data={
+                "plan": 1,
+                "payment_profile": "1",
+                "shipping_profile": "1",
+                **data,
+            }
+        )
+        form.fields["payment_profile"].choices = [("1", "Card")]
+        form.fields["shipping_profile"].choices = [("1", "Address")]
+        return form
+
+    def test_quantity_or_units_is_required(self):
+        """Fails if the form was valid without a quantity or a list of units."""
+        form = self.get_form()
+        self.assertFalse(form.is_valid())
+
+    def test_units_override_quantity(self):
+        """Fails if a list of units didn't set the quantity and subscription names."""
+        form = self.get_form(quantity=10, units="Truck 1\n\nTruck 2\n")
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["quantity"], 2)
+        self.assertEqual(
+            form.get_subscription_names(),
+            ["Basic Subscription - Truck 1", "Basic Subscription - Truck 2"],
+        )
+
+    def test_quantity_over_maximum_is_invalid(self):
+        """Fails if the form was valid with a quantity over :py:attr:`max_quantity`."""
+        max_quantity = BulkCreateSubscriptionForm.max_quantity
+        form = self.get_form(quantity=max_quantity + 1)
+        self.assertFalse(form.is_valid())
@@ -0,0 +1,297 @@
+import csv
+import io
+import itertools
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from lxml import objectify
+from terminusgps.authorizenet.service import AuthorizenetError
+
+from terminusgps_payments import bulk, imports
+
+ADDRESS = {
+    "firstName": "Ann",
+    "lastName": "Smith",
+    "address": "1 Main St",
+    "city": "Houston",
+    "state": "TX",
+    "zip": "77065",
+}
+CARD = {
+    "cardNumber": "4111111111111111",
+    "cardCode": "123",
+    "expirationDate": "2099-01",
+}
+BANK_ACCOUNT = {
+    "accountType": "checking",
+    "accountNumber": "123456789",
+    "routingNumber": "121042882",
+    "nameOnAccount": "Ann Smith",
+    "bankName": "Bank",
+}
+
+
+def make_rows(*rows: dict) -> list[dict]:
+    return [
+        {field: row.get(field, "") for field in imports.IMPORT_CSV_HEADER}
+        for row in rows
+    ]
+
+
+def to_csv(rows: list[dict]) -> str:
+    file = io.StringIO()
+    writer = csv.DictWriter(file, fieldnames=imports.IMPORT_CSV_HEADER)
+    writer.writeheader()
+    writer.writerows(rows)
+    return file.getvalue()
+
+
+def execute(request_tuple, reference_id=None):
+    request, _ = request_tuple
+    if str(request.customerProfileId) == "2":
+        raise AuthorizenetError(message="Duplicate profile.", code="E00039")
+    if getattr(request, "address", None) is not None:
+        return objectify.fromstring(
+            b"<response><customerAddressId>20</customerAddressId></response>"
+        )
+    return objectify.fromstring(
+        b"<response><customerPaymentProfileId>10</customerPaymentProfileId></response>"
+    )
+
+
+@override_settings(AUTHORIZENET_SERVICE="unittest.mock.Mock")
+class ImportTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+    ]
+
+    def setUp(self):
+        self.service = MagicMock()
+        self.service.execute.side_effect = execute
+
+    def import_rows(self, rows):
+        return list(
+            imports.import_rows(rows, service=self.service, max_workers=2)
+        )
+
+    def test_valid_rows_created(self):
+        """Fails if valid card, bank account and address rows weren't created with their new ids."""
+        results = self.import_rows(
+            make_rows(
+                {
+                    "customer_profile_id": "1",
+                    "type": "credit_card",
+                    **ADDRESS,
+                    **CARD,
+                },
+                {
+                    "customer_profile_id": "1",
+                    "type": "bank_account",
+                    **ADDRESS,
+                    **BANK_ACCOUNT,
+                },
+                {"customer_profile_id": "1", "type": "address", **ADDRESS},
+            )
+        )
+        self.assertEqual(
+            [(r.line, r.status, r.id) for r in results],
+            [(2, "created", "10"), (3, "created", "10"), (4, "created", "20")],
+        )
+        self.assertEqual(self.service.execute.call_count, 3)
+
+    def test_invalid_rows_not_submitted(self):
+        """Fails if invalid rows were submitted to Authorizenet or weren't reported with their errors."""
+        results = self.import_rows(
+            make_rows(
+                {
+                    "customer_profile_id": "1",
+                    "type": "credit_card",
+                    **ADDRESS,
+                    **CARD,
+                    "cardNumber": "4111111111111112",
+                },
+                {
+                    "customer_profile_id": "1",
+                    "type": "credit_card",
+                    **ADDRESS,
+                    **CARD,
+                    "expirationDate": "2000-01",
+                },
+                {
+                    "customer_profile_id": "1",
+                    "type": "address",
+                    "city": "Houston",
+                },
+                {"customer_profile_id": "1", "type": "check", **ADDRESS},
+                {"customer_profile_id": "999", "type": "address", **ADDRESS},
+                {"customer_profile_id": "x", "type": "address", **ADDRESS},
+            )
+        )
+        self.assertEqual({r.status for r in results}, {"invalid"})
+        self.assertIn("Invalid card number.", results[0].error)
+        self.assertIn("expirationDate", results[1].error)
+        self.assertIn("firstName", results[2].error)
+        self.assertIn("type", results[3].error)
+        self.assertIn("doesn't exist", results[4].error)
+        self.assertIn("customer_profile_id", results[5].error)
+        self.service.execute.assert_not_called()
+
+    def test_gateway_errors_reported(self):
+        """Fails if a row rejected by Authorizenet wasn't reported as failed."""
+        [result] = self.import_rows(
+            make_rows(
+                {"customer_profile_id": "2", "type": "address", **ADDRESS}
+            )
+        )
+        self.assertEqual(result.status, "failed")
+        self.assertIn("Duplicate profile.", result.error)
+
+    def test_rows_read_lazily(self):
+        """Fails if rows were read further ahead than the concurrency window."""
+        read = itertools.count()
+
+        def rows():
+            row = make_rows(
+                {"customer_profile_id": "1", "type": "address", **ADDRESS}
+            )[0]
+            while True:
+                next(read)
+                yield row
+
+        results = imports.import_rows(
+            rows(), service=self.service, max_workers=2, window=4
+        )
+        for _ in range(10):
+            next(results)
+        results.close()
+        self.assertLessEqual(next(read), 10 + 4)
+
+    def test_iter_concurrently_preserves_order(self):
+        """Fails if results weren't yielded in the same order as their items."""
+        results = bulk.iter_concurrently(
+            lambda item: item * 2, range(100), max_workers=4, window=8
+        )
+        self.assertEqual([r.value for r in results], list(range(0, 200, 2)))
+
+    def test_command_writes_results(self):
+        """Fails if the import command didn't write a result for each row."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "profiles.csv"
+            path.write_text(
+                to_csv(
+                    make_rows(
+                        {
+                            "customer_profile_id": "1",
+                            "type": "address",
+                            **ADDRESS,
+                        },
+                        {"customer_profile_id": "1", "type": "address"},
+                    )
+                )
+            )
+            with patch(
+                "terminusgps_payments.services.get_service",
+                return_value=self.service,
+            ):
+                call_command(
+                    "import_payment_profiles", str(path), stdout=io.StringIO()
+                )
+            with open(f"{path}.results.csv", newline="") as file:
+                results = list(csv.DictReader(file))
+        self.assertEqual(
+            [r["status"] for r in results], ["created", "invalid"]
+        )
+
+    def test_upload_view(self):
+        """Fails if the upload endpoint wasn't restricted to staff, didn't write the upload's results to a file or kept a partial result file."""
+        user = get_user_model().objects.get(pk=1)
+        client = Client()
+        client.force_login(user)
+        upload = to_csv(
+            make_rows(
+                {"customer_profile_id": "1", "type": "address", **ADDRESS}
+            )
+        )
+        self.assertEqual(
+            client.get("/customer-profiles/import/").status_code, 403
+        )
+        user.is_staff = True
+        user.save(update_fields=["is_staff"])
+        self.assertEqual(
+            client.get("/customer-profiles/import/").status_code, 200
+        )
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            self.settings(PAYMENTS_IMPORT_DIR=tmp),
+            patch(
+                "terminusgps_payments.services.get_service",
+                return_value=self.service,
+            ),
+            patch.object(
+                imports, "new_result_name", return_value="results.csv"
+            ),
+        ):
+            response = client.post(
+                "/customer-profiles/import/",
+                {"file": SimpleUploadedFile("profiles.csv", upload.encode())},
+            )
+            self.assertRedirects(
+                response, "/customer-profiles/import/results.csv/"
+            )
+            response = client.get("/customer-profiles/import/results.csv/")
+            content = b"".join(response.streaming_content).decode()
+            self.assertEqual(response["Content-Type"], "text/csv")
+            self.assertIn("2,1,address,created,20,", content)
+            response = client.get("/customer-profiles/import/pending.csv/")
+            self.assertEqual(response.status_code, 404)
+            response = client.post(
+                "/customer-profiles/import/",
+                {"file": SimpleUploadedFile("profiles.csv", b"\xff\xfe")},
+            )
+            self.assertFormError(
+                response.context["form"], "file", "File must be UTF-8 encoded."
+            )
+            self.assertEqual(
+                list(Path(tmp).iterdir()), [Path(tmp) / "results.csv"]
+            )
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_upload_is_kept_in_memory(self):
+        """Fails if an uploaded import file was written to a temporary file on disk."""
+        user = get_user_model().objects.get(pk=1)
+        user.is_staff = True
+        user.save(update_fields=["is_staff"])
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(user)
+        response = client.get("/customer-profiles/import/")
+        upload = to_csv(make_rows({"customer_profile_id": "1"}))
+        read = []
+        with (
+            patch.object(
+                imports,
+                "import_csv",
+                side_effect=lambda f: read.append(f.read()),
+            ),
+            patch.object(imports, "write_results"),
+            patch(
+                "django.core.files.uploadhandler.TemporaryFileUploadHandler.new_file"
+            ) as new_file,
+        ):
+            response = client.post(
+                "/customer-profiles/import/",
+                {
+                    "file": SimpleUploadedFile(
+                        "profiles.csv", upload.encode()
+                    ),
+                    "csrfmiddlewaretoken": response.context["csrf_token"],
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        new_file.assert_not_called()
+        self.assertEqual(read, [upload])
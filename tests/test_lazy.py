@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from terminusgps_payments.lazy import lazy_module
+
+STARTUP = """
+import sys
+import django
+django.setup()
+from django.core import checks
+from django.urls import get_resolver
+get_resolver().url_patterns
+checks.run_checks()
+print("authorizenet.apicontractsv1" in sys.modules)
+"""
+
+
+class LazyModuleTestCase(SimpleTestCase):
+    def test_module_is_imported_on_attribute_access(self):
+        """Fails if the lazy module didn't resolve attributes of the real module."""
+        module = lazy_module("json")
+        self.assertEqual(module.dumps([1]), "[1]")
+
+    def test_startup_does_not_import_contracts(self):
+        """Fails if setting up Django and loading the URLconf imported the Authorizenet contract bindings."""
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP],
+            capture_output=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+            env=os.environ | {"DJANGO_SETTINGS_MODULE": "src.settings"},
+            text=True,
+        )
+        self.assertEqual(result.stdout.strip(), "False")
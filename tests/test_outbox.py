@@ -0,0 +1,136 @@
+from unittest.mock import patch
+
+from django.core import mail
+from django.db import transaction
+from django.test import TestCase
+
+from terminusgps_payments import outbox, revenue
+from terminusgps_payments.models import OutboxEvent
+
+
+class PublishTestCase(TestCase):
+    def test_dispatch_is_scheduled_on_commit(self):
+        """Fails if publishing an event didn't dispatch it after the transaction committed."""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            event = outbox.publish(
+                "subscription.canceled",
+                {
+                    "customer_profile_id": 1,
+                    "subscription_ids": [1],
+                    "email": {
+                        "recipient_list": ["testuser@domain.com"],
+                        "context": {"plan_name": "Basic Subscription"},
+                    },
+                },
+            )
+        # The dispatch, then the email enqueued by its handler
+        self.assertEqual(len(callbacks), 2)
+        event.refresh_from_db()
+        self.assertIsNotNone(event.dispatched_at)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["testuser@domain.com"])
+
+    def test_rolled_back_event_is_discarded(self):
+        """Fails if an event published in a rolled back transaction was saved."""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    outbox.publish("test.event", {})
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(len(callbacks), 0)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+
+class DispatchTestCase(TestCase):
+    def test_events_are_dispatched_once(self):
+        """Fails if an event's handlers ran more than once over several dispatches."""
+        calls = []
+        with patch.dict(outbox._handlers, {"test.event": [calls.append]}):
+            OutboxEvent.objects.create(kind="test.event", payload={"n": 1})
+            OutboxEvent.objects.create(kind="test.event", payload={"n": 2})
+            self.assertEqual(outbox.dispatch_all(batch_size=1), 2)
+            self.assertEqual(outbox.dispatch_all(), 0)
+        self.assertEqual(calls, [{"n": 1}, {"n": 2}])
+
+    def test_failed_events_are_retried(self):
+        """Fails if an event whose handler raised was marked dispatched or not retried."""
+
+        def fail(payload):
+            raise RuntimeError("Handler failed")
+
+        event = OutboxEvent.objects.create(kind="test.event")
+        with patch.dict(outbox._handlers, {"test.event": [fail]}):
+            self.assertEqual(outbox.dispatch(), 0)
+            self.assertEqual(outbox.dispatch(), 0)
+        event.refresh_from_db()
+        self.assertIsNone(event.dispatched_at)
+        self.assertEqual(event.attempts, 2)
+        self.assertEqual(event.last_error, "Handler failed")
+
+    def test_delivered_handlers_arent_retried(self):
+        """Fails if a handler that completed ran again when a later handler of the same event was retried."""
+        calls = []
+
+        def handle(payload):
+            calls.append(payload)
+
+        def fail(payload):
+            if len(calls) < 2:
+                raise RuntimeError("Handler failed")
+
+        event = OutboxEvent.objects.create(kind="test.event", payload={"n": 1})
+        with patch.dict(outbox._handlers, {"test.event": [handle, fail]}):
+            self.assertEqual(outbox.dispatch(), 0)
+            self.assertEqual(outbox.dispatch(), 0)
+        self.assertEqual(calls, [{"n": 1}])
+        self.assertEqual(
+            list(event.deliveries.values_list("handler", flat=True)),
+            [outbox.get_handler_name(handle)],
+        )
+
+    def test_email_isnt_resent_on_retry(self):
+        """Fails if a subscription email was sent again when a later handler of its event failed."""
+        event = OutboxEvent.objects.create(
+            kind="subscription.canceled",
+            payload={
+                "customer_profile_id": 1,
+                "email": {"recipient_list": ["testuser@domain.com"]},
+            },
+        )
+        with (
+            self.captureOnCommitCallbacks(execute=True),
+            patch.object(
+                revenue, "apply_deltas", side_effect=RuntimeError("Failed")
+            ),
+        ):
+            outbox.dispatch()
+            outbox.dispatch()
+        event.refresh_from_db()
+        self.assertEqual(event.attempts, 2)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failing_events_dont_block_later_events(self):
+        """Fails if a batch of failing events stopped :py:func:`dispatch_all` from reaching the events after it."""
+        calls = []
+
+        def handle(payload):
+            if payload.get("fail"):
+                raise RuntimeError("Handler failed")
+            calls.append(payload)
+
+        OutboxEvent.objects.create(kind="test.event", payload={"fail": True})
+        OutboxEvent.objects.create(kind="test.event", payload={"fail": True})
+        OutboxEvent.objects.create(kind="test.event", payload={"n": 1})
+        with patch.dict(outbox._handlers, {"test.event": [handle]}):
+            self.assertEqual(outbox.dispatch_all(batch_size=1), 1)
+        self.assertEqual(calls, [{"n": 1}])
+        self.assertEqual(
+            list(
+                OutboxEvent.objects.order_by("pk").values_list(
+                    "attempts", flat=True
+                )
+            ),
+            [1, 1, 0],
+        )
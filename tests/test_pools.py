@@ -0,0 +1,185 @@
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import Client, RequestFactory, TestCase, override_settings
+from terminusgps.authorizenet.service import AuthorizenetService
+
+from terminusgps_payments import (
+    bulk,
+    pools,
+    pricing,
+    services,
+    throttling,
+    views,
+)
+from terminusgps_payments.gateway import (
+    PooledAuthorizenetService,
+    PoolExhausted,
+)
+from terminusgps_payments.models import (
+    CustomerProfile,
+    Subscription,
+    SubscriptionPlan,
+)
+
+MERCHANTS = {
+    "acme": {"login_id": "acme-login", "transaction_key": "acme-key"},
+    "globex": {
+        "login_id": "globex-login",
+        "transaction_key": "globex-key",
+        "max_connections": 1,
+        "acquire_timeout": 0,
+    },
+}
+
+
+@override_settings(AUTHORIZENET_MERCHANTS=MERCHANTS)
+class MerchantPoolTestCase(TestCase):
+    def setUp(self):
+        pools.clear_pools()
+
+    def test_get_pool(self):
+        """Fails if pools weren't created once per configured merchant."""
+        self.assertIsNone(pools.get_pool(""))
+        self.assertIsNone(pools.get_pool("initech"))
+        acme = pools.get_pool("acme")
+        self.assertIs(pools.get_pool("acme"), acme)
+        self.assertIsNot(pools.get_pool("globex"), acme)
+
+    def test_pool_is_replaced_when_its_configuration_changes(self):
+        """Fails if a merchant's pool outlived a change to its configuration."""
+        acme = pools.get_pool("acme")
+        merchants = {"acme": {**MERCHANTS["acme"], "max_connections": 2}}
+        with self.settings(AUTHORIZENET_MERCHANTS=merchants):
+            self.assertEqual(pools.get_pool("acme").max_connections, 2)
+        self.assertIsNot(pools.get_pool("acme"), acme)
+
+    def test_service_uses_pool_credentials(self):
+        """Fails if a pooled service didn't authenticate as its merchant."""
+        service = services.get_service(
+            priority=throttling.BATCH, merchant_id="acme"
+        )
+        self.assertEqual(service.merchantAuthentication.name, "acme-login")
+        self.assertEqual(service.priority, throttling.BATCH)
+        self.assertIs(
+            pools.get_pool("acme").get_service(throttling.BATCH), service
+        )
+
+    def test_requests_get_their_own_merchant_authentication(self):
+        """Fails if concurrent requests through a shared pooled service shared a merchant authentication element."""
+        service = pools.get_pool("acme").get_service()
+        self.assertIsNot(
+            service.merchantAuthentication, service.merchantAuthentication
+        )
+
+    def test_exhausted_pool_does_not_block_other_merchants(self):
+        """Fails if a full pool didn't reject calls, or rejected another merchant's calls."""
+        globex = pools.get_pool("globex")
+        with globex.connection():
+            with self.assertRaises(PoolExhausted):
+                with globex.connection():
+                    pass
+            with pools.get_pool("acme").connection():
+                pass
+        self.assertEqual(globex.get_metrics()["rejected"], 1)
+        self.assertEqual(globex.get_metrics()["calls"], 1)
+
+    def test_connections_are_limited_across_threads(self):
+        """Fails if more calls than ``max_connections`` ran at once."""
+        pool = pools.MerchantPool(
+            "test", "login", "key", max_connections=2, acquire_timeout=5
+        )
+        barrier = threading.Barrier(4)
+
+        def call():
+            barrier.wait()
+            with pool.connection():
+                threading.Event().wait(0.05)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics = pool.get_metrics()
+        self.assertEqual(metrics["calls"], 4)
+        self.assertEqual(metrics["peak_in_flight"], 2)
+        self.assertEqual(metrics["in_flight"], 0)
+
+    def test_execute_uses_merchant_bucket_and_records_metrics(self):
+        """Fails if a pooled call didn't use its merchant's rate limit bucket or wasn't counted."""
+        service = pools.get_pool("acme").get_service()
+        with (
+            patch.object(throttling, "get_bucket", return_value=None) as get,
+            patch.object(AuthorizenetService, "execute", return_value="ok"),
+        ):
+            self.assertEqual(service.execute(("request", None)), "ok")
+        get.assert_called_once_with(throttling.INTERACTIVE, namespace="acme")
+        self.assertEqual(pools.get_pool_metrics()["acme"]["calls"], 1)
+
+
+@override_settings(
+    AUTHORIZENET_MERCHANTS=MERCHANTS, AUTHORIZENET_SERVICE="unittest.mock.Mock"
+)
+class MerchantPoolViewTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        pools.clear_pools()
+
+    def test_bulk_operations_use_customer_merchant(self):
+        """Fails if a bulk operation called Authorizenet for a subscription with another merchant's service."""
+        CustomerProfile.objects.filter(pk=1).update(merchant_id="acme")
+        migration, _ = pricing.get_or_create_plan_price_migration(
+            SubscriptionPlan.objects.get(pk=1)
+        )
+        with patch.object(
+            PooledAuthorizenetService, "execute", autospec=True
+        ) as execute:
+            bulk.bulk_cancel_subscriptions(Subscription.objects.all())
+            pricing.run_plan_price_migration(migration)
+        self.assertEqual(
+            {call.args[0].pool.merchant_id for call in execute.call_args_list},
+            {"acme"},
+        )
+        self.assertEqual(
+            {
+                int(call.args[1][0].subscriptionId)
+                for call in execute.call_args_list
+            },
+            {1},
+        )
+
+    def test_view_service_is_looked_up_from_customer_profile(self):
+        """Fails if a view didn't use the pool of its customer's merchant."""
+        CustomerProfile.objects.filter(pk=1).update(merchant_id="acme")
+        request = RequestFactory().get("/customer-profile/details/")
+        request.user = get_user_model().objects.get(pk=1)
+        view = views.CustomerProfileDetailView()
+        view.setup(request)
+        self.assertIs(view.service, pools.get_pool("acme").get_service())
+
+    def test_view_without_merchant_uses_default_service(self):
+        """Fails if a customer without a configured merchant didn't get the default service."""
+        request = RequestFactory().get("/customer-profile/details/")
+        request.user = get_user_model().objects.get(pk=1)
+        view = views.CustomerProfileDetailView()
+        view.setup(request)
+        self.assertNotIsInstance(view.service, PooledAuthorizenetService)
+
+    def test_metrics_view_requires_staff(self):
+        """Fails if the pool metrics weren't restricted to staff."""
+        pools.get_pool("acme")
+        client = Client()
+        client.force_login(get_user_model().objects.get(pk=1))
+        self.assertEqual(
+            client.get("/merchant-pools/metrics/").status_code, 403
+        )
+        get_user_model().objects.filter(pk=1).update(is_staff=True)
+        response = client.get("/merchant-pools/metrics/")
+        self.assertEqual(response.json()["acme"]["max_connections"], 8)
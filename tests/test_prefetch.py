@@ -0,0 +1,87 @@
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+
+from terminusgps_payments import caching, prefetch, throttling, views
+
+
+class StubService:
+    def execute(self, request_tuple):
+        return {"response": True}
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    AUTHORIZENET_SERVICE="tests.test_prefetch.StubService",
+)
+class PrefetchCustomerTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def tearDown(self):
+        cache.clear()
+        caching.local_cache.clear()
+
+    def test_prefetch_customer_caches_responses(self):
+        """Fails if the customer profile and subscription responses weren't cached."""
+        count = prefetch.prefetch_customer(1, service=StubService())
+        self.assertEqual(count, 2)
+        self.assertIsNotNone(caching.get(caching.get_customer_profile_key(1)))
+        self.assertIsNotNone(caching.get(caching.get_subscription_key(1)))
+        self.assertEqual(
+            caching.get(caching.get_user_customer_profile_key(1)).pk, 1
+        )
+
+    def test_login_prefetches_customer(self):
+        """Fails if logging in didn't warm the user's customer profile cache."""
+        client = Client()
+        client.force_login(get_user_model().objects.get(pk=1))
+        self.assertIsNotNone(caching.get(caching.get_customer_profile_key(1)))
+        self.assertTrue(caching.acquire_prefetch_lock(1))
+
+    def test_login_prefetch_uses_batch_priority(self):
+        """Fails if the login prefetch called Authorizenet with interactive priority."""
+        client = Client()
+        with patch(
+            "terminusgps_payments.services.get_service",
+            return_value=StubService(),
+        ) as get_service:
+            client.force_login(get_user_model().objects.get(pk=1))
+        self.assertEqual(
+            get_service.call_args.kwargs["priority"], throttling.BATCH
+        )
+
+    @override_settings(AUTHORIZENET_PREFETCH_ON_LOGIN=False)
+    def test_login_prefetch_can_be_disabled(self):
+        """Fails if logging in prefetched with ``AUTHORIZENET_PREFETCH_ON_LOGIN`` disabled."""
+        client = Client()
+        client.force_login(get_user_model().objects.get(pk=1))
+        self.assertIsNone(caching.get(caching.get_customer_profile_key(1)))
+
+    def test_concurrent_prefetch_is_skipped(self):
+        """Fails if a login enqueued a prefetch while another one was running."""
+        caching.acquire_prefetch_lock(1)
+        client = Client()
+        client.force_login(get_user_model().objects.get(pk=1))
+        self.assertIsNone(caching.get(caching.get_customer_profile_key(1)))
+
+    def test_prefetched_response_is_a_cache_hit(self):
+        """Fails if the customer profile view called Authorizenet after a prefetch."""
+        prefetch.prefetch_customer(1, service=StubService())
+        request = RequestFactory().get("/customer-profile/details/")
+        request.user = get_user_model().objects.get(pk=1)
+        view = views.CustomerProfileDetailView()
+        view.setup(request)
+        view.service = MagicMock()
+        view.get_authorizenet_response()
+        view.service.execute.assert_not_called()
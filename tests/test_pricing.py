@@ -0,0 +1,105 @@
+import decimal
+from io import StringIO
+from unittest.mock import MagicMock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from terminusgps.authorizenet.service import AuthorizenetError
+
+from terminusgps_payments import pricing
+from terminusgps_payments.models import (
+    PlanPriceMigration,
+    Subscription,
+    SubscriptionPlan,
+)
+
+
+class RunPlanPriceMigrationTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        self.plan = SubscriptionPlan.objects.get(pk=1)
+        for pk in range(10, 15):
+            Subscription.objects.create(
+                pk=pk, customer_profile_id=1, plan=self.plan, status="active"
+            )
+        Subscription.objects.create(
+            pk=20, customer_profile_id=1, plan=self.plan, status="canceled"
+        )
+
+    def test_updates_active_subscriptions(self):
+        """Fails if every active subscription on the plan wasn't updated exactly once."""
+        service = MagicMock()
+        migration, _ = pricing.get_or_create_plan_price_migration(
+            self.plan, amount=decimal.Decimal("29.95")
+        )
+        migration = pricing.run_plan_price_migration(
+            migration, service=service, batch_size=2
+        )
+        updated = sorted(
+            int(c.args[0][0].subscriptionId)
+            for c in service.execute.call_args_list
+        )
+        self.assertEqual(updated, [1, 2, 10, 11, 12, 13, 14])
+        self.assertEqual(migration.status, "completed")
+        self.assertEqual(migration.updated_count, 7)
+        self.assertEqual(migration.last_subscription_id, 14)
+
+    def test_resumes_after_checkpoint(self):
+        """Fails if a resumed migration updated subscriptions before its checkpoint."""
+        service = MagicMock()
+        migration = PlanPriceMigration.objects.create(
+            plan=self.plan,
+            amount=decimal.Decimal("29.95"),
+            status="running",
+            last_subscription_id=11,
+        )
+        resumed, created = pricing.get_or_create_plan_price_migration(
+            self.plan, amount=decimal.Decimal("29.95")
+        )
+        self.assertFalse(created)
+        self.assertEqual(resumed, migration)
+        pricing.run_plan_price_migration(resumed, service=service)
+        updated = sorted(
+            int(c.args[0][0].subscriptionId)
+            for c in service.execute.call_args_list
+        )
+        self.assertEqual(updated, [12, 13, 14])
+
+    def test_failures_are_recorded(self):
+        """Fails if a subscription that couldn't be updated wasn't recorded on the migration."""
+        service = MagicMock()
+
+        def execute(request_tuple):
+            if str(request_tuple[0].subscriptionId) == "12":
+                raise AuthorizenetError(message="Error", code="E00001")
+
+        service.execute.side_effect = execute
+        migration, _ = pricing.get_or_create_plan_price_migration(self.plan)
+        migration = pricing.run_plan_price_migration(
+            migration, service=service
+        )
+        self.assertEqual(migration.failed_ids, [12])
+        self.assertEqual(migration.updated_count, 6)
+
+
+@override_settings(AUTHORIZENET_SERVICE="unittest.mock.MagicMock")
+class MigratePlanPriceCommandTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def test_command_completes_migration(self):
+        """Fails if the command didn't complete a migration for the plan."""
+        stdout = StringIO()
+        call_command("migrate_plan_price", "1", stdout=stdout)
+        migration = PlanPriceMigration.objects.get(plan__pk=1)
+        self.assertEqual(migration.status, "completed")
+        self.assertEqual(migration.updated_count, 2)
+        self.assertIn("Updated 2 subscription(s)", stdout.getvalue())
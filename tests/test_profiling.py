@@ -0,0 +1,140 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import Client, TestCase, override_settings
+
+from terminusgps_payments import profiling
+from terminusgps_payments.middleware import ProfilingMiddleware
+
+
+def spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class StackSamplerTestCase(TestCase):
+    def test_sampler_counts_stacks(self):
+        """Fails if the sampler didn't sample a registered thread's stacks."""
+        sampler = profiling.StackSampler(interval=0.001)
+        sampler.start(threading.get_ident())
+        spin(0.05)
+        stacks = sampler.stop(threading.get_ident())
+        self.assertTrue(stacks)
+        self.assertTrue(any("spin" in stack for stack in stacks))
+
+    def test_get_functions(self):
+        """Fails if functions weren't ordered by self samples with total samples counted."""
+        profile = profiling.Profile(
+            view="v",
+            path="/",
+            method="GET",
+            user_id=None,
+            status_code=200,
+            duration_ms=1,
+            started_at=0,
+            interval_ms=5,
+            stacks={"a;b": 3, "a;c": 1, "a": 1},
+        )
+        functions = profile.get_functions()
+        self.assertEqual(functions[0], {"name": "b", "self": 3, "total": 3})
+        functions = {function["name"]: function for function in functions}
+        self.assertEqual(functions["a"], {"name": "a", "self": 1, "total": 5})
+        self.assertEqual(functions["c"], {"name": "c", "self": 1, "total": 1})
+        self.assertEqual(profile.to_folded(), "a;b 3\na;c 1\na 1\n")
+
+
+@override_settings(AUTHORIZENET_SERVICE="unittest.mock.Mock")
+class ProfilingMiddlewareTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = Path(self.tmp.name)
+        self.user = get_user_model().objects.get(pk=1)
+
+    def profiled(self, **kwargs):
+        return override_settings(PAYMENTS_PROFILE_DIR=self.tmp.name, **kwargs)
+
+    def get(self, path: str = "/subscription-plans/details/", **kwargs):
+        client = Client()
+        client.force_login(self.user)
+        return client.get(path, {"plan": 1}, **kwargs)
+
+    def test_disabled_by_default(self):
+        """Fails if the middleware was used without a sample rate or threshold."""
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+        with self.profiled():
+            self.get()
+        self.assertEqual(profiling.list_profiles(directory=self.directory), [])
+
+    def test_sampled_request_saved(self):
+        """Fails if a sampled request's profile wasn't saved with its view and user."""
+        with self.profiled(PAYMENTS_PROFILE_SAMPLE_RATE=1.0):
+            self.get()
+        [profile] = profiling.list_profiles(directory=self.directory)
+        self.assertEqual(
+            profile["view"],
+            "terminusgps_payments.views.SubscriptionPlanDetailView",
+        )
+        self.assertEqual(profile["user_id"], 1)
+        self.assertEqual(profile["status_code"], 200)
+
+    def test_slow_threshold(self):
+        """Fails if requests under the threshold were saved, or requests over it weren't."""
+        with self.profiled(PAYMENTS_PROFILE_SLOW_MS=60_000):
+            self.get()
+        self.assertEqual(profiling.list_profiles(directory=self.directory), [])
+        with self.profiled(PAYMENTS_PROFILE_SLOW_MS=0):
+            self.get()
+        self.assertEqual(
+            len(profiling.list_profiles(directory=self.directory)), 1
+        )
+
+    def test_other_apps_not_profiled(self):
+        """Fails if a view outside this app was profiled."""
+        with self.profiled(PAYMENTS_PROFILE_SAMPLE_RATE=1.0):
+            Client().get("/admin/login/")
+        self.assertEqual(profiling.list_profiles(directory=self.directory), [])
+
+    def test_rotation(self):
+        """Fails if the oldest profiles beyond ``PAYMENTS_PROFILE_MAX_FILES`` weren't deleted."""
+        with self.profiled(
+            PAYMENTS_PROFILE_SAMPLE_RATE=1.0, PAYMENTS_PROFILE_MAX_FILES=2
+        ):
+            for _ in range(3):
+                self.get()
+        self.assertEqual(
+            len(list(self.directory.glob(f"*{profiling.PROFILE_SUFFIX}"))), 2
+        )
+
+    def test_profile_pages_require_staff(self):
+        """Fails if the profile pages weren't restricted to staff, or didn't show the captured profiles."""
+        with self.profiled(PAYMENTS_PROFILE_SAMPLE_RATE=1.0):
+            self.get()
+        [profile] = profiling.list_profiles(directory=self.directory)
+        client = Client()
+        client.force_login(self.user)
+        with self.profiled():
+            self.assertEqual(client.get("/profiles/").status_code, 403)
+            self.user.is_staff = True
+            self.user.save(update_fields=["is_staff"])
+            response = client.get("/profiles/")
+            self.assertContains(response, "SubscriptionPlanDetailView")
+            path = f"/profiles/{profile['name']}/"
+            self.assertEqual(client.get(path).status_code, 200)
+            response = client.get(path, {"format": "folded"})
+            self.assertEqual(response["Content-Type"], "text/plain")
+            self.assertEqual(
+                client.get("/profiles/missing.jsonl/").status_code, 404
+            )
@@ -0,0 +1,127 @@
+import gzip
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from authorizenet import apicontractsv1
+from django.test import TestCase, override_settings
+from lxml import objectify
+from terminusgps.authorizenet import api
+from terminusgps.authorizenet.service import (
+    AuthorizenetError,
+    AuthorizenetService,
+)
+
+from terminusgps_payments import recording
+from terminusgps_payments.gateway import RateLimitedAuthorizenetService
+
+RESPONSE = (
+    b'<getCustomerProfileResponse xmlns="AnetApi/xml/v1/schema/AnetApiSchema.xsd">'
+    b"<messages><resultCode>Ok</resultCode></messages>"
+    b"<profile><customerProfileId>1</customerProfileId>"
+    b"<paymentProfiles><payment><creditCard><cardNumber>XXXX1111</cardNumber>"
+    b"</creditCard></payment></paymentProfiles></profile>"
+    b"</getCustomerProfileResponse>"
+)
+
+
+class RecordingTestCase(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = Path(self.tmp.name)
+
+    def record(self, request_tuple, **kwargs):
+        with override_settings(AUTHORIZENET_RECORD_DIR=self.tmp.name):
+            service = RateLimitedAuthorizenetService()
+            with patch.object(AuthorizenetService, "execute", **kwargs):
+                try:
+                    return service.execute(request_tuple)
+                except AuthorizenetError:
+                    pass
+
+    def read_entries(self):
+        entries = []
+        for path in self.directory.glob(f"*{recording.FIXTURE_SUFFIX}"):
+            with gzip.open(path, "rt") as file:
+                entries.extend(json.loads(line) for line in file)
+        return entries
+
+    def test_recording_disabled_by_default(self):
+        """Fails if calls were recorded without ``AUTHORIZENET_RECORD_DIR``."""
+        self.assertIsNone(recording.get_recorder())
+
+    def test_replay_returns_recorded_response(self):
+        """Fails if a replayed call didn't return the recorded response."""
+        self.record(
+            api.get_customer_profile(customer_profile_id=1),
+            return_value=objectify.fromstring(RESPONSE),
+        )
+        service = recording.ReplayAuthorizenetService(directory=self.tmp.name)
+        response = service.execute(
+            api.get_customer_profile(customer_profile_id=1)
+        )
+        self.assertEqual(int(response.profile.customerProfileId), 1)
+        self.assertEqual(
+            str(
+                response.profile.paymentProfiles.payment.creditCard.cardNumber
+            ),
+            "XXXX1111",
+        )
+
+    def test_replay_raises_recorded_error(self):
+        """Fails if a replayed call didn't raise the recorded error."""
+        self.record(
+            api.get_customer_profile(customer_profile_id=2),
+            side_effect=AuthorizenetError(message="Not found.", code="E00040"),
+        )
+        service = recording.ReplayAuthorizenetService(directory=self.tmp.name)
+        with self.assertRaises(AuthorizenetError) as ctx:
+            service.execute(api.get_customer_profile(customer_profile_id=2))
+        self.assertEqual(ctx.exception.code, "E00040")
+
+    def test_replay_miss_raises(self):
+        """Fails if an unrecorded call didn't raise a ``REPLAY_MISS`` error."""
+        self.record(
+            api.get_customer_profile(customer_profile_id=1),
+            return_value=objectify.fromstring(RESPONSE),
+        )
+        service = recording.ReplayAuthorizenetService(directory=self.tmp.name)
+        with self.assertRaises(AuthorizenetError) as ctx:
+            service.execute(api.get_customer_profile(customer_profile_id=3))
+        self.assertEqual(ctx.exception.code, "REPLAY_MISS")
+
+    def test_secrets_are_redacted(self):
+        """Fails if credentials, a card number or customer details were written to a fixture."""
+        credit_card = apicontractsv1.creditCardType(
+            cardNumber="4111111111111111",
+            expirationDate="2030-01",
+            cardCode="123",
+        )
+        contract = apicontractsv1.customerPaymentProfileType(
+            payment=apicontractsv1.paymentType(creditCard=credit_card),
+            billTo=apicontractsv1.customerAddressType(
+                firstName="Test", phoneNumber="555-555-5555", state="TX"
+            ),
+        )
+        request_tuple = api.create_customer_payment_profile(
+            customer_profile_id=1, contract=contract
+        )
+        request_tuple[
+            0
+        ].merchantAuthentication = apicontractsv1.merchantAuthenticationType(
+            name="secret-login", transactionKey="XXXX-secret-key"
+        )
+        self.record(request_tuple, return_value=objectify.fromstring(RESPONSE))
+        (entry,) = self.read_entries()
+        for secret in (
+            "secret-login",
+            "secret-key",
+            "4111111111111111",
+            "123<",
+            "Test",
+            "555-555-5555",
+        ):
+            self.assertNotIn(secret, entry["request"])
+        self.assertIn("<state>TX</state>", entry["request"])
@@ -0,0 +1,98 @@
+import datetime
+import io
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+
+from terminusgps_payments import reminders
+from terminusgps_payments.models import Subscription, SubscriptionPlan
+
+ACTIVE = Subscription.SubscriptionStatus.ACTIVE
+CANCELED = Subscription.SubscriptionStatus.CANCELED
+DUE = datetime.date(2030, 1, 8)
+
+
+class SendRemindersTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        Subscription.objects.filter(pk=1).update(
+            status=CANCELED, expires_on=DUE
+        )
+        Subscription.objects.create(
+            pk=3,
+            customer_profile_id=1,
+            plan_id=2,
+            status=ACTIVE,
+            trial_ends_on=DUE,
+        )
+        Subscription.objects.create(
+            pk=4,
+            customer_profile_id=1,
+            plan_id=1,
+            status=CANCELED,
+            expires_on=DUE,
+        )
+        Subscription.objects.filter(pk=2).update(
+            status=CANCELED, expires_on=DUE + datetime.timedelta(days=1)
+        )
+
+    def test_one_digest_per_customer(self):
+        """Fails if a customer with several due subscriptions didn't get exactly one digest listing all of them."""
+        count = reminders.send_reminders(on=DUE)
+        self.assertEqual(count, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["testuser@domain.com"])
+        self.assertIn("Subscription #1", mail.outbox[0].body)
+        self.assertIn("Subscription #3", mail.outbox[0].body)
+        self.assertIn("Subscription #4", mail.outbox[0].body)
+
+    def test_digests_are_built_from_one_query(self):
+        """Fails if building the digests took more than one query."""
+        with self.assertNumQueries(1):
+            digests = list(reminders.iter_digests(DUE, chunk_size=1))
+        self.assertEqual(len(digests), 1)
+        self.assertEqual(len(digests[0]["context"]["expiring"]), 2)
+        self.assertEqual(len(digests[0]["context"]["trials_ending"]), 1)
+
+    def test_digests_are_sent_in_batches(self):
+        """Fails if digests for several customers weren't all sent when split across batches."""
+        Subscription.objects.filter(pk=2).update(expires_on=DUE)
+        self.assertEqual(reminders.send_reminders(on=DUE, batch_size=1), 2)
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox),
+            ["testuser@domain.com", "testuseralt@domain.com"],
+        )
+
+    def test_command_sends_reminders(self):
+        """Fails if the management command didn't send the digests due on ``--date``."""
+        stdout = io.StringIO()
+        call_command("send_reminders", date=DUE, stdout=stdout)
+        self.assertIn("Enqueued 1 reminder digest(s).", stdout.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class TrialEndsOnTestCase(TestCase):
+    def test_plan_without_trial(self):
+        """Fails if a plan without trial occurrences returned a trial end date."""
+        plan = SubscriptionPlan(amount=1, trial_occurrences=0)
+        self.assertIsNone(plan.get_trial_ends_on(datetime.date(2030, 1, 31)))
+
+    def test_plan_with_trial(self):
+        """Fails if the trial end date didn't span every trial occurrence."""
+        months = SubscriptionPlan(amount=1, trial_occurrences=2, length=1)
+        days = SubscriptionPlan(
+            amount=1, trial_occurrences=1, length=14, unit="days"
+        )
+        start = datetime.date(2030, 1, 31)
+        self.assertEqual(
+            months.get_trial_ends_on(start), datetime.date(2030, 3, 31)
+        )
+        self.assertEqual(
+            days.get_trial_ends_on(start), datetime.date(2030, 2, 14)
+        )
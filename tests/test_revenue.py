@@ -0,0 +1,170 @@
+import datetime
+import decimal
+import io
+from unittest.mock import MagicMock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+
+from terminusgps_payments import bulk, outbox, revenue, tasks
+from terminusgps_payments.models import (
+    OutboxEvent,
+    RevenueSummary,
+    Subscription,
+    SubscriptionPlan,
+)
+
+TODAY = datetime.date.today()
+YESTERDAY = TODAY - datetime.timedelta(days=1)
+
+
+@override_settings(AUTHORIZENET_SERVICE="unittest.mock.Mock")
+class RevenueSummaryTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def get_summary(self, plan_id: int = 1, on: datetime.date = TODAY):
+        return RevenueSummary.objects.get(plan_id=plan_id, date=on)
+
+    def summarize(self, on: datetime.date) -> None:
+        """Writes the current summaries dated ``on``, as if they had been rebuilt that day."""
+        revenue.rebuild()
+        RevenueSummary.objects.filter(date=TODAY).update(date=on)
+
+    def test_rebuild_counts_active_subscriptions(self):
+        """Fails if a rebuild didn't count active subscriptions and normalize revenue per plan."""
+        with self.assertNumQueries(2):
+            self.assertEqual(revenue.rebuild(), 4)
+        summary = self.get_summary()
+        self.assertEqual(summary.active_count, 2)
+        self.assertEqual(summary.monthly_revenue, decimal.Decimal("49.90"))
+        self.assertEqual(self.get_summary(plan_id=2).active_count, 0)
+
+    def test_get_monthly_amount_normalizes_days(self):
+        """Fails if a daily plan's amount wasn't normalized to one month."""
+        plan = SubscriptionPlan(
+            amount=decimal.Decimal("10.00"), length=7, unit="days"
+        )
+        self.assertEqual(plan.get_monthly_amount(), decimal.Decimal("43.4821"))
+
+    def test_deltas_carry_forward_previous_summary(self):
+        """Fails if the first change of the day didn't start from the latest earlier summary."""
+        self.summarize(YESTERDAY)
+        revenue.apply_deltas({"1": -1})
+        summary = self.get_summary()
+        self.assertEqual(summary.active_count, 1)
+        self.assertEqual(summary.monthly_revenue, decimal.Decimal("24.95"))
+        revenue.apply_deltas({"1": 3})
+        self.assertEqual(self.get_summary().active_count, 4)
+        self.assertEqual(self.get_summary(on=YESTERDAY).active_count, 2)
+
+    def test_first_summary_excludes_pending_changes(self):
+        """Fails if changes still in the outbox were counted twice by a plan's first summary."""
+        for pk in (3, 4):
+            Subscription.objects.create(
+                pk=pk, customer_profile_id=1, plan_id=1, status="active"
+            )
+            outbox.publish(
+                "subscriptions.status_changed", {"active_deltas": {"1": 1}}
+            )
+        outbox.dispatch_all()
+        self.assertEqual(self.get_summary().active_count, 4)
+
+    def test_pending_changes_exclude_delivered_events(self):
+        """Fails if an event already applied to the summary, but awaiting a retry of another handler, was counted as pending."""
+        Subscription.objects.create(
+            pk=3, customer_profile_id=1, plan_id=1, status="active"
+        )
+        event = OutboxEvent.objects.create(
+            kind="subscriptions.status_changed",
+            payload={"active_deltas": {"1": 1}},
+        )
+        plan = SubscriptionPlan.objects.get(pk=1)
+        self.assertEqual(revenue.get_pending_delta(plan), 1)
+        event.deliveries.create(
+            handler=outbox.get_handler_name(tasks.update_revenue_summary)
+        )
+        self.assertEqual(revenue.get_pending_delta(plan), 0)
+
+    def test_deltas_are_dated_by_event(self):
+        """Fails if an outbox event's change wasn't applied to the summary of the day it happened."""
+        self.summarize(YESTERDAY - datetime.timedelta(days=1))
+        event = outbox.publish(
+            "subscriptions.status_changed", {"active_deltas": {"1": -1}}
+        )
+        OutboxEvent.objects.filter(pk=event.pk).update(
+            created_at=timezone.now() - datetime.timedelta(days=1)
+        )
+        outbox.dispatch_all()
+        self.assertEqual(self.get_summary(on=YESTERDAY).active_count, 1)
+        self.assertFalse(RevenueSummary.objects.filter(date=TODAY).exists())
+
+    def test_bulk_cancel_updates_summary(self):
+        """Fails if canceling subscriptions didn't decrement the active count through the outbox."""
+        self.summarize(YESTERDAY)
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk.bulk_cancel_subscriptions(
+                Subscription.objects.filter(pk=1), service=MagicMock()
+            )
+        self.assertEqual(self.get_summary().active_count, 1)
+
+    def test_plan_price_change_reprices_summary(self):
+        """Fails if changing a plan's amount didn't update today's monthly revenue."""
+        revenue.rebuild()
+        plan = SubscriptionPlan.objects.get(pk=1)
+        plan.amount = decimal.Decimal("30.00")
+        plan.save()
+        self.assertEqual(
+            self.get_summary().monthly_revenue, decimal.Decimal("60.00")
+        )
+
+    def test_command_rebuilds_summary(self):
+        """Fails if the management command didn't write today's summary for every plan."""
+        stdout = io.StringIO()
+        call_command("rebuild_revenue_summary", stdout=stdout)
+        self.assertIn("Rebuilt 4 revenue summaries.", stdout.getvalue())
+        self.assertEqual(self.get_summary().active_count, 2)
+
+    def test_past_changes_dont_rebuild_history(self):
+        """Fails if a change dated before today rebuilt a past summary from today's statuses."""
+        revenue.apply_deltas({"1": -1}, on=YESTERDAY)
+        self.assertFalse(RevenueSummary.objects.exists())
+
+    def test_admin_status_change_updates_summary(self):
+        """Fails if changing a subscription's status in the admin didn't update the revenue summary through the outbox."""
+        self.summarize(YESTERDAY)
+        user = get_user_model().objects.get(pk=1)
+        user.is_staff = user.is_superuser = True
+        user.save(update_fields=["is_staff", "is_superuser"])
+        client = Client()
+        client.force_login(user)
+        subscription = Subscription.objects.get(pk=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(
+                "/admin/terminusgps_payments/subscription/1/change/",
+                {
+                    "id": subscription.pk,
+                    "customer_profile": subscription.customer_profile_id,
+                    "plan": subscription.plan_id,
+                    "status": "suspended",
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.get_summary().active_count, 1)
+
+    def test_admin_changelist(self):
+        """Fails if the revenue summary admin didn't render."""
+        revenue.rebuild()
+        user = get_user_model().objects.get(pk=1)
+        user.is_staff = user.is_superuser = True
+        user.save(update_fields=["is_staff", "is_superuser"])
+        client = Client()
+        client.force_login(user)
+        response = client.get("/admin/terminusgps_payments/revenuesummary/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "49.9")
@@ -0,0 +1,76 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+
+from terminusgps_payments import caching, routers
+from terminusgps_payments.mixins import CustomerProfileMixin
+from terminusgps_payments.models import CustomerProfile, SubscriptionPlan
+
+
+@override_settings(PAYMENTS_REPLICA_DATABASES=["replica"])
+class ReplicaRouterTestCase(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        SubscriptionPlan.objects.create(pk=1, name="Primary Plan", amount=1)
+        SubscriptionPlan.objects.using("replica").create(
+            pk=1, name="Replica Plan", amount=1
+        )
+        self.path = "/subscription-plans/details/?plan=1"
+
+    def tearDown(self):
+        cache.clear()
+        caching.local_cache.clear()
+
+    def test_read_only_view_reads_from_replica(self):
+        """Fails if a read-only view didn't read from the replica."""
+        response = Client().get(self.path)
+        self.assertContains(response, "Replica Plan")
+
+    def test_write_pins_client_to_primary(self):
+        """Fails if a client didn't read from the primary right after a write."""
+        client = Client()
+        response = client.post("/admin/login/", data={})
+        self.assertIn(routers.PIN_COOKIE_NAME, response.cookies)
+        response = client.get(self.path)
+        self.assertContains(response, "Primary Plan")
+
+    def test_expired_pin_reads_from_replica(self):
+        """Fails if an expired pin still routed reads to the primary."""
+        client = Client()
+        client.cookies[routers.PIN_COOKIE_NAME] = str(time.time() - 1)
+        self.assertContains(client.get(self.path), "Replica Plan")
+
+    @override_settings(PAYMENTS_REPLICA_DATABASES=[])
+    def test_no_replicas_reads_from_primary(self):
+        """Fails if reads left the primary without any replica configured."""
+        response = Client().get(self.path)
+        self.assertContains(response, "Primary Plan")
+        self.assertNotIn(routers.PIN_COOKIE_NAME, response.cookies)
+
+    def test_writes_go_to_primary(self):
+        """Fails if a write inside a replica block wasn't sent to the primary."""
+        request = RequestFactory().get("/")
+        with routers.replica_reads(request):
+            SubscriptionPlan.objects.create(pk=2, name="New Plan", amount=1)
+        self.assertTrue(SubscriptionPlan.objects.filter(pk=2).exists())
+        self.assertFalse(
+            SubscriptionPlan.objects.using("replica").filter(pk=2).exists()
+        )
+
+    def test_cached_customer_profile_reads_from_primary(self):
+        """Fails if a customer profile read from the replica was cached and served to a pinned request."""
+        user = get_user_model().objects.create(pk=1, username="testuser")
+        get_user_model().objects.using("replica").create(
+            pk=1, username="testuser"
+        )
+        CustomerProfile.objects.create(pk=7, user_id=1)
+        CustomerProfile.objects.using("replica").create(pk=8, user_id=1)
+        for request in (RequestFactory().get("/"), RequestFactory().post("/")):
+            request.user = user
+            with routers.replica_reads(request):
+                profile = CustomerProfileMixin.get_customer_profile(request)
+            self.assertEqual(profile.pk, 7)
+            self.assertEqual(profile._state.db, "default")
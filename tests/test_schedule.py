@@ -0,0 +1,109 @@
+import datetime
+import decimal
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from terminusgps_payments import schedule
+from terminusgps_payments.models import Subscription, SubscriptionPlan
+
+
+class BillingScheduleTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        self.plan = SubscriptionPlan(
+            amount=decimal.Decimal("24.95"),
+            trial_amount=decimal.Decimal("1.00"),
+            trial_occurrences=1,
+            total_occurrences=4,
+        )
+
+    def test_monthly_charges_clamp_to_month_end(self):
+        """Fails if a subscription started on the 31st wasn't charged on the last day of shorter months."""
+        charges = list(
+            schedule.iter_charges(
+                self.plan,
+                datetime.date(2026, 1, 31),
+                since=datetime.date(2026, 1, 1),
+                until=datetime.date(2026, 12, 31),
+            )
+        )
+        self.assertEqual(
+            [charge.date for charge in charges],
+            [
+                datetime.date(2026, 1, 31),
+                datetime.date(2026, 2, 28),
+                datetime.date(2026, 3, 31),
+                datetime.date(2026, 4, 30),
+            ],
+        )
+        self.assertEqual(charges[0].amount, decimal.Decimal("1.00"))
+        self.assertEqual(charges[1].amount, decimal.Decimal("24.95"))
+
+    def test_first_occurrence_is_computed(self):
+        """Fails if the first charge in a window started mid-schedule was wrong for day and month plans."""
+        start = datetime.date(2025, 1, 15)
+        since = datetime.date(2026, 3, 16)
+        self.assertEqual(
+            schedule.get_first_occurrence(
+                SubscriptionPlan(length=3), start, since
+            ),
+            5,
+        )
+        day_plan = SubscriptionPlan(length=7, unit="days")
+        occurrence = schedule.get_first_occurrence(day_plan, start, since)
+        self.assertGreaterEqual(
+            schedule.get_occurrence_date(day_plan, start, occurrence), since
+        )
+        self.assertLess(
+            schedule.get_occurrence_date(day_plan, start, occurrence - 1),
+            since,
+        )
+
+    def test_next_charge(self):
+        """Fails if an active subscription's next charge wasn't computed locally, or was for a subscription without a start date."""
+        subscription = Subscription.objects.select_related("plan").get(pk=1)
+        self.assertIsNone(schedule.get_next_charge(subscription))
+        subscription.billing_starts_on = datetime.date(2026, 1, 10)
+        with self.assertNumQueries(0):
+            charge = schedule.get_next_charge(
+                subscription, today=datetime.date(2026, 3, 11)
+            )
+        self.assertEqual(charge.date, datetime.date(2026, 4, 10))
+        self.assertEqual(charge.amount, subscription.plan.amount)
+
+    def test_forecast_groups_subscriptions(self):
+        """Fails if a forecast didn't total the charges of subscriptions sharing a schedule in one grouped query."""
+        Subscription.objects.update(
+            billing_starts_on=datetime.date(2026, 1, 5)
+        )
+        with self.assertNumQueries(2):
+            days = schedule.forecast(days=31, since=datetime.date(2026, 2, 1))
+        self.assertEqual(len(days), 1)
+        self.assertEqual(days[0].date, datetime.date(2026, 2, 5))
+        self.assertEqual(days[0].charges, 2)
+        self.assertEqual(days[0].amount, decimal.Decimal("49.90"))
+
+    def test_forecast_command(self):
+        """Fails if the management command didn't print the forecast total."""
+        Subscription.objects.update(
+            billing_starts_on=datetime.date(2026, 1, 5)
+        )
+        stdout = io.StringIO()
+        call_command(
+            "forecast_billing",
+            "--since",
+            "2026-02-01",
+            "--days",
+            "90",
+            stdout=stdout,
+        )
+        self.assertIn(
+            "Forecast 6 charge(s) totaling 149.70.", stdout.getvalue()
+        )
@@ -0,0 +1,224 @@
+import datetime
+import decimal
+from unittest.mock import patch
+
+from authorizenet import apicontractsv1
+from django.test import SimpleTestCase
+from pyxb.binding.datatypes import date as xs_date
+from pyxb.binding.datatypes import decimal as xs_decimal
+from terminusgps.authorizenet import api
+
+from terminusgps_payments import contracts, forms, serializers
+from terminusgps_payments.models import SubscriptionPlan
+
+ADDRESS_DATA = {
+    "firstName": "Ann-Marie",
+    "lastName": 'O\'Brien & "Sons" <LLC>',
+    "address": "1 Café\rSt",
+    "city": "Houston",
+    "state": "TX",
+    "zip": "77065",
+    "country": "US",
+    "phoneNumber": "555-555-5555",
+}
+
+
+def serialize(request_tuple, reference_id=None) -> bytes:
+    """Returns the request body an Authorizenet controller would post for ``request_tuple``."""
+    request, controller_cls = request_tuple
+    request.merchantAuthentication = apicontractsv1.merchantAuthenticationType(
+        name="login", transactionKey="key"
+    )
+    if reference_id is not None:
+        request.refId = reference_id
+    controller = controller_cls(request)
+    controller.setClientId()
+    return controller.buildrequest()
+
+
+class SerializerTestCase(SimpleTestCase):
+    def setUp(self):
+        self.plan = SubscriptionPlan(
+            name="Basic & <Plus>",
+            amount=decimal.Decimal("24.90"),
+            trial_amount=decimal.Decimal("0.00"),
+            total_occurrences=9999,
+            trial_occurrences=0,
+            length=1,
+            unit=SubscriptionPlan.SubscriptionPlanUnit.MONTHS,
+        )
+
+    def test_format_value_matches_pyxb(self):
+        """Fails if a decimal or date was written differently than PyXB writes it."""
+        for text in ["24.95", "0.00", "30", "1E+2", "-3.10", "0.005"]:
+            value = decimal.Decimal(text)
+            self.assertEqual(
+                serializers.format_value(value), xs_decimal.XsdLiteral(value)
+            )
+        for offset in [0, 5, -6]:
+            tz = datetime.timezone(datetime.timedelta(hours=offset))
+            value = datetime.datetime(2026, 1, 2, 3, tzinfo=tz)
+            self.assertEqual(
+                serializers.format_value(value),
+                xs_date.XsdLiteral(xs_date(value)),
+            )
+
+    def test_create_credit_card_payment_profile(self):
+        """Fails if a credit card payment profile request wasn't byte-identical to the PyXB request."""
+        address = forms.AddressForm(data=ADDRESS_DATA)
+        card = forms.CreditCardForm(
+            data={
+                "cardNumber": "4111111111111111",
+                "cardCode": "123",
+                "expirationDate": "2030-01",
+            }
+        )
+        self.assertTrue(address.is_valid() and card.is_valid())
+        payment = apicontractsv1.paymentType()
+        payment.creditCard = card.build_contract()
+        contract = apicontractsv1.customerPaymentProfileType()
+        contract.billTo = address.build_contract()
+        contract.payment = payment
+        expected = serialize(
+            api.create_customer_payment_profile(
+                customer_profile_id=1, contract=contract
+            )
+        )
+        actual = serialize(
+            serializers.create_customer_payment_profile(
+                customer_profile_id=1,
+                bill_to=address.build_elements(),
+                payment=[("creditCard", card.build_elements())],
+            )
+        )
+        self.assertEqual(actual, expected)
+
+    def test_create_bank_account_payment_profile(self):
+        """Fails if a bank account payment profile request wasn't byte-identical to the PyXB request."""
+        address = forms.AddressForm(data=ADDRESS_DATA)
+        account = forms.BankAccountForm(
+            data={
+                "accountType": "checking",
+                "accountNumber": "123456789",
+                "routingNumber": "121042882",
+                "nameOnAccount": "Ann-Marie O'Brien",
+                "bankName": "Bank & Trust",
+            }
+        )
+        self.assertTrue(address.is_valid() and account.is_valid())
+        payment = apicontractsv1.paymentType()
+        payment.bankAccount = account.build_contract()
+        contract = apicontractsv1.customerPaymentProfileType()
+        contract.billTo = address.build_contract()
+        contract.payment = payment
+        expected = serialize(
+            api.create_customer_payment_profile(
+                customer_profile_id=1, contract=contract
+            ),
+            reference_id="ref-1",
+        )
+        actual = serialize(
+            serializers.create_customer_payment_profile(
+                customer_profile_id=1,
+                bill_to=serializers.build_address(address.cleaned_data),
+                payment=[
+                    (
+                        "bankAccount",
+                        serializers.build_bank_account(account.cleaned_data),
+                    )
+                ],
+            ),
+            reference_id="ref-1",
+        )
+        self.assertEqual(actual, expected)
+
+    def test_create_shipping_address(self):
+        """Fails if a shipping address request wasn't byte-identical to the PyXB request."""
+        address = forms.AddressForm(data=ADDRESS_DATA)
+        self.assertTrue(address.is_valid())
+        for default in (False, True):
+            expected = serialize(
+                api.create_customer_shipping_address(
+                    customer_profile_id=1,
+                    contract=address.build_contract(),
+                    default=default,
+                )
+            )
+            actual = serialize(
+                serializers.create_customer_shipping_address(
+                    customer_profile_id=1,
+                    address=address.build_elements(),
+                    default=default,
+                )
+            )
+            self.assertEqual(actual, expected)
+
+    def test_create_subscription(self):
+        """Fails if a create subscription request wasn't byte-identical to the PyXB request."""
+        now = datetime.datetime(2026, 10, 19, 23, tzinfo=datetime.UTC)
+        with patch("django.utils.timezone.now", return_value=now):
+            expected = serialize(
+                api.create_subscription(
+                    contracts.build_subscription_contract(
+                        self.plan, 1, 2, 3, name="Unit #1"
+                    )
+                )
+            )
+            actual = serialize(
+                serializers.create_subscription(
+                    serializers.build_subscription(
+                        self.plan, 1, 2, 3, name="Unit #1"
+                    )
+                )
+            )
+        self.assertEqual(actual, expected)
+
+    def test_update_subscription_profile(self):
+        """Fails if an update subscription profile request wasn't byte-identical to the PyXB request."""
+        contract = apicontractsv1.ARBSubscriptionType()
+        contract.profile = contracts.build_profile_contract(1, "2", 3)
+        expected = serialize(api.update_subscription(5, contract))
+        actual = serialize(
+            serializers.update_subscription(
+                5, [("profile", serializers.build_profile(1, "2", 3))]
+            )
+        )
+        self.assertEqual(actual, expected)
+
+    def test_update_subscription_profile_form(self):
+        """Fails if a subscription profile form's elements weren't byte-identical to its PyXB contract."""
+        form = forms.SubscriptionProfileForm(
+            data={
+                "customerProfileId": "1",
+                "customerAddressId": "3",
+                "customerPaymentProfileId": "2",
+            }
+        )
+        contract = apicontractsv1.ARBSubscriptionType()
+        contract.profile = form.build_contract()
+        expected = serialize(api.update_subscription(5, contract))
+        actual = serialize(
+            serializers.update_subscription(
+                5, [("profile", form.build_elements())]
+            )
+        )
+        self.assertEqual(actual, expected)
+
+    def test_contract_forms_build_elements(self):
+        """Fails if an :py:class:`~terminusgps_payments.forms.AuthorizenetContractForm` subclass without ``get_elements`` could be defined."""
+        with self.assertRaisesMessage(
+            TypeError, "IncompleteForm must implement get_elements()."
+        ):
+            type("IncompleteForm", (forms.AuthorizenetContractForm,), {})
+
+    def test_update_subscription_amount(self):
+        """Fails if an update subscription amount request wasn't byte-identical to the PyXB request."""
+        contract = apicontractsv1.ARBSubscriptionType()
+        contract.amount = decimal.Decimal("30.00")
+        expected = serialize(api.update_subscription(5, contract))
+        actual = serialize(
+            serializers.update_subscription(
+                5, [("amount", decimal.Decimal("30.00"))]
+            )
+        )
+        self.assertEqual(actual, expected)
@@ -0,0 +1,128 @@
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from terminusgps.authorizenet.service import AuthorizenetService
+
+from terminusgps_payments import throttling
+from terminusgps_payments.gateway import (
+    RateLimitedAuthorizenetService,
+    RateLimitExceeded,
+)
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TokenBucketTestCase(TestCase):
+    def tearDown(self):
+        cache.clear()
+
+    def test_invalid_rate_raises_valueerror(self):
+        """Fails if a non-positive rate doesn't raise :py:exc:`ValueError`."""
+        with self.assertRaises(ValueError):
+            throttling.TokenBucket("test", rate=0)
+
+    def test_fail_fast_bucket_raises_when_empty(self):
+        """Fails if an empty bucket with ``max_wait=0`` doesn't raise :py:exc:`RateLimitExceeded`."""
+        bucket = throttling.TokenBucket(
+            "test", rate=0.1, capacity=3, max_wait=0
+        )
+        for _ in range(3):
+            bucket.acquire()
+        with self.assertRaises(RateLimitExceeded):
+            bucket.acquire()
+
+    def test_waiting_bucket_waits_for_refill(self):
+        """Fails if an empty bucket without ``max_wait`` doesn't wait for the next refill."""
+        bucket = throttling.TokenBucket("test", rate=20, capacity=2)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def test_no_double_burst_after_refill(self):
+        """Fails if a drained bucket allowed more than the tokens refilled since, like a fixed window would at its boundary."""
+        bucket = throttling.TokenBucket(
+            "test", rate=10, capacity=5, max_wait=0
+        )
+        for _ in range(5):
+            bucket.acquire()
+        time.sleep(0.15)
+        allowed = 0
+        for _ in range(5):
+            try:
+                bucket.acquire()
+                allowed += 1
+            except RateLimitExceeded:
+                pass
+        self.assertIn(allowed, (1, 2))
+
+    def test_idle_bucket_holds_capacity(self):
+        """Fails if an idle bucket accumulated more than ``capacity`` tokens."""
+        bucket = throttling.TokenBucket(
+            "test", rate=50, capacity=3, max_wait=0
+        )
+        bucket.acquire()
+        time.sleep(0.2)
+        for _ in range(3):
+            bucket.acquire()
+        with self.assertRaises(RateLimitExceeded):
+            bucket.acquire()
+
+    def test_buckets_are_shared_by_name(self):
+        """Fails if two bucket instances with the same name didn't share tokens."""
+        a = throttling.TokenBucket("shared", rate=0.1, capacity=1, max_wait=0)
+        b = throttling.TokenBucket("shared", rate=0.1, capacity=1, max_wait=0)
+        a.acquire()
+        with self.assertRaises(RateLimitExceeded):
+            b.acquire()
+
+    def test_dummy_cache_allows_every_call(self):
+        """Fails if a cache that doesn't store values limited calls."""
+        dummy = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+            }
+        }
+        with override_settings(CACHES=dummy):
+            bucket = throttling.TokenBucket(
+                "test", rate=0.1, capacity=1, max_wait=0
+            )
+            for _ in range(5):
+                bucket.acquire()
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    AUTHORIZENET_RATE_LIMIT_BUCKETS={
+        "interactive": {"rate": 0.1, "capacity": 1, "max_wait": 0},
+        "batch": {"rate": 0.1, "capacity": 1, "max_wait": 0},
+    },
+)
+class RateLimitedAuthorizenetServiceTestCase(TestCase):
+    def tearDown(self):
+        cache.clear()
+
+    @patch.object(AuthorizenetService, "execute")
+    def test_execute_takes_token_per_priority(self, mock_execute):
+        """Fails if interactive and batch calls shared a bucket or an empty bucket didn't fail fast."""
+        interactive = RateLimitedAuthorizenetService()
+        batch = RateLimitedAuthorizenetService(priority=throttling.BATCH)
+        interactive.execute(("request", "controller"))
+        batch.execute(("request", "controller"))
+        with self.assertRaises(RateLimitExceeded):
+            interactive.execute(("request", "controller"))
+        self.assertEqual(mock_execute.call_count, 2)
+
+    @override_settings(AUTHORIZENET_RATE_LIMIT_BUCKETS=None)
+    @patch.object(AuthorizenetService, "execute")
+    def test_disabled_rate_limit(self, mock_execute):
+        """Fails if calls were limited with rate limiting disabled."""
+        service = RateLimitedAuthorizenetService()
+        for _ in range(3):
+            service.execute(("request", "controller"))
+        self.assertEqual(mock_execute.call_count, 3)
@@ -0,0 +1,130 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import Client, TestCase, override_settings
+from lxml import objectify
+from terminusgps.authorizenet import api
+from terminusgps.authorizenet.service import AuthorizenetService
+
+from terminusgps_payments import tracing
+from terminusgps_payments.gateway import RateLimitedAuthorizenetService
+from terminusgps_payments.models import SubscriptionPlan
+
+RESPONSE = (
+    b'<getCustomerProfileResponse xmlns="AnetApi/xml/v1/schema/AnetApiSchema.xsd">'
+    b"<messages><resultCode>Ok</resultCode></messages>"
+    b"</getCustomerProfileResponse>"
+)
+
+
+@tracing.task
+def count_plans() -> dict:
+    return {
+        "count": SubscriptionPlan.objects.count(),
+        "context": tracing.get_context(),
+    }
+
+
+class TracingTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "trace.json"
+
+    def traced(self, rate: float = 1.0):
+        return override_settings(
+            PAYMENTS_TRACE_SAMPLE_RATE=rate, PAYMENTS_TRACE_FILE=str(self.path)
+        )
+
+    def read_events(self) -> list[dict]:
+        if not self.path.exists():
+            return []
+        return json.loads(self.path.read_text().rstrip().rstrip(",") + "]")
+
+    def test_requests_not_traced_by_default(self):
+        """Fails if a request was traced without ``PAYMENTS_TRACE_SAMPLE_RATE``."""
+        with override_settings(PAYMENTS_TRACE_FILE=str(self.path)):
+            self.client.get("/subscription-plans/details/", {"plan": 1})
+        self.assertEqual(self.read_events(), [])
+
+    def test_request_trace(self):
+        """Fails if a sampled request's trace didn't cover the request, its view and its queries."""
+        with self.traced():
+            response = Client().get(
+                "/subscription-plans/details/", {"plan": 1}
+            )
+        self.assertEqual(response.status_code, 200)
+        events = self.read_events()
+        names = [event["name"] for event in events]
+        self.assertIn("http.request", names)
+        self.assertIn("view.dispatch", names)
+        self.assertIn("db.query", names)
+        self.assertEqual(
+            len({event["args"]["trace_id"] for event in events}), 1
+        )
+        for event in events:
+            self.assertEqual(event["ph"], "X")
+        root = next(
+            event for event in events if event["name"] == "http.request"
+        )
+        self.assertIsNone(root["args"]["parent_id"])
+        self.assertEqual(root["args"]["status_code"], 200)
+        view = next(
+            event for event in events if event["name"] == "view.dispatch"
+        )
+        self.assertEqual(
+            view["args"]["view"],
+            "terminusgps_payments.views.SubscriptionPlanDetailView",
+        )
+
+    def test_gateway_span_tagged_with_operation(self):
+        """Fails if a gateway call's span wasn't tagged with its operation."""
+        service = RateLimitedAuthorizenetService()
+        with (
+            self.traced(),
+            patch.object(
+                AuthorizenetService,
+                "execute",
+                return_value=objectify.fromstring(RESPONSE),
+            ),
+            tracing.start_trace("test"),
+        ):
+            service.execute(api.get_customer_profile(customer_profile_id=1))
+        gateway = next(
+            event
+            for event in self.read_events()
+            if event["name"] == "authorizenet.execute"
+        )
+        self.assertEqual(gateway["args"]["operation"], "getCustomerProfile")
+
+    def test_task_continues_enqueuing_trace(self):
+        """Fails if a task enqueued in a sampled trace didn't run in that trace."""
+        with self.traced(), tracing.start_trace("test") as root:
+            result = count_plans.enqueue()
+        self.assertEqual(result.return_value["count"], 4)
+        self.assertEqual(
+            result.return_value["context"]["trace_id"], root.trace_id
+        )
+        events = self.read_events()
+        self.assertEqual(
+            {event["args"]["trace_id"] for event in events}, {root.trace_id}
+        )
+        enqueue = next(
+            event for event in events if event["name"] == "task.enqueue"
+        )
+        run = next(event for event in events if event["name"] == "task.run")
+        self.assertEqual(run["args"]["parent_id"], enqueue["args"]["span_id"])
+
+    def test_unsampled_enqueue_passes_no_context(self):
+        """Fails if a task enqueued outside a trace was passed a trace context."""
+        result = count_plans.enqueue()
+        self.assertNotIn(tracing.TRACE_KWARG, result.kwargs)
+        self.assertIsNone(result.return_value["context"])
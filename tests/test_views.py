@@ -1,5 +1,7 @@
-from unittest.mock import MagicMock
+import time
+from unittest.mock import MagicMock, patch
 
+from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.test import Client, RequestFactory, TestCase, override_settings
 
@@ -201,6 +203,7 @@ class CustomerProfileDetailViewTestCase(TestCase):
     fixtures = [
         "terminusgps_payments/tests/test_user.json",
         "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
     ]
 
     def setUp(self):
@@ -268,6 +271,93 @@ class CustomerProfileDetailViewTestCase(TestCase):
         api_call = view.service.method_calls[0]
         self.assertTrue(api_call.assert_called_once)
 
+    def test_get_subscription_rows(self):
+        """Fails if the customer's subscriptions weren't merged with their Authorizenet responses."""
+        factory = RequestFactory()
+        request = factory.get(self.path)
+        request.user = get_user_model().objects.get(pk=1)
+        view = views.CustomerProfileDetailView()
+        view.setup(request)
+        rows = view.get_subscription_rows()
+        self.assertEqual([row["subscription"].pk for row in rows], [1])
+        self.assertIsNotNone(rows[0]["response"])
+        self.assertFalse(rows[0]["loading"])
+
+    def test_subscription_rows_are_capped(self):
+        """Fails if more than :py:attr:`subscription_limit` subscriptions were retrieved from Authorizenet."""
+        Subscription.objects.create(
+            pk=3, customer_profile_id=1, plan_id=2, status="active"
+        )
+        factory = RequestFactory()
+        request = factory.get(
+            self.path, query_params={"panel": "subscriptions"}
+        )
+        request.user = get_user_model().objects.get(pk=1)
+        view = views.CustomerProfileDetailView()
+        view.setup(request)
+        view.subscription_limit = 1
+        context = view.get_context_data()
+        self.assertEqual(
+            [row["subscription"].pk for row in context["subscription_rows"]],
+            [3],
+        )
+        self.assertTrue(context["more_subscriptions"])
+        self.assertEqual(len(view.service.execute.mock_calls), 1)
+
+    def test_slow_subscription_rows_are_loading(self):
+        """Fails if a subscription that missed the deadline wasn't rendered as loading."""
+        factory = RequestFactory()
+        request = factory.get(self.path)
+        request.user = get_user_model().objects.get(pk=1)
+        view = views.CustomerProfileDetailView()
+        view.setup(request)
+        view.service = MagicMock()
+        view.service.execute.side_effect = lambda request_tuple: time.sleep(1)
+        view.subscription_timeout = 0.05
+        rows = view.get_subscription_rows()
+        self.assertTrue(rows[0]["loading"])
+        self.assertIsNone(rows[0]["response"])
+
+    def test_page_defers_gateway_panels(self):
+        """Fails if the page didn't render local subscription rows and defer both gateway-backed panels."""
+        factory = RequestFactory()
+        request = factory.get(
+            self.path, query_params={"include_issuer_info": "on"}
+        )
+        request.user = get_user_model().objects.get(pk=1)
+        view = views.CustomerProfileDetailView()
+        view.setup(request)
+        context = view.get_context_data()
+        view.service.execute.assert_not_called()
+        self.assertNotIn("response", context)
+        self.assertEqual(
+            [row["subscription"].pk for row in context["subscription_rows"]],
+            [1],
+        )
+        self.assertEqual(
+            context["deferred_panels"]["profile"],
+            f"{self.path}?include_issuer_info=on&panel=profile",
+        )
+        self.assertIn("subscriptions", context["deferred_panels"])
+
+    @override_settings(AUTHORIZENET_SERVICE="unittest.mock.MagicMock")
+    def test_profile_panel_is_rendered(self):
+        """Fails if the profile panel didn't render the profile lists alone."""
+        response = self.client.get(self.path, {"panel": "profile"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'id="payment-profile-list"')
+        self.assertNotContains(response, 'id="subscription-list"')
+        self.assertIn("no-store", response["Cache-Control"])
+
+    def test_subscription_row_is_rendered(self):
+        """Fails if a loading subscription row couldn't be fetched by htmx."""
+        response = self.client.get(
+            "/subscriptions/1/row/", headers={"HX-Request": "true"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'id="subscription-1"')
+        self.assertNotContains(response, "hx-get")
+
 
 @override_settings(AUTHORIZENET_SERVICE="unittest.mock.Mock")
 class SubscriptionCancelViewTestCase(TestCase):
@@ -360,6 +450,16 @@ class SubscriptionUpdateViewTestCase(TestCase):
         response = self.client.get(self.path)
         self.assertEqual(response.status_code, 404)
 
+    def test_get_form_defers_profile_choices(self):
+        """Fails if a page request waited on Authorizenet for the profile choices."""
+        request = self.factory.get(self.path)
+        request.user = self.user
+        self.view.setup(request, pk=1)
+        self.view.object = self.view.get_object()
+        form = self.view.get_form()
+        self.view.service.execute.assert_not_called()
+        self.assertFalse(form.fields["payment_profile"].choices)
+
     def test_get_form_kwargs(self):
         """Fails if 'instance' was in the form kwargs."""
         request = self.factory.get(self.path)
@@ -444,15 +544,152 @@ class SubscriptionDetailViewTestCase(TestCase):
         )
 
     def test_get_context_data(self):
-        """Fails if :py:attr:`response` wasn't present in the view context."""
+        """Fails if :py:attr:`response` wasn't present in the subscription panel's context."""
         factory = RequestFactory()
-        request = factory.get(self.path)
+        request = factory.get(
+            self.path, query_params={"panel": "subscription"}
+        )
         request.user = get_user_model().objects.get(pk=1)
         view = views.SubscriptionDetailView()
         view.setup(request, pk=1)
         view.object = view.get_object()
         context = view.get_context_data()
         self.assertIn("response", context.keys())
+        self.assertEqual(context["deferred_panels"], {})
+
+    def test_page_defers_subscription_panel(self):
+        """Fails if the page waited on Authorizenet instead of deferring the subscription panel."""
+        factory = RequestFactory()
+        request = factory.get(self.path)
+        request.user = get_user_model().objects.get(pk=1)
+        view = views.SubscriptionDetailView()
+        view.setup(request, pk=1)
+        view.object = view.get_object()
+        context = view.get_context_data()
+        self.assertNotIn("response", context.keys())
+        self.assertEqual(
+            context["deferred_panels"],
+            {"subscription": f"{self.path}?panel=subscription"},
+        )
+        view.service.execute.assert_not_called()
+
+    @override_settings(AUTHORIZENET_SERVICE="unittest.mock.MagicMock")
+    def test_panel_is_cached_privately(self):
+        """Fails if the subscription panel response wasn't briefly cacheable by the browser only, varying on ``HX-Request``."""
+        response = self.client.get(self.path, {"panel": "subscription"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("max-age=10", response["Cache-Control"])
+        self.assertIn("HX-Request", response["Vary"])
+        self.assertNotContains(response, "hx-get")
+
+    def test_panel_with_message_is_never_cached(self):
+        """Fails if a panel whose request added a flash message was cacheable."""
+
+        def get_authorizenet_response(view):
+            messages.error(view.request, "Couldn't retrieve subscription.")
+
+        with patch.object(
+            views.SubscriptionDetailView,
+            "get_authorizenet_response",
+            get_authorizenet_response,
+        ):
+            response = self.client.get(self.path, {"panel": "subscription"})
+        self.assertIn("no-store", response["Cache-Control"])
+
+    def test_invalid_panel_is_bad_request(self):
+        """Fails if an unknown panel didn't return a 400 response."""
+        response = self.client.get(self.path, {"panel": "unknown"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(AUTHORIZENET_SERVICE="unittest.mock.Mock")
+class SubscriptionListViewTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        self.path = "/subscriptions/"
+        Subscription.objects.bulk_create(
+            Subscription(
+                pk=pk,
+                customer_profile_id=1,
+                plan_id=2 if pk % 2 else 1,
+                status="canceled" if pk % 3 else "active",
+            )
+            for pk in range(10, 30)
+        )
+        self.client = Client()
+        self.client.login(
+            username="testuser", password="super_secure_password1!"
+        )
+
+    def get_pages(self, **params) -> list[list[int]]:
+        """Follows the ``next_url`` of every page and returns each page's subscription ids."""
+        pages = []
+        response = self.client.get(self.path, query_params=params)
+        while True:
+            context = response.context
+            pages.append([s.pk for s in context["subscriptions"]])
+            if context["next_url"] is None:
+                return pages
+            response = self.client.get(
+                context["next_url"], headers={"HX-Request": "true"}
+            )
+
+    def test_pages_are_keyset_ordered(self):
+        """Fails if paging didn't return every subscription once, ordered by ``(status, id)``."""
+        with patch.object(views.SubscriptionListView, "page_size", 4):
+            pages = self.get_pages()
+        expected = list(
+            Subscription.objects.filter(customer_profile_id=1)
+            .order_by("status", "pk")
+            .values_list("pk", flat=True)
+        )
+        self.assertEqual(sum(pages, []), expected)
+        self.assertTrue(all(len(page) == 4 for page in pages[:-1]))
+
+    def test_filters(self):
+        """Fails if the status and plan filters weren't applied on every page."""
+        with patch.object(views.SubscriptionListView, "page_size", 2):
+            pages = self.get_pages(status="canceled", plan="2")
+        expected = list(
+            Subscription.objects.filter(
+                customer_profile_id=1, status="canceled", plan_id=2
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_deep_page_is_one_query(self):
+        """Fails if a later page took more queries than the first."""
+        request = RequestFactory().get(self.path, {"after": "canceled:25"})
+        request.user = get_user_model().objects.get(pk=1)
+        view = views.SubscriptionListView()
+        view.setup(request)
+        with self.assertNumQueries(1):
+            subscriptions = list(view.get_queryset())
+        self.assertEqual([s.pk for s in subscriptions], [26, 28, 29])
+
+    def test_htmx_request_renders_rows(self):
+        """Fails if an htmx request rendered the full page instead of the rows partial."""
+        response = self.client.get(self.path, headers={"HX-Request": "true"})
+        self.assertContains(response, 'id="subscription-10"')
+        self.assertNotContains(response, "subscription-list-filters")
+
+    def test_invalid_cursor_is_bad_request(self):
+        """Fails if a malformed cursor didn't return a 400 response."""
+        response = self.client.get(self.path, {"after": "canceled:x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_customers_subscriptions_are_hidden(self):
+        """Fails if another customer's subscription was listed."""
+        response = self.client.get(self.path)
+        self.assertNotContains(response, 'id="subscription-2"')
 
 
 @override_settings(AUTHORIZENET_SERVICE="unittest.mock.Mock")
@@ -501,7 +738,31 @@ class SubscriptionCreateViewTestCase(TestCase):
         self.assertFalse(form.fields["payment_profile"].choices)
         self.assertFalse(form.fields["shipping_profile"].choices)
 
+    def test_context_embeds_plan_catalog(self):
+        """Fails if the context didn't embed the visible plan catalog and preselect the form's first plan."""
+        request = self.factory.get(self.path)
+        request.user = self.user
+        self.view.setup(request)
+        self.view.service.execute.return_value = MagicMock(spec=["profile"])
+        self.view.service.execute.return_value.profile.paymentProfiles = []
+        self.view.service.execute.return_value.profile.shipToList = []
+        context = self.view.get_context_data()
+        plans = context["plan_catalog"]["plans"]
+        self.assertEqual(
+            [plan["pk"] for plan in plans],
+            list(
+                SubscriptionPlan.objects.filter(visibility="vis").values_list(
+                    "pk", flat=True
+                )
+            ),
+        )
+        self.assertEqual(context["subscriptionplan"], plans[0])
+        self.assertNotIn(
+            "load", context["form"].fields["plan"].widget.attrs["hx-trigger"]
+        )
+
 
+@override_settings(AUTHORIZENET_SERVICE="unittest.mock.Mock")
 class SubscriptionPlanDetailViewTestCase(TestCase):
     fixtures = [
         "terminusgps_payments/tests/test_user.json",
@@ -536,3 +797,59 @@ class SubscriptionPlanDetailViewTestCase(TestCase):
         self.view.setup(request)
         obj = self.view.get_object(queryset=None)
         self.assertEqual(obj, SubscriptionPlan.objects.get(pk=1))
+
+
+@override_settings(AUTHORIZENET_SERVICE="unittest.mock.MagicMock")
+class SubscriptionBulkCreateViewTestCase(TestCase):
+    fixtures = [
+        "terminusgps_payments/tests/test_user.json",
+        "terminusgps_payments/tests/test_customerprofile.json",
+        "terminusgps_payments/tests/test_subscription.json",
+    ]
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.get(pk=1)
+        self.path = "/subscriptions/create/bulk/"
+
+    def get_view(self, data):
+        request = self.factory.post(self.path, data=data)
+        request.user = self.user
+        request.session = {}
+        request._messages = MagicMock()
+        view = views.SubscriptionBulkCreateView()
+        view.setup(request)
+        view.service.execute.return_value.profile.paymentProfiles = []
+        view.service.execute.return_value.profile.shipToList = []
+        return view
+
+    def test_form_valid_creates_subscriptions(self):
+        """Fails if a subscription wasn't saved for every unit."""
+        view = self.get_view(
+            {
+                "plan": 1,
+                "units": "Truck 1\nTruck 2\nTruck 3",
+                "payment_profile": "1",
+                "shipping_profile": "1",
+            }
+        )
+        subscription_ids = iter(range(100, 103))
+
+        def execute(request_tuple):
+            response = MagicMock()
+            response.subscriptionId = next(subscription_ids)
+            return response
+
+        form = view.get_form()
+        form.fields["payment_profile"].choices = [("1", "Card")]
+        form.fields["shipping_profile"].choices = [("1", "Address")]
+        self.assertTrue(form.is_valid())
+        view.service.execute.side_effect = execute
+        response = view.form_valid(form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            Subscription.objects.filter(
+                customer_profile__pk=1, pk__in=range(100, 103)
+            ).count(),
+            3,
+        )